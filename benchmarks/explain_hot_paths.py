@@ -0,0 +1,221 @@
+# Runs EXPLAIN ANALYZE on the app's hot lookup queries, without and with the
+# indexes in migrations/001_hot_path_indexes.sql, and prints both timings
+#
+#   python benchmarks/explain_hot_paths.py                  ==> use existing data
+#   python benchmarks/explain_hot_paths.py --seed           ==> add a synthetic data set first
+#   python benchmarks/explain_hot_paths.py --seed --transactions 200000 --json results.json
+#
+# Everything (seeding, dropping and creating indexes) happens in one
+# transaction which is rolled back at the end, so the database is unchanged.
+# Seeding needs a superuser (see synthetic_data.seed).
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+
+BENCHMARK_DIRECTORY = os.path.dirname( os.path.abspath( __file__ ) )
+sys.path.insert( 0, os.path.dirname( BENCHMARK_DIRECTORY ) ) # for main.py / config.py
+
+from main import open_database_connection
+import synthetic_data
+
+
+MIGRATION_FILE = os.path.join( os.path.dirname( BENCHMARK_DIRECTORY ),
+                               "migrations", "001_hot_path_indexes.sql" )
+
+# The app's queries (copied from main.py and migrations/), keyed by the
+# function that runs them. asset_latest_transaction() is left out: it's a
+# primary key lookup on asset_current_state, which these indexes don't affect;
+# the trigger that keeps that table up to date runs the first query here.
+HOT_PATH_QUERIES = {
+    "refresh_asset_current_state() latest transaction": (
+        """
+        SELECT t.asset_id, t.transaction_id, t.transaction_type, t.transaction_timestamp,
+               t.transaction_user, t.transaction_notes, t.entity_id,
+               EXISTS ( SELECT 1
+                        FROM transaction_documents td
+                        JOIN documents d ON td.document_id = d.document_id
+                        WHERE td.transaction_id = t.transaction_id
+                          AND d.document_type = 'AGREEMENT'
+                          AND d.document_signed_timestamp IS NOT NULL )
+        FROM transactions t
+        WHERE t.asset_id = %(asset_id)s
+        ORDER BY t.transaction_timestamp DESC, t.transaction_id
+        LIMIT 1
+        """ ),
+    "get_transaction_history( asset ) first page": (
+        """
+        SELECT t.transaction_timestamp, t.transaction_id, t.transaction_type, a.asset_id,
+               a.asset_type, i.doc_number, u.last_name, u.first_name, u.middle_name
+        FROM transactions t
+        LEFT JOIN assets a ON t.asset_id = a.asset_id
+        LEFT JOIN incarcerated i ON t.entity_id = i.entity_id
+        LEFT JOIN users u ON t.entity_id = u.entity_id
+        WHERE t.asset_id = %(asset_id)s
+        ORDER BY t.transaction_id ASC
+        LIMIT 20
+        """ ),
+    "get_transaction_history( entity ) first page": (
+        """
+        SELECT t.transaction_timestamp, t.transaction_id, t.transaction_type, a.asset_id,
+               a.asset_type, i.doc_number, u.last_name, u.first_name, u.middle_name
+        FROM transactions t
+        LEFT JOIN assets a ON t.asset_id = a.asset_id
+        LEFT JOIN incarcerated i ON t.entity_id = i.entity_id
+        LEFT JOIN users u ON t.entity_id = u.entity_id
+        WHERE t.entity_id = %(entity_id)s
+        ORDER BY t.transaction_id ASC
+        LIMIT 20
+        """ ),
+    "count_transaction_history( asset )": (
+        """
+        SELECT COUNT(*) FROM transactions t WHERE t.asset_id = %(asset_id)s
+        """ ),
+    "get_unprinted_documents_for_entity()": (
+        """
+        SELECT d.document_id, d.document_type, d.document_printed_timestamp,
+               d.document_signed_timestamp, d.document_file_name
+        FROM transactions t
+        JOIN transaction_documents td ON t.transaction_id = td.transaction_id
+        JOIN documents d ON td.document_id = d.document_id
+        WHERE t.entity_id = %(entity_id)s AND d.document_printed_timestamp IS NULL
+        """ ),
+    "incarcerated_issue_asset_transaction() unprinted AGREEMENT": (
+        """
+        SELECT d.document_id
+        FROM documents d
+        JOIN transaction_documents td ON d.document_id = td.document_id
+        JOIN transactions t ON td.transaction_id = t.transaction_id
+        WHERE t.entity_id = %(entity_id)s
+          AND d.document_type = 'AGREEMENT'
+          AND d.document_printed_timestamp IS NULL
+        LIMIT 1
+        """ ),
+    "Entity.assets_for_entities() issued assets": (
+        """
+        SELECT issued_assets.asset_id, transactions.entity_id
+        FROM issued_assets
+        JOIN transactions ON issued_assets.transaction_id = transactions.transaction_id
+        WHERE transactions.entity_id = ANY( %(entity_ids)s )
+        """ ),
+    "Enrollment.from_schedule_id()": (
+        """
+        SELECT enrollments.entity_id, enrollments.schedule_id, courses.course_name
+        FROM enrollments, course_schedules, courses
+        WHERE enrollments.schedule_id = %(schedule_id)s
+          AND enrollments.schedule_id = course_schedules.schedule_id
+          AND course_schedules.course_id = courses.course_id
+        """ ),
+}
+
+
+def pick_parameters( cursor ) -> dict:
+    """Uses the busiest asset / entity / schedule, so the plans are the worst case."""
+    cursor.execute( "SELECT asset_id FROM transactions GROUP BY asset_id ORDER BY COUNT(*) DESC LIMIT 1;" )
+    asset = cursor.fetchone()
+    cursor.execute( "SELECT entity_id FROM transactions GROUP BY entity_id ORDER BY COUNT(*) DESC LIMIT 1;" )
+    entity = cursor.fetchone()
+    cursor.execute( "SELECT schedule_id FROM enrollments GROUP BY schedule_id ORDER BY COUNT(*) DESC LIMIT 1;" )
+    schedule = cursor.fetchone()
+
+    return {
+        'asset_id':    asset[0]    if asset    else '',
+        'entity_id':   entity[0]   if entity   else 0,
+        'entity_ids':  [ entity[0] ] if entity else [],
+        'schedule_id': schedule[0] if schedule else 0,
+    }
+
+
+def scan_nodes( plan: dict ) -> list:
+    """Lists a plan's scans, e.g. 'Index Scan using ix_... on transactions'."""
+    nodes = []
+    if "Scan" in plan.get( "Node Type", "" ):
+        node = plan["Node Type"]
+        if "Index Name" in plan:
+            node += f" using {plan['Index Name']}"
+        if "Relation Name" in plan:
+            node += f" on {plan['Relation Name']}"
+        nodes.append( node )
+    for child in plan.get( "Plans", [] ):
+        nodes += scan_nodes( child )
+    return nodes
+
+
+def explain_queries( cursor, parameters: dict, repeat: int ) -> dict:
+    """Returns { query name: { 'ms': median execution time, 'scans': [...] } }."""
+    results = {}
+    for ( name, query ) in HOT_PATH_QUERIES.items():
+        timings = []
+        for _ in range( repeat ):
+            cursor.execute( "EXPLAIN ( ANALYZE, BUFFERS, FORMAT JSON ) " + query, parameters )
+            explained = cursor.fetchone()[0]
+            if isinstance( explained, str ):
+                explained = json.loads( explained )
+            timings.append( explained[0]["Execution Time"] )
+        results[name] = {
+            'ms':    statistics.median( timings ),
+            'scans': scan_nodes( explained[0]["Plan"] ),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser( description="EXPLAIN ANALYZE the hot path queries, without and with their indexes." )
+    parser.add_argument( "--seed", action="store_true", help="add a synthetic data set first (rolled back afterwards)" )
+    parser.add_argument( "--repeat", type=int, default=5, help="runs per query (the median is reported)" )
+    parser.add_argument( "--json", help="also save the results to this JSON file" )
+    for ( field, default ) in synthetic_data.SeedVolumes().__dict__.items():
+        parser.add_argument( f"--{field}", type=int, default=default, help=f"rows to seed (default {default})" )
+    arguments = parser.parse_args()
+
+    with open( MIGRATION_FILE, 'r' ) as migration:
+        migration_sql = migration.read()
+    index_names = re.findall( r"CREATE INDEX IF NOT EXISTS (\w+)", migration_sql )
+
+    connection = open_database_connection()
+    cursor     = connection.cursor()
+
+    try:
+        if arguments.seed:
+            synthetic_data.seed( cursor, synthetic_data.SeedVolumes(
+                    **{ field: getattr( arguments, field ) for field in synthetic_data.SeedVolumes().__dict__ } ) )
+
+        parameters = pick_parameters( cursor )
+
+        # Before: without the migration's indexes (whether or not they exist)
+        cursor.execute( "SAVEPOINT before_indexes;" )
+        for index_name in index_names:
+            cursor.execute( f"DROP INDEX IF EXISTS {index_name};" )
+        before = explain_queries( cursor, parameters, arguments.repeat )
+        cursor.execute( "ROLLBACK TO SAVEPOINT before_indexes;" )
+
+        # After: with them
+        cursor.execute( "SAVEPOINT after_indexes;" )
+        cursor.execute( migration_sql )
+        cursor.execute( "ANALYZE;" )
+        after = explain_queries( cursor, parameters, arguments.repeat )
+        cursor.execute( "ROLLBACK TO SAVEPOINT after_indexes;" )
+
+    finally:
+        connection.rollback() # leave the database exactly as it was
+        cursor.close()
+        connection.close()
+
+    print( f"\n{'Query':<60} {'Before ms':>10} {'After ms':>10} {'Speedup':>8}" )
+    for name in HOT_PATH_QUERIES:
+        speedup = before[name]['ms'] / after[name]['ms'] if after[name]['ms'] > 0 else 0
+        print( f"{name:<60} {before[name]['ms']:>10.3f} {after[name]['ms']:>10.3f} {speedup:>7.1f}x" )
+        print( f"    before: {', '.join( before[name]['scans'] )}" )
+        print( f"    after : {', '.join( after[name]['scans'] )}" )
+
+    if arguments.json:
+        with open( arguments.json, 'w' ) as json_file:
+            json.dump( { 'parameters': { key: str( value ) for ( key, value ) in parameters.items() },
+                         'before': before, 'after': after }, json_file, indent=2 )
+
+
+if __name__ == "__main__":
+    main()
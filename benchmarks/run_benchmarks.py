@@ -0,0 +1,298 @@
+# End-to-end benchmark: drives the app's real code paths, headlessly, against
+# a synthetic database, and reports latency percentiles and query counts per
+# operation as JSON (so runs can be compared between versions)
+#
+#   python benchmarks/run_benchmarks.py --create                 ==> build + seed 'ams_benchmark', then run
+#   python benchmarks/run_benchmarks.py --output v1.5.json       ==> re-run against the existing database
+#   python benchmarks/run_benchmarks.py --create --incarcerated 2000 --assets 5000 --transactions 100000
+#
+# The benchmark database lives on the config.py DEV_HOST server, and is
+# dropped and re-created by '--create' (from createtables.sql, plus
+# synthetic_data.seed). Some operations (asset returns) write to it.
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIRECTORY = os.path.dirname( os.path.abspath( __file__ ) )
+PROJECT_DIRECTORY   = os.path.dirname( BENCHMARK_DIRECTORY )
+sys.path.insert( 0, PROJECT_DIRECTORY ) # for main.py / config.py
+
+import psycopg2
+import psycopg2.extras
+import config
+import synthetic_data
+
+
+# Answers for report prompts (list prompts take their first option)
+REPORT_ANSWERS = {
+    'first_name':     '',
+    'last_name':      'LAST1',
+    'scheduled_year': '2024',
+}
+
+QUERY_COUNT = [ 0 ] # every cursor.execute() on a benchmark connection
+
+
+def counting_cursor_factory( factory, _cache={} ):
+    """Subclasses a cursor class so its execute() calls are counted."""
+    if factory not in _cache:
+        class CountingCursor( factory ):
+            def execute( self, query, vars=None ):
+                QUERY_COUNT[0] += 1
+                return super().execute( query, vars )
+
+            def executemany( self, query, vars_list ):
+                QUERY_COUNT[0] += 1
+                return super().executemany( query, vars_list )
+
+        _cache[factory] = CountingCursor
+    return _cache[factory]
+
+
+class CountingConnection( psycopg2.extras.DictConnection ):
+    def cursor( self, *args, **kwargs ):
+        factory = kwargs.get( 'cursor_factory' ) or self.cursor_factory or psycopg2.extras.DictCursor
+        kwargs['cursor_factory'] = counting_cursor_factory( factory )
+        return super().cursor( *args, **kwargs )
+
+
+def server_connection( database: str ):
+    return psycopg2.connect(
+        host=config.DEV_HOST,
+        database=database,
+        user=config.DEV_USER,
+        password=config.DEV_PASSWORD,
+    )
+
+
+def create_database( database: str, volumes: synthetic_data.SeedVolumes ) -> None:
+    """Drops and re-creates 'database' from createtables.sql and the
+    migrations (each is safe to re-run), then seeds it."""
+    admin = server_connection( "postgres" )
+    admin.autocommit = True # CREATE DATABASE can't run in a transaction
+    with admin.cursor() as cursor:
+        cursor.execute( f'DROP DATABASE IF EXISTS "{database}";' )
+        cursor.execute( f'CREATE DATABASE "{database}";' )
+    admin.close()
+
+    with open( os.path.join( PROJECT_DIRECTORY, "createtables.sql" ), 'r' ) as schema_file:
+        schema = "\n".join( line for line in schema_file.read().splitlines()
+                            if not line.upper().startswith( "CREATE DATABASE" ) )
+
+    migrations_directory = os.path.join( PROJECT_DIRECTORY, "migrations" )
+    migrations = []
+    for file_name in sorted( os.listdir( migrations_directory ) ):
+        if file_name.endswith( ".sql" ):
+            with open( os.path.join( migrations_directory, file_name ), 'r' ) as migration_file:
+                migrations.append( migration_file.read() )
+
+    connection = server_connection( database )
+    with connection.cursor() as cursor:
+        cursor.execute( schema )
+        for migration in migrations:
+            cursor.execute( migration )
+        synthetic_data.seed( cursor, volumes )
+    connection.commit()
+    connection.close()
+
+
+def sample_ids( query: str, count: int ) -> list:
+    connection = server_connection( config.DEV_DATABASE )
+    with connection.cursor() as cursor:
+        cursor.execute( query + " ORDER BY random() LIMIT %s;", ( count, ) )
+        ids = [ row[0] for row in cursor.fetchall() ]
+    connection.close()
+    return ids
+
+
+def measure( results: dict, name: str, operation, *args ) -> None:
+    """Runs operation( *args ) once, recording its latency and query count."""
+    queries_before = QUERY_COUNT[0]
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout( io.StringIO() ): # the app prints a lot
+            operation( *args )
+        error = None
+    except Exception as e:
+        error = f"{type( e ).__name__}: {e}"
+    elapsed = ( time.perf_counter() - started ) * 1000.0
+
+    result = results.setdefault( name, { 'latencies': [], 'queries': [], 'errors': [] } )
+    result['latencies'].append( elapsed )
+    result['queries'  ].append( QUERY_COUNT[0] - queries_before )
+    if error is not None:
+        result['errors'].append( error )
+
+
+def percentile( values: list, percent: float ) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted( values )
+    rank = max( 1, math.ceil( percent / 100.0 * len( ordered ) ) )
+    return ordered[ rank - 1 ]
+
+
+def summarize( results: dict ) -> dict:
+    summary = {}
+    for ( name, result ) in results.items():
+        latencies = result['latencies']
+        summary[name] = {
+            'samples':      len( latencies ),
+            'errors':       len( result['errors'] ),
+            'p50_ms':       round( percentile( latencies, 50 ), 3 ),
+            'p95_ms':       round( percentile( latencies, 95 ), 3 ),
+            'p99_ms':       round( percentile( latencies, 99 ), 3 ),
+            'mean_ms':      round( statistics.fmean( latencies ), 3 ),
+            'queries_mean': round( statistics.fmean( result['queries'] ), 2 ),
+            'queries_max':  max( result['queries'] ),
+        }
+        if result['errors']:
+            summary[name]['first_error'] = result['errors'][0]
+    return summary
+
+
+def run_operations( app, samples: int, report_runs: int, include_reports: bool ) -> dict:
+    results = {}
+
+    asset_ids  = sample_ids( "SELECT asset_id FROM assets", samples )
+    entity_ids = sample_ids( "SELECT entity_id FROM incarcerated", samples )
+
+    for asset_id in asset_ids:
+        measure( results, "Asset.from_id", app.Asset.from_id, asset_id )
+
+    entities = [ app.Incarcerated.from_id( entity_id ) for entity_id in entity_ids ]
+    entities = [ entity for entity in entities if entity is not None ]
+
+    for entity in entities:
+        measure( results, "Entity.assets", lambda entity: list( entity.assets() ), entity )
+
+    for asset_id in asset_ids:
+        measure( results, "asset_validate_from_barcode", app.asset_validate_from_barcode,
+                 asset_id, random.choice( entities ), [] )
+
+    for asset_id in asset_ids:
+        asset = app.Asset.from_id( asset_id )
+        measure( results, "get_transaction_history( asset )", app.get_transaction_history,
+                 asset, None, None, getattr( config, "HISTORY_PAGE_SIZE", 20 ) )
+
+    for entity in entities:
+        measure( results, "get_transaction_history( entity )", app.get_transaction_history,
+                 entity, None, None, getattr( config, "HISTORY_PAGE_SIZE", 20 ) )
+
+    # Returns write to the database: each issued asset is returned only once
+    issued_ids = sample_ids( "SELECT issued_assets.asset_id FROM issued_assets", samples )
+    for asset_id in issued_ids:
+        asset = app.Asset.from_id( asset_id )
+        transaction = app.asset_latest_transaction( asset ) if asset else None
+        if transaction is not None:
+            measure( results, "transact_true_asset_return", app.transact_true_asset_return, transaction )
+
+    if include_reports:
+        reports_directory = os.path.join( PROJECT_DIRECTORY, "reports" )
+        report_names = [ reports_directory ] + sorted(
+                file_name for file_name in os.listdir( reports_directory ) if file_name.endswith( ".sql" ) )
+
+        for ( selected, report_name ) in enumerate( report_names[1:], start=1 ):
+            with open( os.path.join( reports_directory, report_name ), 'r' ) as report_file:
+                if "'AMS_import': True" in report_file.read():
+                    continue # imports need an input file, and write to the database
+            for _ in range( report_runs ):
+                measure( results, f"report: {report_name}", run_report, app, selected, report_names )
+
+    return results
+
+
+def run_report( app, selected: int, report_names: list ) -> None:
+    result = app.process_report( selected, report_names )
+    if result.startswith( "Warning" ) or result.startswith( "Error" ):
+        raise RuntimeError( result )
+
+
+def answer_report_prompt( options_list: list ) -> str:
+    """Stands in for report_parameter_from_list(): ':key - choose one ...' lists
+    get their first option, ':key - enter a parameter value' prompts get
+    REPORT_ANSWERS[key]."""
+    key = options_list[0].split( " ", 1 )[0].lstrip( ":" )
+    if "choose one" in options_list[0] and len( options_list ) > 1:
+        return options_list[1]
+    return REPORT_ANSWERS.get( key, "" )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser( description="Benchmark the app's database code paths against synthetic data." )
+    parser.add_argument( "--database", default="ams_benchmark", help="benchmark database name (default 'ams_benchmark')" )
+    parser.add_argument( "--create", action="store_true", help="drop, re-create and seed the benchmark database first" )
+    parser.add_argument( "--samples", type=int, default=200, help="calls per operation (default 200)" )
+    parser.add_argument( "--report-runs", type=int, default=3, help="runs per report (default 3)" )
+    parser.add_argument( "--no-reports", action="store_true", help="skip the reports in reports/" )
+    parser.add_argument( "--report-cache", action="store_true", help="let repeated report runs use the report result cache" )
+    parser.add_argument( "--output", help="save the JSON results to this file (default: print them)" )
+    parser.add_argument( "--random-seed", type=int, default=12345 )
+    for ( field, default ) in synthetic_data.SeedVolumes().__dict__.items():
+        parser.add_argument( f"--{field}", type=int, default=default, help=f"rows to seed (default {default})" )
+    arguments = parser.parse_args()
+
+    random.seed( arguments.random_seed )
+    volumes = synthetic_data.SeedVolumes(
+            **{ field: getattr( arguments, field ) for field in synthetic_data.SeedVolumes().__dict__ } )
+
+    if arguments.create:
+        create_database( arguments.database, volumes )
+
+    # Point the app at the benchmark database, before main.py reads config.py
+    config.LIVE_DATABASE = False
+    config.DEV_DATABASE  = arguments.database
+
+    import main as app
+
+    # Count every query the app runs (pooled connections come from here)
+    app.open_database_connection = lambda: psycopg2.connect(
+            connection_factory=CountingConnection,
+            host=config.DEV_HOST,
+            database=config.DEV_DATABASE,
+            user=config.DEV_USER,
+            password=config.DEV_PASSWORD,
+    )
+
+    # Headless: no keyboard, no file dialogs
+    export_directory = tempfile.mkdtemp( prefix="ams_benchmark_" )
+    app.input_with_color          = lambda prompt_message="": ""
+    app.input_yes_no_only         = lambda prompt_message="": "Y"
+    app.report_parameter_from_list = answer_report_prompt
+    app.open_output_csv           = lambda report_dir, report_csv: os.path.join( export_directory, report_csv )
+
+    # Repeated report runs would otherwise measure the result cache, not the query
+    if not arguments.report_cache:
+        app.REPORT_RESULTS.directory = None
+
+    started = time.time()
+    results = run_operations( app, arguments.samples, arguments.report_runs, not arguments.no_reports )
+    app.DATABASE_POOL.close_all()
+
+    output = {
+        'version':    config.VERSION,
+        'database':   arguments.database,
+        'volumes':    volumes.__dict__ if arguments.create else None,
+        'started':    time.strftime( "%Y-%m-%d %H:%M:%S", time.localtime( started ) ),
+        'seconds':    round( time.time() - started, 1 ),
+        'operations': summarize( results ),
+    }
+
+    if arguments.output:
+        with open( arguments.output, 'w' ) as json_file:
+            json.dump( output, json_file, indent=2 )
+        print( f"Results saved to '{arguments.output}'." )
+    else:
+        print( json.dumps( output, indent=2 ) )
+
+
+if __name__ == "__main__":
+    main()
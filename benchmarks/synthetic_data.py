@@ -0,0 +1,261 @@
+# Generates a synthetic Asset Management System data set, for benchmarks
+#
+# Everything is inserted set-based (generate_series), so a few million
+# transactions take seconds, not hours. Synthetic rows are easy to spot:
+#     asset_id 'SYN0000001', ...   doc_number '900001', ...
+#     transaction_user 'synthetic', course_prefix 'SYN'
+#
+# Seed an empty benchmark database, or seed inside a transaction that is
+# rolled back afterwards (as explain_hot_paths.py does); doc_number and
+# asset_id values are not checked against existing data.
+
+from dataclasses import dataclass
+
+
+@dataclass
+class SeedVolumes:
+    """How many rows of each kind to generate."""
+    incarcerated: int = 20000
+    assets:       int = 50000  # spread evenly across every asset_type
+    transactions: int = 1000000
+    documents:    int = 100000 # AGREEMENT documents, about 5% unprinted
+    books:        int = 500    # distinct ISBNs shared by the BOOK assets
+    courses:      int = 40
+    schedules:    int = 200
+    enrollments:  int = 60000
+
+
+def seed( cursor, volumes: SeedVolumes = SeedVolumes(), verbose: bool = True ) -> dict:
+    """
+    Inserts a synthetic data set using an open cursor. The caller commits
+    (or rolls back). Needs a superuser (or table owner): user triggers are
+    skipped with 'session_replication_role', so the incarcerated insert
+    trigger doesn't create a second entity for each row (asset_current_state
+    is rebuilt afterwards instead).
+
+    Returns:
+        dict: the first id of each generated key range, and the asset types
+    """
+    def log( message: str ) -> None:
+        if verbose:
+            print( message, flush=True )
+
+    cursor.execute( "SET LOCAL session_replication_role = replica;" )
+
+    cursor.execute( "SELECT unnest( enum_range( NULL::asset_type ) )::text;" )
+    asset_types = [ row[0] for row in cursor.fetchall() ]
+
+    has_issued_accessories = table_exists( cursor, "issued_accessories" )
+    accessory_types = [ asset_type for asset_type in asset_types
+                        if asset_type in ( 'CHARGER', 'HEADPHONES' ) ] if has_issued_accessories else []
+
+    parameters = {
+        'entity_base':      max_id( cursor, "entities",         "entity_id"      ),
+        'transaction_base': max_id( cursor, "transactions",     "transaction_id" ),
+        'document_base':    max_id( cursor, "documents",        "document_id"    ),
+        'course_base':      max_id( cursor, "courses",          "course_id"      ),
+        'schedule_base':    max_id( cursor, "course_schedules", "schedule_id"    ),
+        'asset_types':      asset_types,
+        'type_count':       len( asset_types ),
+        'accessory_types':  accessory_types,
+        'incarcerated':     volumes.incarcerated,
+        'assets':           volumes.assets,
+        'transactions':     volumes.transactions,
+        'documents':        volumes.documents,
+        'books':            volumes.books,
+        'courses':          volumes.courses,
+        'schedules':        volumes.schedules,
+        'enrollments':      min( volumes.enrollments, volumes.incarcerated * volumes.schedules ),
+    }
+
+    log( f"Seeding {volumes.incarcerated} incarcerated individuals..." )
+    cursor.execute(
+        """
+        INSERT INTO entities ( entity_id, entity_type, enabled )
+        SELECT %(entity_base)s + n, 'USER', TRUE
+        FROM generate_series( 1, %(incarcerated)s ) AS n;
+
+        INSERT INTO users ( entity_id, last_name, first_name, middle_name, user_type )
+        SELECT %(entity_base)s + n, 'LAST' || n, 'FIRST' || n, NULL, 'INCARCERATED'
+        FROM generate_series( 1, %(incarcerated)s ) AS n;
+
+        INSERT INTO incarcerated ( entity_id, doc_number, facility, housing_unit,
+                                   housing_cell, estimated_release_date, counselor )
+        SELECT %(entity_base)s + n, ( 900000 + n )::varchar, 'SYN',
+               'UNIT ' || ( n %% 8 ), ( n %% 200 )::varchar,
+               CURRENT_DATE + ( n %% 2000 )::integer, 'COUNSELOR ' || ( n %% 25 )
+        FROM generate_series( 1, %(incarcerated)s ) AS n;
+        """,
+        parameters )
+
+    log( f"Seeding {volumes.assets} assets of types {asset_types}..." )
+    cursor.execute(
+        """
+        INSERT INTO asset_types ( asset_type )
+        SELECT unnest( %(asset_types)s::asset_type[] )
+        ON CONFLICT DO NOTHING;
+
+        INSERT INTO assets ( asset_id, asset_type, asset_cost, asset_status )
+        SELECT 'SYN' || lpad( n::text, 7, '0' ),
+               ( %(asset_types)s::asset_type[] )[ 1 + n %% %(type_count)s ],
+               100.00, 'IN_SERVICE'
+        FROM generate_series( 1, %(assets)s ) AS n;
+
+        INSERT INTO laptops ( asset_id, laptop_model, laptop_serial_number, laptop_manufacturer,
+                              laptop_ram, laptop_cpu, laptop_storage )
+        SELECT asset_id, 'SYN MODEL', 'SN-' || asset_id, 'SYN', 8, 'SYN CPU', 256
+        FROM assets
+        WHERE asset_id LIKE 'SYN%%' AND asset_type = 'LAPTOP';
+
+        INSERT INTO books ( book_isbn, book_title, book_author, book_publisher, book_edition, book_year )
+        SELECT 'SYN-ISBN-' || n, 'Synthetic Title ' || n, 'Author ' || n, 'SYN', 1, 2020
+        FROM generate_series( 1, %(books)s ) AS n;
+
+        INSERT INTO book_assets ( asset_id, book_isbn, book_number )
+        SELECT asset_id, 'SYN-ISBN-' || ( 1 + ( k %% %(books)s ) ), asset_id
+        FROM ( SELECT asset_id, row_number() OVER ( ORDER BY asset_id ) AS k
+               FROM assets
+               WHERE asset_id LIKE 'SYN%%' AND asset_type = 'BOOK' ) AS book_copies;
+
+        INSERT INTO calculators ( asset_id, calculator_model, calculator_serial_number,
+                                  calculator_manufacturer, calculator_color )
+        SELECT asset_id, 'SYN CALC', 'SN-' || asset_id, 'SYN', 'BLACK'
+        FROM assets
+        WHERE asset_id LIKE 'SYN%%' AND asset_type = 'CALCULATOR';
+        """,
+        parameters )
+
+    # Each asset is issued, then returned, round after round; a round's
+    # ISSUED / RETURNED pair share an entity, and the last round of
+    # some assets is left ISSUED
+    log( f"Seeding {volumes.transactions} transactions..." )
+    cursor.execute(
+        """
+        INSERT INTO transactions ( transaction_id, entity_id, asset_id, transaction_type,
+                                   transaction_timestamp, transaction_user, transaction_notes )
+        SELECT %(transaction_base)s + n,
+               %(entity_base)s + 1 + ( ( asset_number * 7919 + ( round / 2 ) * 104729 ) %% %(incarcerated)s ),
+               'SYN' || lpad( asset_number::text, 7, '0' ),
+               ( CASE WHEN round %% 2 = 0 THEN 'ISSUED' ELSE 'RETURNED' END )::transaction_type,
+               TIMESTAMP '2020-01-01' + n * INTERVAL '1 minute',
+               'synthetic',
+               NULL
+        FROM ( SELECT n,
+                      ( n - 1 ) / %(assets)s      AS round,
+                      1 + ( n - 1 ) %% %(assets)s AS asset_number
+               FROM generate_series( 1, %(transactions)s ) AS n ) AS rounds;
+
+        INSERT INTO issued_assets ( asset_id, transaction_id )
+        SELECT latest.asset_id, latest.transaction_id
+        FROM ( SELECT DISTINCT ON ( t.asset_id ) t.asset_id, t.transaction_id, t.transaction_type
+               FROM transactions t
+               JOIN assets a ON a.asset_id = t.asset_id
+               WHERE t.transaction_user = 'synthetic'
+                 AND a.asset_type::text <> ALL( %(accessory_types)s::text[] )
+               ORDER BY t.asset_id, t.transaction_id DESC ) AS latest
+        WHERE latest.transaction_type = 'ISSUED';
+        """,
+        parameters )
+
+    if has_issued_accessories:
+        cursor.execute(
+            """
+            INSERT INTO issued_accessories ( asset_id, entity_id, transaction_id )
+            SELECT latest.asset_id, latest.entity_id, latest.transaction_id
+            FROM ( SELECT DISTINCT ON ( t.asset_id ) t.asset_id, t.entity_id, t.transaction_id, t.transaction_type
+                   FROM transactions t
+                   JOIN assets a ON a.asset_id = t.asset_id
+                   WHERE t.transaction_user = 'synthetic'
+                     AND a.asset_type::text = ANY( %(accessory_types)s::text[] )
+                   ORDER BY t.asset_id, t.transaction_id DESC ) AS latest
+            WHERE latest.transaction_type = 'ISSUED';
+            """,
+            parameters )
+
+    log( f"Seeding {volumes.documents} documents..." )
+    cursor.execute(
+        """
+        CREATE TEMPORARY TABLE synthetic_documents ON COMMIT DROP AS
+        SELECT %(document_base)s + row_number() OVER ( ORDER BY transaction_id ) AS document_id,
+               transaction_id,
+               transaction_timestamp
+        FROM ( SELECT transaction_id, transaction_timestamp
+               FROM transactions
+               WHERE transaction_user = 'synthetic' AND transaction_type = 'ISSUED'
+               ORDER BY md5( transaction_id::text )
+               LIMIT %(documents)s ) AS sampled;
+
+        INSERT INTO documents ( document_id, document_type, document_printed_timestamp,
+                                document_signed_timestamp, document_file_name )
+        SELECT document_id, 'AGREEMENT',
+               CASE WHEN document_id %% 20 = 0 THEN NULL ELSE transaction_timestamp + INTERVAL '1 day' END,
+               CASE WHEN document_id %% 20 = 0 THEN NULL ELSE transaction_timestamp + INTERVAL '1 day' END,
+               'synthetic_' || document_id || '.pdf'
+        FROM synthetic_documents;
+
+        INSERT INTO transaction_documents ( transaction_id, document_id )
+        SELECT transaction_id, document_id
+        FROM synthetic_documents;
+        """,
+        parameters )
+
+    log( f"Seeding {volumes.schedules} course schedules and {parameters['enrollments']} enrollments..." )
+    cursor.execute(
+        """
+        INSERT INTO courses ( course_id, course_prefix, course_code, course_name, course_credits )
+        SELECT %(course_base)s + n, 'SYN', ( 100 + n )::varchar, 'Synthetic Course ' || n, 5
+        FROM generate_series( 1, %(courses)s ) AS n;
+
+        INSERT INTO course_schedules ( schedule_id, course_id, course_start_date, course_end_date,
+                                       course_days, course_start_time, course_end_time,
+                                       course_location, course_instructor,
+                                       scheduled_quarter, scheduled_year )
+        SELECT %(schedule_base)s + n,
+               %(course_base)s + 1 + ( n %% %(courses)s ),
+               DATE '2024-01-08' + ( ( n / %(courses)s ) * 91 ) %% 364,
+               DATE '2024-03-22' + ( ( n / %(courses)s ) * 91 ) %% 364,
+               'MTWTh', TIME '08:00', TIME '10:00',
+               'ROOM ' || ( n %% 12 ), 'INSTRUCTOR ' || ( n %% 30 ),
+               ( ARRAY[ 'WINTER', 'SPRING', 'SUMMER', 'FALL' ] )[ 1 + ( n / %(courses)s ) %% 4 ],
+               2024
+        FROM generate_series( 1, %(schedules)s ) AS n;
+
+        INSERT INTO enrollments ( entity_id, schedule_id )
+        SELECT %(entity_base)s + 1 + ( n - 1 ) %% %(incarcerated)s,
+               %(schedule_base)s + 1 + ( ( n - 1 ) / %(incarcerated)s + n ) %% %(schedules)s
+        FROM generate_series( 1, %(enrollments)s ) AS n
+        ON CONFLICT DO NOTHING;
+        """,
+        parameters )
+
+    # Keep SERIAL columns ahead of the explicit ids used above
+    for ( table, column ) in ( ( "entities",         "entity_id"      ),
+                               ( "transactions",     "transaction_id" ),
+                               ( "documents",        "document_id"    ),
+                               ( "courses",          "course_id"      ),
+                               ( "course_schedules", "schedule_id"    ) ):
+        cursor.execute(
+            f"SELECT setval( pg_get_serial_sequence( '{table}', '{column}' ), "
+            f"( SELECT MAX( {column} ) FROM {table} ) );" )
+
+    cursor.execute( "SET LOCAL session_replication_role = DEFAULT;" )
+
+    # The asset_current_state triggers were skipped too (migration 002)
+    if table_exists( cursor, "asset_current_state" ):
+        log( "Rebuilding asset_current_state..." )
+        cursor.execute( "SELECT rebuild_asset_current_state();" )
+
+    log( "Analyzing..." )
+    cursor.execute( "ANALYZE;" )
+
+    return parameters
+
+
+def max_id( cursor, table: str, column: str ) -> int:
+    cursor.execute( f"SELECT COALESCE( MAX( {column} ), 0 ) FROM {table};" )
+    return cursor.fetchone()[0]
+
+
+def table_exists( cursor, table: str ) -> bool:
+    cursor.execute( "SELECT to_regclass( %s ) IS NOT NULL;", ( table, ) )
+    return cursor.fetchone()[0]
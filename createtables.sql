@@ -55,7 +55,7 @@ CREATE TABLE locations (
     UNIQUE (building, room_number)
 );
 
-CREATE TYPE asset_type AS ENUM ('LAPTOP', 'BOOK', 'CALCULATOR');
+CREATE TYPE asset_type AS ENUM ('LAPTOP', 'BOOK', 'CALCULATOR', 'CHARGER', 'HEADPHONES');
 
 CREATE TABLE asset_types (
     asset_type asset_type PRIMARY KEY,
@@ -66,7 +66,9 @@ INSERT INTO asset_types (asset_type, charge_limit)
 VALUES 
     ('LAPTOP', 1), 
     ('BOOK', NULL),
-    ('CALCULATOR', 1);
+    ('CALCULATOR', 1),
+    ('CHARGER', 1),
+    ('HEADPHONES', 1);
 
 CREATE TYPE asset_status AS ENUM ('IN_SERVICE', 'DECOMMISSIONED', 'OUT_FOR_REPAIR', 'MISSING', 'BROKEN');
 
@@ -98,6 +100,14 @@ CREATE TABLE issued_chargers (
     transaction_id INTEGER PRIMARY KEY REFERENCES transactions(transaction_id)
 );
 
+-- Chargers and headphones are issued alongside a laptop (or by themselves)
+CREATE TABLE issued_accessories (
+    asset_id VARCHAR(255) NOT NULL REFERENCES assets(asset_id),
+    entity_id INTEGER NOT NULL REFERENCES entities(entity_id),
+    transaction_id INTEGER NOT NULL REFERENCES transactions(transaction_id),
+    PRIMARY KEY (asset_id, entity_id, transaction_id)
+);
+
 CREATE TYPE document_type AS ENUM ('AGREEMENT', 'LABELS');
 
 CREATE TABLE documents (
@@ -217,3 +227,18 @@ CREATE TABLE enrollments (
     schedule_id INTEGER NOT NULL REFERENCES course_schedules(schedule_id),
     PRIMARY KEY (entity_id, schedule_id)
 );
+
+-- Secondary indexes for the app's hot lookup paths
+-- (existing databases get these from migrations/001_hot_path_indexes.sql)
+CREATE INDEX ix_transactions_asset_latest ON transactions (asset_id, transaction_timestamp DESC, transaction_id);
+CREATE INDEX ix_transactions_asset_history ON transactions (asset_id, transaction_id);
+CREATE INDEX ix_transactions_entity_history ON transactions (entity_id, transaction_id);
+CREATE INDEX ix_transaction_documents_document ON transaction_documents (document_id);
+CREATE INDEX ix_documents_unprinted ON documents (document_id) WHERE document_printed_timestamp IS NULL;
+CREATE INDEX ix_enrollments_schedule ON enrollments (schedule_id);
+CREATE INDEX ix_issued_assets_transaction ON issued_assets (transaction_id);
+CREATE INDEX ix_issued_accessories_entity ON issued_accessories (entity_id);
+
+-- asset_current_state (each asset's latest transaction, maintained by
+-- triggers) is created by migrations/002_asset_current_state.sql:
+-- run "python migrate.py" after creating the tables
@@ -14,14 +14,9 @@ SELECT
 
 FROM assets a
 LEFT JOIN laptops l ON a.asset_id = l.asset_id
-LEFT JOIN transactions t ON t.asset_id = a.asset_id
+-- each laptop's latest transaction (see migrations/002_asset_current_state.sql)
+LEFT JOIN asset_current_state t ON t.asset_id = a.asset_id
 LEFT JOIN incarcerated i ON t.entity_id = i.entity_id
 LEFT JOIN users u ON i.entity_id = u.entity_id
 WHERE a.asset_type = 'LAPTOP'
-AND (t.transaction_id IS NULL OR 
-	 t.transaction_timestamp = (
-	SELECT MAX(transaction_timestamp)
-	FROM transactions
-	WHERE asset_id = a.asset_id
-))
 ORDER BY a.asset_id ASC;
@@ -1,6 +1,6 @@
 SELECT *
 FROM
-(SELECT DISTINCT
+(SELECT
 	a.asset_id,
  	CASE
  		WHEN a.asset_type = 'LAPTOP' THEN 'Laptop'
@@ -25,34 +25,16 @@ FROM
 	CASE WHEN t_latest.transaction_type ='ISSUED' THEN i.doc_number ELSE NULL END AS doc_number,
 	CASE WHEN t_latest.transaction_type ='ISSUED' THEN u.last_name ELSE NULL END AS last_name,
 	CASE WHEN t_latest.transaction_type ='ISSUED' THEN u.first_name ELSE NULL END AS first_name,
-	CASE
- 		WHEN t_latest.transaction_type ='ISSUED' AND d.document_signed_timestamp IS NOT NULL THEN TRUE
- 		WHEN t_latest.transaction_type ='ISSUED' AND d.document_signed_timestamp IS NOT NULL THEN FALSE
-		ELSE NULL
- 	END AS agreement_signed,
+	CASE WHEN t_latest.transaction_type ='ISSUED' THEN t_latest.agreement_signed ELSE NULL END AS agreement_signed,
 	CASE WHEN t_latest.transaction_type ='ISSUED' THEN i.housing_unit ELSE NULL END AS housing_unit,
 	CASE WHEN t_latest.transaction_type ='ISSUED' THEN i.housing_cell ELSE NULL END AS housing_cell
 
 FROM assets a
 LEFT JOIN laptops l ON a.asset_id = l.asset_id
-LEFT JOIN (
-	SELECT
-		t1.asset_id,
-		t1,transaction_id,
-		t1.transaction_type,
-		t1.transaction_timestamp,
-		t1.entity_id
-	FROM transactions t1
-	WHERE t1.transaction_timestamp = (
-		SELECT MAX(t2.transaction_timestamp)
-		FROM transactions t2
-		WHERE t2.asset_id = t1.asset_id
-	)
-) t_latest ON t_latest.asset_id = a.asset_id
+-- each laptop's latest transaction (see migrations/002_asset_current_state.sql)
+LEFT JOIN asset_current_state t_latest ON t_latest.asset_id = a.asset_id
 LEFT JOIN incarcerated i ON t_latest.entity_id = i.entity_id
 LEFT JOIN users u ON i.entity_id = u.entity_id
-LEFT JOIN transaction_documents td ON t_latest.transaction_id = td.transaction_id
-LEFT JOIN documents d ON td.document_id = d.document_id
 WHERE a.asset_type = 'LAPTOP'
 AND a.asset_status != 'DECOMMISSIONED'
 ORDER BY a.asset_id ASC
@@ -1,12 +1,12 @@
 import os
 import sys
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
 import pdfkit
 import datetime
 from dateutil.relativedelta import relativedelta
 import base64
-from jinja2 import Template
 import subprocess
+import threading
 from main import Asset, Incarcerated, Calculator, Laptop, Book, Enrollment
 import tempfile
 
@@ -42,6 +42,25 @@ if AMS_WEBKIT_AVAILABLE:
 else:
     config = None
 
+
+# One Jinja2 environment per template directory, for the whole session: it
+# keeps compiled templates (re-loading one only when its file changes), and
+# the compiled bytecode is also cached on disk (in a per-user temp directory)
+# for the next session
+TEMPLATE_ENVIRONMENTS = {} # template directory: Environment
+TEMPLATE_LOCK = threading.Lock()
+
+def template_environment( template_directory: str ) -> Environment:
+    with TEMPLATE_LOCK:
+        if template_directory not in TEMPLATE_ENVIRONMENTS:
+            TEMPLATE_ENVIRONMENTS[template_directory] = Environment(
+                    loader=FileSystemLoader( template_directory ),
+                    bytecode_cache=FileSystemBytecodeCache(),
+                    auto_reload=True, # check each template's modification time when it's used
+            )
+        return TEMPLATE_ENVIRONMENTS[template_directory]
+
+
 def generate_pdf_from_template(
     template_path: str,
     output_path: str,
@@ -54,7 +73,7 @@ def generate_pdf_from_template(
         output_path (str): The file path where the output PDF should be saved.
         context (dict): A dictionary of variables to render the template.
     """
-    env = Environment(loader=FileSystemLoader(os.path.dirname(template_path)))
+    env = template_environment(os.path.dirname(template_path))
     template = env.get_template(os.path.basename(template_path))
     html = template.render(context)
     if config:
@@ -63,17 +82,66 @@ def generate_pdf_from_template(
         print( f"Warning: WebKit (still) not found. Skipping asset agreement (or schedule) print-out.")
         input( f"Press Enter to continue... " )
 
+# Encoded images, re-encoded only when the image file changes
+ENCODED_IMAGES = {} # image path: ( mtime_ns, size, base64 string )
+
 def encode_image_to_base64(
     image_path: str,
 ) -> str:
-    """Encodes an image to base64.
+    """Encodes an image to base64 (once, until the file changes).
     Args:
         image_path (str): The file path to the image.
     Returns:
         str: The base64 encoded string of the image.
     """
+    stat = os.stat(image_path)
+    with TEMPLATE_LOCK:
+        cached = ENCODED_IMAGES.get(image_path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
     with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode("utf-8")
+        encoded = base64.b64encode(image_file.read()).decode("utf-8")
+
+    with TEMPLATE_LOCK:
+        ENCODED_IMAGES[image_path] = (stat.st_mtime_ns, stat.st_size, encoded)
+    return encoded
+
+
+# Rendered footers (wkhtmltopdf reads them from a file), re-rendered only
+# when the footer template or its image changes
+RENDERED_FOOTERS = {} # template path: ( template, icon_logo, footer file path )
+
+def render_footer_file(
+    template_path: str,
+    icon_logo: str,
+) -> str:
+    """Renders a footer template to a temporary HTML file, once.
+    Args:
+        template_path (str): The file path to the footer's Jinja2 template.
+        icon_logo (str): The base64 encoded icon (see encode_image_to_base64).
+    Returns:
+        str: The footer file's path.
+    """
+    # get_template() returns the same Template until its file changes
+    template = template_environment(os.path.dirname(template_path)).get_template(os.path.basename(template_path))
+
+    with TEMPLATE_LOCK:
+        cached = RENDERED_FOOTERS.get(template_path)
+        if cached and cached[0] is template and cached[1] == icon_logo and os.path.exists(cached[2]):
+            return cached[2]
+
+    rendered_footer = template.render(icon_logo=icon_logo)
+    # Save rendered footer to a temporary file
+    with tempfile.NamedTemporaryFile(
+        delete=False, suffix=".html", mode="w+"
+    ) as temp_footer:
+        footer_file_path = temp_footer.name
+        temp_footer.write(rendered_footer)
+
+    with TEMPLATE_LOCK:
+        RENDERED_FOOTERS[template_path] = (template, icon_logo, footer_file_path)
+    return footer_file_path
 
 
 def generate_agreement(
@@ -94,17 +162,8 @@ def generate_agreement(
     quarter_end_date = quarter_end_date.strftime("%m/%d/%Y") # match 'date' format
 
     
-    # Load your footer template
-    with open( f"{CALLER_SCRIPT_DIRECTORY}\\templates\\agreement_footer.html", "r") as file:
-        footer_template = Template(file.read())
-
-    rendered_footer = footer_template.render(icon_logo=icon_logo)
-    # Save rendered footer to a temporary file
-    with tempfile.NamedTemporaryFile(
-        delete=False, suffix=".html", mode="w+"
-    ) as temp_footer:
-        footer_file_path = temp_footer.name
-        temp_footer.write(rendered_footer)
+    # Render your footer template (or re-use it, if nothing changed)
+    footer_file_path = render_footer_file( f"{CALLER_SCRIPT_DIRECTORY}\\templates\\agreement_footer.html", icon_logo )
 
     student_name = f"{incarcerated}"
     student_data = {"name": student_name, "doc_num": incarcerated.doc_number}
@@ -192,17 +251,8 @@ def generate_schedule(
             }
         )
 
-    # Load your footer template
-    with open( f"{CALLER_SCRIPT_DIRECTORY}\\templates\\schedule_footer.html", "r") as file:
-        footer_template = Template(file.read())
-
-    rendered_footer = footer_template.render(icon_logo=icon_logo)
-    # Save rendered footer to a temporary file
-    with tempfile.NamedTemporaryFile(
-        delete=False, suffix=".html", mode="w+"
-    ) as temp_footer:
-        footer_file_path = temp_footer.name
-        temp_footer.write(rendered_footer)
+    # Render your footer template (or re-use it, if nothing changed)
+    footer_file_path = render_footer_file( f"{CALLER_SCRIPT_DIRECTORY}\\templates\\schedule_footer.html", icon_logo )
 
     student_name = f"{incarcerated}"
     student_data = {"name": student_name, "doc_num": incarcerated.doc_number}
@@ -1,26 +1,95 @@
+from __future__ import annotations # so 'pd.DataFrame' annotations don't import pandas
+
+# 'python main.py --profile-startup' times every import made while starting up,
+# and prints the breakdown once the main menu is ready (see print_startup_profile)
+import builtins
+import importlib
+import sys
+import time
+
+STARTUP_STARTED = time.perf_counter()
+STARTUP_IMPORTS = [] # ( nesting depth, module name, seconds ), with --profile-startup
+PROFILE_STARTUP = "--profile-startup" in sys.argv
+
+BUILTIN_IMPORT  = builtins.__import__
+
+if PROFILE_STARTUP:
+    def profiled_import( name, globals=None, locals=None, fromlist=(), level=0,
+                         _import=BUILTIN_IMPORT, _depth=[ 0 ] ):
+        if level or name in sys.modules: # relative, or already loaded: nothing to time
+            return _import( name, globals, locals, fromlist, level )
+        _depth[0] += 1
+        started = time.perf_counter()
+        try:
+            return _import( name, globals, locals, fromlist, level )
+        finally:
+            _depth[0] -= 1
+            STARTUP_IMPORTS.append( ( _depth[0], name, time.perf_counter() - started ) )
+
+    builtins.__import__ = profiled_import
+
+
+class LazyModule:
+    """Stands in for a module that only some menu paths use, and imports it
+    the first time one of its attributes is used (so the main menu doesn't
+    wait for the signature, PDF, file dialog or pandas stacks)."""
+
+    def __init__( self, module_name: str ):
+        self._module_name = module_name
+        self._module      = None
+
+    def __getattr__( self, attribute: str ):
+        if self._module is None:
+            try:
+                self._module = importlib.import_module( self._module_name )
+            except ImportError as e:
+                raise ImportError(
+                        f"Unable to import '{self._module_name}': the Python packages are not properly installed " +
+                        f"(refer to 'README.md' to fix this problem): {e}" ) from e
+        return getattr( self._module, attribute )
+
+    def __repr__( self ) -> str:
+        state = "loaded" if self._module is not None else "not loaded yet"
+        return f"<LazyModule '{self._module_name}' ({state})>"
+
+
 # wrap all these imports in try/except, so we can report the error, pause, and exit
 try:
 
     from typing import Iterator, List, Tuple, Union
     import psycopg2
     import psycopg2.extras
-    import pandas as pd
+    import psycopg2.errors # for re-preparing lost / stale prepared statements
+    pd = LazyModule( "pandas" ) # reports, tables and CSV files
     import csv # for csv.DictReader
-    import tkinter as tk
+    tk = LazyModule( "tkinter" ) # file dialogs
     from enum import Enum
-    from tkinter import filedialog
+    filedialog = LazyModule( "tkinter.filedialog" )
     from ctypes import windll
     import os
     import sys
     import platform
+    import threading # connection pool locking
+    import asyncio   # concurrent lookups (see run_in_database_thread)
+    import concurrent.futures # database worker threads for asyncio
+    import collections # query log ring buffer
+    import functools   # query fingerprint cache
+    import json        # query log JSONL sink
     import re # for pattern matching and removing whitespace
-    import signature_capture
-    import generate_pdf # converts schedules / agreements to PDF file format
+    signature_capture = LazyModule( "signature_capture" ) # flet, pywin32, PIL, numpy
+    generate_pdf = LazyModule( "generate_pdf" ) # converts schedules / agreements to PDF file format (jinja2, pdfkit)
     import datetime
+    import decimal  # for validating numeric import values
+    import io       # for streaming bulk imports to 'COPY ... FROM STDIN'
     import base64   # for parameter annotations
     import warnings # used to ignore UserWarning from pandas
     import sys      # for working out this script's working directory
     import ast      # for literal_eval( ... ) to read lists / dicts for SQL queries
+    import copy     # report ':defaults' are copied for each run
+    import hashlib  # report catalog file hashes / result cache keys
+    import gzip     # report result cache files
+    import shutil   # copies report results into / out of the cache
+    import tempfile # default report result cache directory
     import config
 
 except ImportError as e:
@@ -37,6 +106,11 @@ except ImportError as e:
 SCRIPT_FILEPATH  = sys.argv[0]
 SCRIPT_DIRECTORY = os.path.dirname( SCRIPT_FILEPATH )
 
+# generate_pdf does 'from main import ...': when this script is running as
+# '__main__', let that find this module instead of running main.py a second time
+if __name__ == "__main__":
+    sys.modules.setdefault( "main", sys.modules[__name__] )
+
 if config.LIVE_DATABASE:
     VERSION_TITLE = f"{config.VERSION} -- EDU Database, as '{os.getlogin()}'"
 else:
@@ -121,9 +195,10 @@ def display_and_clear_error( error_message: str ) -> str:
     return ""
 
 
-# Function to connect to the PostgreSQL database
+# Function to open a brand-new connection to the PostgreSQL database
+# (everything else should call connect_to_database(), which uses the pool)
 if config.LIVE_DATABASE == True:
-    def connect_to_database() -> psycopg2.extras.DictConnection:
+    def open_database_connection() -> psycopg2.extras.DictConnection:
         conn = psycopg2.connect(
             connection_factory=psycopg2.extras.DictConnection,
             host=config.HOST,
@@ -133,7 +208,7 @@ if config.LIVE_DATABASE == True:
         )
         return conn
 else:
-    def connect_to_database() -> psycopg2.extras.DictConnection:
+    def open_database_connection() -> psycopg2.extras.DictConnection:
         conn = psycopg2.connect(
             connection_factory=psycopg2.extras.DictConnection,
             host=config.DEV_HOST,
@@ -144,12 +219,431 @@ else:
         return conn
 
 
+class PooledConnection:
+    """
+    A checked-out pool connection. Everything except close() is passed
+    through to the real DictConnection, so existing " conn.close() " calls
+    hand the connection back to the pool instead of hanging up on the server.
+    """
+    def __init__( self, pool: "ConnectionPool", connection: psycopg2.extras.DictConnection,
+                  acquire_ms: float = 0.0 ):
+        self._pool       = pool
+        self._connection = connection
+        self._acquire_ms = acquire_ms # reported with this checkout's first query
+
+    def cursor( self, *args, **kwargs ):
+        """Opens a cursor whose execute() calls are recorded in QUERY_LOG."""
+        if self._connection is None:
+            raise psycopg2.InterfaceError( "connection already returned to the pool" )
+        factory = kwargs.get( "cursor_factory" ) or self._connection.cursor_factory or psycopg2.extras.DictCursor
+        kwargs["cursor_factory"] = instrumented_cursor_factory( factory )
+        cursor = self._connection.cursor( *args, **kwargs )
+        cursor.ams_acquire_ms = self._acquire_ms
+        self._acquire_ms = 0.0
+        return cursor
+
+    def __getattr__( self, name ):
+        if self._connection is None:
+            raise psycopg2.InterfaceError( "connection already returned to the pool" )
+        return getattr( self._connection, name )
+
+    @property
+    def prepared_statements( self ) -> set:
+        """Names of the PreparedQuery statements already PREPAREd on this
+        server session (they outlive each checkout, until the pool closes it)."""
+        if self._connection is None:
+            raise psycopg2.InterfaceError( "connection already returned to the pool" )
+        if not hasattr( self._connection, "ams_prepared_statements" ):
+            self._connection.ams_prepared_statements = set()
+        return self._connection.ams_prepared_statements
+
+    @property
+    def closed( self ) -> int:
+        if self._connection is None:
+            return 1 # same meaning as psycopg2's " connection.closed "
+        return self._connection.closed
+
+    def close( self ) -> None:
+        if self._connection is not None:
+            self._pool.release( self._connection )
+            self._connection = None
+
+    def discard( self ) -> None:
+        """Hangs up instead of returning the connection to the pool (e.g. its
+        session state couldn't be cleaned up); the pool opens a new one."""
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            finally:
+                self.close() # a closed connection is dropped, not reused
+
+    # A few code paths return early without closing their connection;
+    # give it back when this wrapper is garbage-collected, so the slot isn't lost
+    def __del__( self ):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of database connections (see connect_to_database).
+        Checkout:
+            pool.connect() -> a PooledConnection; waits when 'max_size' are in use
+        Health check:
+            connections idle longer than 'health_check_after' seconds are
+            tested with " SELECT 1 " before they are handed out
+        Idle recycling:
+            connections idle longer than 'max_idle' seconds (beyond 'min_size')
+            or older than 'max_lifetime' seconds are closed
+        Counters:
+            pool.statistics() -> checkouts, waits, new connects, etc.
+    """
+    def __init__( self,
+                  min_size: int = 1, max_size: int = 4,
+                  max_idle: float = 300.0, max_lifetime: float = 3600.0,
+                  health_check_after: float = 30.0, checkout_timeout: float = 30.0 ):
+        self.min_size           = min_size
+        self.max_size           = max( max_size, 1 )
+        self.max_idle           = max_idle
+        self.max_lifetime       = max_lifetime
+        self.health_check_after = health_check_after
+        self.checkout_timeout   = checkout_timeout
+
+        self._idle      = [] # list of ( connection, created_at, idle_since ), newest last
+        self._created   = {} # id( connection ) -> created_at, for every open connection
+        self._condition = threading.Condition()
+
+        self.counters = {
+            "checkouts":             0, # connect_to_database() calls
+            "waits":                 0, # checkouts that had to wait for a free connection
+            "new_connects":          0, # TCP + authentication handshakes
+            "health_check_failures": 0, # idle connections found dead at checkout
+            "recycled":              0, # connections closed for being idle / too old
+        }
+
+    def connect( self ) -> PooledConnection:
+        started = time.perf_counter()
+
+        with self._condition:
+            self.counters["checkouts"] += 1
+        waited = False
+
+        while True:
+            idle = None
+            with self._condition:
+                while True:
+                    self._recycle_idle()
+
+                    if self._idle:
+                        idle = self._idle.pop() # health-checked below, outside of the lock
+                        break
+
+                    if len( self._created ) < self.max_size:
+                        # reserve the slot, so other threads count it against 'max_size'
+                        placeholder = object()
+                        self._created[ id( placeholder ) ] = time.monotonic()
+                        break # open a new connection (below, outside of the lock)
+
+                    if not waited:
+                        self.counters["waits"] += 1
+                        waited = True
+                    if not self._condition.wait( timeout=self.checkout_timeout ):
+                        raise psycopg2.OperationalError(
+                                f"Timed out after {self.checkout_timeout} seconds " +
+                                f"waiting for one of {self.max_size} pooled database connections." )
+
+            if idle is None:
+                break
+
+            # A slow or half-open connection only holds up this thread
+            ( connection, created_at, idle_since ) = idle
+            if self._is_healthy( connection, idle_since ):
+                return PooledConnection( self, connection, ( time.perf_counter() - started ) * 1000.0 )
+
+            with self._condition:
+                self.counters["health_check_failures"] += 1
+                self._created.pop( id( connection ), None )
+                self._condition.notify() # its slot is free again
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+        try:
+            connection = open_database_connection()
+        except Exception:
+            with self._condition:
+                del self._created[ id( placeholder ) ]
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            del self._created[ id( placeholder ) ]
+            self._created[ id( connection ) ] = time.monotonic()
+            self.counters["new_connects"] += 1
+
+        return PooledConnection( self, connection, ( time.perf_counter() - started ) * 1000.0 )
+
+    def release( self, connection: psycopg2.extras.DictConnection ) -> None:
+        # Callers that close() without commit() expect their work to be discarded
+        try:
+            if not connection.closed:
+                connection.rollback()
+        except Exception:
+            pass
+
+        with self._condition:
+            created_at = self._created.get( id( connection ) )
+            now = time.monotonic()
+            if connection.closed or created_at is None or now - created_at > self.max_lifetime:
+                if created_at is not None and not connection.closed:
+                    self.counters["recycled"] += 1
+                self._discard( connection )
+            else:
+                self._idle.append( ( connection, created_at, now ) )
+            self._condition.notify()
+
+    def close_all( self ) -> None:
+        with self._condition:
+            while self._idle:
+                self._discard( self._idle.pop()[0] )
+
+    def statistics( self ) -> dict:
+        with self._condition:
+            return self.counters | {
+                "open":   len( self._created ),
+                "idle":   len( self._idle ),
+                "in_use": len( self._created ) - len( self._idle ),
+            }
+
+    # called without self._condition (it may wait on the server)
+    def _is_healthy( self, connection, idle_since: float ) -> bool:
+        if connection.closed:
+            return False
+        if time.monotonic() - idle_since < self.health_check_after:
+            return True # recently used, so skip the extra round trip
+        try:
+            cursor = connection.cursor()
+            cursor.execute( "SELECT 1;" )
+            cursor.close()
+            connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    # caller holds self._condition
+    def _recycle_idle( self ) -> None:
+        now  = time.monotonic()
+        keep = []
+        # oldest-idle first, so the most recently used connections survive
+        for ( connection, created_at, idle_since ) in self._idle:
+            too_old  = now - created_at > self.max_lifetime
+            too_idle = now - idle_since > self.max_idle and len( self._created ) > self.min_size
+            if too_old or too_idle:
+                self.counters["recycled"] += 1
+                self._discard( connection )
+            else:
+                keep.append( ( connection, created_at, idle_since ) )
+        self._idle = keep
+
+    # caller holds self._condition
+    def _discard( self, connection ) -> None:
+        self._created.pop( id( connection ), None )
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+DATABASE_POOL = ConnectionPool(
+        min_size           = getattr( config, "POOL_MIN_SIZE",           1     ),
+        max_size           = getattr( config, "POOL_MAX_SIZE",           4     ),
+        max_idle           = getattr( config, "POOL_MAX_IDLE",           300.0 ),
+        max_lifetime       = getattr( config, "POOL_MAX_LIFETIME",       3600.0 ),
+        health_check_after = getattr( config, "POOL_HEALTH_CHECK_AFTER", 30.0  ),
+        checkout_timeout   = getattr( config, "POOL_CHECKOUT_TIMEOUT",   30.0  ),
+)
+
+
+class QueryLog:
+    """
+    Records every query run through a pooled connection's cursors.
+        Ring buffer:
+            the last 'size' queries, as dicts of fingerprint, duration_ms,
+            rows, acquire_ms (connection checkout time, on a checkout's first
+            query), caller (the app function that ran it) and timestamp
+        Session totals:
+            calls / total_ms / max_ms / rows per fingerprint, since start-up
+            (or clear()); top_queries() sorts them by total time
+        JSONL sink:
+            with 'jsonl_path', each query is also appended to that file
+    """
+    def __init__( self, size: int = 1000, jsonl_path: Union[ str, None ] = None ):
+        self.entries    = collections.deque( maxlen=size )
+        self.jsonl_path = jsonl_path
+        self._lock      = threading.Lock()
+        self._totals: dict = {} # fingerprint -> totals dict
+
+    def record( self, sql, duration_ms: float, rows: int, acquire_ms: float, caller: str ) -> None:
+        if isinstance( sql, bytes ):
+            sql = sql.decode( errors="replace" )
+        fingerprint = sql_fingerprint( sql if isinstance( sql, str ) else str( sql ) ) # str( psycopg2.sql.Composed )
+        entry = {
+            "timestamp":   time.time(),
+            "fingerprint": fingerprint,
+            "duration_ms": round( duration_ms, 3 ),
+            "rows":        rows,
+            "acquire_ms":  round( acquire_ms, 3 ),
+            "caller":      caller,
+        }
+
+        with self._lock:
+            self.entries.append( entry )
+
+            totals = self._totals.setdefault( fingerprint, {
+                    "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "callers": set() } )
+            totals["calls"]    += 1
+            totals["total_ms"] += duration_ms
+            totals["max_ms"]    = max( totals["max_ms"], duration_ms )
+            totals["rows"]     += max( rows, 0 )
+            totals["callers"].add( caller )
+
+            if self.jsonl_path:
+                try:
+                    with open( self.jsonl_path, "a" ) as jsonl_file:
+                        jsonl_file.write( json.dumps( entry ) + "\n" )
+                except OSError:
+                    self.jsonl_path = None # don't fail (or retry) every query
+
+    def top_queries( self, limit: int = 15 ) -> List[ dict ]:
+        with self._lock:
+            ranked = sorted( self._totals.items(), key=lambda item: item[1]["total_ms"], reverse=True )
+            return [ { "fingerprint": fingerprint,
+                       "calls":       totals["calls"],
+                       "total_ms":    round( totals["total_ms"], 1 ),
+                       "mean_ms":     round( totals["total_ms"] / totals["calls"], 2 ),
+                       "max_ms":      round( totals["max_ms"], 1 ),
+                       "rows":        totals["rows"],
+                       "callers":     ", ".join( sorted( totals["callers"] ) ) }
+                     for ( fingerprint, totals ) in ranked[ :limit ] ]
+
+    def clear( self ) -> None:
+        with self._lock:
+            self.entries.clear()
+            self._totals.clear()
+
+
+QUERY_LOG = QueryLog(
+        size       = getattr( config, "QUERY_LOG_SIZE", 1000 ),
+        jsonl_path = getattr( config, "QUERY_LOG_FILE", None ),
+)
+
+# Functions (and modules) between the app's code and cursor.execute(), which
+# are skipped when looking for the function that ran a query
+QUERY_LOG_SKIP_FUNCTIONS = { "execute", "executemany", "fetch_row", "fetch_rows", "fetch_prepared_row" }
+QUERY_LOG_SKIP_MODULES   = ( "psycopg2", "pandas" )
+
+
+# Function reduces a SQL statement to its shape, so the same query with
+# different literals / parameters is counted together
+@functools.lru_cache( maxsize=1024 )
+def sql_fingerprint( sql: str ) -> str:
+    fingerprint = re.sub( r"--[^\n]*", " ", sql )                       # comments
+    fingerprint = re.sub( r"'(?:[^']|'')*'", "?", fingerprint )          # 'strings'
+    fingerprint = re.sub( r"%\(\w+\)s|%s|\$\d+", "?", fingerprint )        # parameters
+    fingerprint = re.sub( r"\b\d+(?:\.\d+)?\b", "?", fingerprint )        # numbers
+    return " ".join( fingerprint.split() )
+
+
+# Function names the app function that (directly or via a helper) ran a query
+def query_caller() -> str:
+    frame = sys._getframe( 2 )
+    while frame is not None and (
+            frame.f_code.co_name in QUERY_LOG_SKIP_FUNCTIONS or
+            frame.f_globals.get( "__name__", "" ).startswith( QUERY_LOG_SKIP_MODULES ) ):
+        frame = frame.f_back
+    return frame.f_code.co_name if frame is not None else "?"
+
+
+# Function returns a subclass of a cursor class (DictCursor, etc.) that
+# times each execute() and records it in QUERY_LOG
+@functools.lru_cache( maxsize=None )
+def instrumented_cursor_factory( factory ):
+
+    class InstrumentedCursor( factory ):
+        ams_acquire_ms = 0.0
+
+        def execute( self, query, vars=None ):
+            started = time.perf_counter()
+            try:
+                return super().execute( query, vars )
+            finally:
+                QUERY_LOG.record( query, ( time.perf_counter() - started ) * 1000.0,
+                                  self.rowcount, self.ams_acquire_ms, query_caller() )
+                self.ams_acquire_ms = 0.0
+
+        def executemany( self, query, vars_list ):
+            started = time.perf_counter()
+            try:
+                return super().executemany( query, vars_list )
+            finally:
+                QUERY_LOG.record( query, ( time.perf_counter() - started ) * 1000.0,
+                                  self.rowcount, self.ams_acquire_ms, query_caller() )
+                self.ams_acquire_ms = 0.0
+
+    InstrumentedCursor.__name__ = f"Instrumented{factory.__name__}"
+    return InstrumentedCursor
+
+
+# Function to connect to the PostgreSQL database (checks out a pooled
+# connection; " conn.close() " returns it to the pool for the next caller)
+def connect_to_database() -> psycopg2.extras.DictConnection:
+    return DATABASE_POOL.connect() # type:ignore -- PooledConnection acts like a DictConnection
+
+
+# Async data access: coroutine versions of the lookups ( Entity.from_id_async,
+# Incarcerated.from_doc_async, Asset.from_id_async, Entity.assets_async, ... )
+# run the existing psycopg2 code on these worker threads, each on its own
+# pooled connection, so independent lookups can be awaited together with
+# asyncio.gather(). Menu code stays synchronous and calls run_async().
+DATABASE_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+        max_workers        = DATABASE_POOL.max_size, # more threads would only wait for a connection
+        thread_name_prefix = "ams_database",
+)
+
+
+# Coroutine: runs a blocking database function on a DATABASE_EXECUTOR thread
+async def run_in_database_thread( function, *args, **kwargs ):
+    return await asyncio.get_running_loop().run_in_executor(
+            DATABASE_EXECUTOR, functools.partial( function, *args, **kwargs ) )
+
+
+# Sync facade: runs a coroutine (e.g. asyncio.gather( ... )) to completion
+def run_async( coroutine ):
+    return asyncio.run( coroutine )
+
+
 def print_title(
     title: str,
     color: Color = Color.WHITE,
     width: int = 0,
     print_bottom_border: bool = True,
 ) -> None:
+    sys.stdout.write("\n".join(format_title(title, color, width, print_bottom_border)) + "\n")
+
+    return
+
+
+# Returns print_title()'s lines, so print_table() can write its title and
+# rows together
+def format_title(
+    title: str,
+    color: Color = Color.WHITE,
+    width: int = 0,
+    print_bottom_border: bool = True,
+) -> List[str]:
     # Get the minimum width required to fit the title
     if width == 0 or width < len(title) + 4:
         width = len(title) + 4  # +4 for padding on both sides
@@ -158,15 +652,17 @@ def print_title(
     centered_title = " {:^{}} ".format(title, width - 4)
     colored_title = color.value + centered_title + Color.DEFAULT.value
 
-    # Print the main title
-    print("┌" + "─" * (width - 2) + "┐")
-    print("│" + colored_title + "│")
+    # The main title
+    lines = [
+        "┌" + "─" * (width - 2) + "┐",
+        "│" + colored_title + "│",
+    ]
 
-    # Optionally print the bottom border
+    # Optionally add the bottom border
     if print_bottom_border:
-        print("└" + "─" * (width - 2) + "┘")
+        lines.append("└" + "─" * (width - 2) + "┘")
 
-    return
+    return lines
 
 
 # May throw a 'ValueError' exception
@@ -179,16 +675,23 @@ def print_table(
     alignment: Alignment = Alignment.LEFT,
     print_headers: bool = True,
 ) -> None:
+    """
+    Prints a DataFrame as a box-drawn table. Each column is converted to
+    strings once (vectorized), and the whole table is written at once.
+    """
     # Determine headers to use for calculating widths
     headers = df.columns if print_headers else range(df.shape[1])
 
+    # Convert each column to strings, once
+    cells = [df.iloc[:, i].astype(str) for i in range(df.shape[1])]
+
     # Handle case when DataFrame is empty
     if df.empty:
         column_widths = [10 for _ in headers]  # Set a default width for each column
     else:
         # Calculate the maximum width required for each column including padding
         column_widths = [
-            max(len(str(x)) for x in df.iloc[:, i]) + 2 for i in range(len(headers))
+            int(cells[i].str.len().max()) + 2 for i in range(len(headers))
         ]  # +2 for padding on both sides
 
     # Adjust the width of the last column based on max_width (or vice versa)
@@ -204,22 +707,21 @@ def print_table(
     if max_width != 0 and total_width > max_width:
         raise ValueError("Table width exceeds the specified maximum width")
 
-    # Print the top border (with or without title)
+    lines = []
+
+    # The top border (with or without title)
     if title != "":
-        print_title(title, title_color, total_width, print_bottom_border=False)
+        lines += format_title(title, title_color, total_width, print_bottom_border=False)
 
-        # Print the separator with intersections
-        print(
-            "├" + "┬".join("─" * w for w in column_widths) + "┤"
-        )  # Separator with intersections
+        # The separator with intersections
+        lines.append("├" + "┬".join("─" * w for w in column_widths) + "┤")
     else:
-        print(
-            "┌" + "┬".join("─" * w for w in column_widths) + "┐"
-        )  # Top border with intersections
+        # Top border with intersections
+        lines.append("┌" + "┬".join("─" * w for w in column_widths) + "┐")
 
     if print_headers:
-        # Print column headers with padding
-        header_row = (
+        # Column headers with padding
+        lines.append(
             "│"
             + "│".join(
                 " {:{}{}} ".format(col, alignment.value, column_widths[i] - 2)
@@ -227,25 +729,32 @@ def print_table(
             )
             + "│"
         )
-        print(header_row)
 
         # Separator under headers
-        print("├" + "┼".join("─" * w for w in column_widths) + "┤")
-
-    # Print each data row with padding
-    for _, row in df.iterrows():
-        row_str = (
-            "│"
-            + "│".join(
-                " {:{}{}} ".format(str(row[col]), alignment.value, column_widths[i] - 2)
-                for i, col in enumerate(df.columns)
-            )
-            + "│"
-        )
-        print(row_str)
-
-    # Print the bottom border
-    print("└" + "┴".join("─" * w for w in column_widths) + "┘")
+        lines.append("├" + "┼".join("─" * w for w in column_widths) + "┤")
+
+    # Each data row with padding: pad whole columns, then join them row-wise
+    if len(df) > 0:
+        pad_side = {Alignment.LEFT: "right", Alignment.RIGHT: "left", Alignment.CENTER: "both"}
+        padded = []
+        for i, column in enumerate(cells):
+            width = column_widths[i] - 2
+            padded_column = column.str.pad(width, side=pad_side[alignment])
+            if alignment == Alignment.CENTER and width % 2 == 1:
+                # str.format's '^' always puts an odd space on the right; str.pad
+                # (like str.center) puts it on the left when the width is odd
+                odd = (width - column.str.len()) % 2 == 1
+                padded_column = padded_column.where(~odd, padded_column.str[1:] + " ")
+            padded.append(" " + padded_column + " ")
+        rows = padded[0]
+        for column in padded[1:]:
+            rows = rows + "│" + column
+        lines += ("│" + rows + "│").tolist()
+
+    # The bottom border
+    lines.append("└" + "┴".join("─" * w for w in column_widths) + "┘")
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
     return
 
@@ -468,6 +977,166 @@ class Schedule( EduDbObject ): pass    # type:ignore
 class Enrollment( EduDbObject ): pass  # type:ignore
 
 
+class SessionCache:
+    """
+    Identity map for one issue / return session, so redrawing the screen
+    doesn't re-read the same Incarcerated, Asset and Transaction rows.
+        Session scope:
+            SESSION_CACHE.begin() / SESSION_CACHE.end() (see @with_session_cache);
+            outside of a session, every lookup goes to the database
+        Keys:
+            ( kind, key ): 'entity' / 'doc_number' / 'asset' / 'transaction' /
+            'entity_assets' with ( class name, entity_id / doc_number / asset_id /
+            transaction_id ) keys
+        Invalidation:
+            invalidate_for_write( entity_id, asset_id ) after this process writes
+            a transaction; entries older than 'ttl' seconds are re-read, because
+            other workstations may have changed them
+        Statistics:
+            statistics() -> hits / misses per kind and round trips saved
+    """
+    def __init__( self, ttl: float = 30.0 ):
+        self.ttl     = ttl
+        self.active  = False
+        self._lock   = threading.Lock()
+        self._entries: dict = {} # ( kind, key ) -> ( value, stored_at )
+        self.hits:     dict = {} # kind -> count
+        self.misses:   dict = {} # kind -> count
+        self.writes  = 0         # transactions written during this session
+
+    def begin( self ) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits   = {}
+            self.misses = {}
+            self.writes = 0
+            self.active = True
+
+    def end( self ) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.active = False
+
+    def get( self, kind: str, key ):
+        if not self.active:
+            return None
+
+        with self._lock:
+            entry = self._entries.get( ( kind, key ) )
+            if entry is not None and time.monotonic() - entry[1] > self.ttl:
+                del self._entries[ ( kind, key ) ] # stale; re-read it
+                entry = None
+
+            if entry is None:
+                self.misses[kind] = self.misses.get( kind, 0 ) + 1
+                return None
+
+            self.hits[kind] = self.hits.get( kind, 0 ) + 1
+            return entry[0]
+
+    def put( self, kind: str, key, value ) -> None:
+        if not self.active or value is None:
+            return # never cache a failed lookup
+
+        with self._lock:
+            self._entries[ ( kind, key ) ] = ( value, time.monotonic() )
+
+    def invalidate_for_write( self, entity_id: int = None, asset_id: str = None ) -> None:
+        """Drops every entry a new transaction for this entity / asset could change"""
+        with self._lock:
+            self.writes += 1
+            for ( kind, key ) in list( self._entries ):
+                if      ( asset_id  is not None and kind == 'asset'         and key[1] == asset_id ) or \
+                        ( entity_id is not None and kind == 'entity_assets' and key    == entity_id ):
+                    del self._entries[ ( kind, key ) ]
+
+    def statistics( self ) -> dict:
+        with self._lock:
+            hits   = sum( self.hits.values() )
+            misses = sum( self.misses.values() )
+            return {
+                "hits":   dict( self.hits ),
+                "misses": dict( self.misses ),
+                "round_trips_saved": hits,
+                "round_trips_saved_per_transaction": hits / self.writes if self.writes else float( hits ),
+                "hit_rate": hits / ( hits + misses ) if hits + misses else 0.0,
+            }
+
+
+SESSION_CACHE = SessionCache( ttl=getattr( config, "CACHE_TTL_SECONDS", 30.0 ) )
+
+
+# Decorator: runs an issue / return screen inside its own SESSION_CACHE session
+def with_session_cache( function ):
+    def wrapper( *args, **kwargs ):
+        SESSION_CACHE.begin()
+        try:
+            return function( *args, **kwargs )
+        finally:
+            SESSION_CACHE.end()
+    wrapper.__name__ = function.__name__
+    wrapper.__doc__  = function.__doc__
+    return wrapper
+
+
+class PreparedQuery:
+    """
+    A fixed " SELECT ... FROM ... WHERE ... " (an EduDbObject's DB_all_columns /
+    DB_tables / DB_criteria), compiled once at import and run as a named
+    server-side prepared statement. Each pooled connection PREPAREs it the
+    first time it runs there; after that the server skips parsing and
+    planning it. Classes whose queries have the same SQL share one statement.
+    """
+    registry: dict = {} # SQL text -> PreparedQuery
+
+    def __init__( self, name: str, sql: str ):
+        self.name = name
+        self.sql  = sql # for error messages
+
+        parameter_count = sql.count( "%s" )
+        numbers = iter( range( 1, parameter_count + 1 ) )
+        numbered_sql = re.sub( "%s", lambda _: f"${next( numbers )}", sql ) # %s ==> $1, $2, ...
+        self.prepare_sql = f"PREPARE {name} AS {numbered_sql};"
+        self.execute_sql = ( f"EXECUTE {name} ( {', '.join( [ '%s' ] * parameter_count )} );"
+                             if parameter_count else f"EXECUTE {name};" )
+
+    @classmethod
+    def compile( cls, name: str, selectClause: str, fromClause: str, whereClause: str ) -> "PreparedQuery":
+        # same whitespace clean-up as fetch_row(), done once instead of per call
+        ( selectClause, fromClause, whereClause ) = (
+                " ".join( re.split( '[\n ]+', clause.strip() ) )
+                for clause in ( selectClause, fromClause, whereClause ) )
+        sql = f"SELECT {selectClause} FROM {fromClause} WHERE {whereClause}"
+        if sql not in cls.registry:
+            cls.registry[sql] = cls( f"ams_{name}", sql )
+        return cls.registry[sql]
+
+    def execute( self, connection: PooledConnection, cursor, parameters ) -> None:
+        prepared = connection.prepared_statements
+        try:
+            if self.name not in prepared:
+                cursor.execute( self.prepare_sql )
+                prepared.add( self.name )
+            cursor.execute( self.execute_sql, parameters )
+
+        except ( psycopg2.errors.InvalidSqlStatementName, psycopg2.errors.FeatureNotSupported ) as e:
+            # The server lost the statement (e.g. " DEALLOCATE ALL "), or a
+            # schema change altered its result columns: prepare it again, once
+            connection.rollback()
+            prepared.discard( self.name )
+            if isinstance( e, psycopg2.errors.FeatureNotSupported ):
+                try:
+                    cursor.execute( f"DEALLOCATE PREPARE {self.name};" )
+                except psycopg2.errors.InvalidSqlStatementName:
+                    connection.rollback() # already gone
+            try:
+                cursor.execute( self.prepare_sql )
+                prepared.add( self.name )
+                cursor.execute( self.execute_sql, parameters )
+            except psycopg2.Error as retry_error:
+                raise retry_error from e # report both, not just the retry's error
+
+
 # TODO: Decide if this should be an instantiatable object,so we may have
 #       concurrent DB connections. First, evaluate SQLAlchemy's support
 #       for ORM and pandas' support for managing SQL queries.
@@ -494,6 +1163,17 @@ class EduDbObject:
     def __init__( self ):
         self.connection = None
         self.cursor     = None
+
+    # Each subclass' fixed lookups are compiled once, when the class is
+    # defined: DB_query ( by DB_criteria ) and DB_doc_query ( by DB_doc_criteria )
+    def __init_subclass__( cls, **kwargs ):
+        super().__init_subclass__( **kwargs )
+        if all( hasattr( cls, attribute ) for attribute in ( "DB_all_columns", "DB_tables", "DB_criteria" ) ):
+            cls.DB_query = PreparedQuery.compile(
+                    f"{cls.__name__.lower()}_by_id", cls.DB_all_columns, cls.DB_tables, cls.DB_criteria )
+        if hasattr( cls, "DB_doc_criteria" ):
+            cls.DB_doc_query = PreparedQuery.compile(
+                    f"{cls.__name__.lower()}_by_doc", cls.DB_all_columns, cls.DB_tables, cls.DB_doc_criteria )
     
 # TODO: Replace the existing conn/cur with these functions.
 #       [ This assumes DB queries are either atomic (class attributes)
@@ -513,14 +1193,14 @@ class EduDbObject:
     def disconnect( self ) -> bool:
         try:
 
-            if self.connection.__class__ is psycopg2.extras.DictConnection:
+            if self.connection is not None:
                 self.connection.commit()
 
-            if self.cursor.__class__ is psycopg2.extras.DictCursor:
+            if self.cursor is not None:
                 self.cursor.close()
                 self.cursor = None
 
-            if self.connection.__class__ is psycopg2.extras.DictConnection:
+            if self.connection is not None:
                 self.connection.close()
                 self.connection = None
 
@@ -528,14 +1208,14 @@ class EduDbObject:
         
         except Exception as e:
             # In case of error, roll back and report the failure
-            if self.connection.__class__ is psycopg2.extras.DictConnection:
+            if self.connection is not None:
                 self.connection.rollback()
 
-            if self.cursor.__class__ is psycopg2.extras.DictCursor:
+            if self.cursor is not None:
                 self.cursor.close()
                 self.cursor = None
 
-            if self.connection.__class__ is psycopg2.extras.DictConnection:
+            if self.connection is not None:
                 self.connection.close()
                 self.connection = None
 
@@ -548,21 +1228,21 @@ class EduDbObject:
 
     def commit( self ) -> bool:
         try:
-            if self.connection.__class__ is psycopg2.extras.DictConnection:
+            if self.connection is not None:
                 self.connection.commit()
 
             return True
         
         except Exception as e:
             # In case of error, roll back and report the failure
-            if self.connection.__class__ is psycopg2.extras.DictConnection:
+            if self.connection is not None:
                 self.connection.rollback()
                 
-            if self.cursor.__class__ is psycopg2.extras.DictCursor:
+            if self.cursor is not None:
                 self.cursor.close()
                 self.cursor = None
 
-            if self.connection.__class__ is psycopg2.extras.DictConnection:
+            if self.connection is not None:
                 self.connection.close()
                 self.connection = None
 
@@ -633,14 +1313,14 @@ class EduDbObject:
         
         except Exception as e:
             # In case of error, roll back and report the failure
-            if connection.__class__ is psycopg2.extras.DictConnection:
+            if connection is not None:
                 connection.rollback()
 
-            if cursor.__class__ is psycopg2.extras.DictCursor:
+            if cursor is not None:
                 cursor.close()
                 cursor = None
 
-            if connection.__class__ is psycopg2.extras.DictConnection:
+            if connection is not None:
                 connection.close()
                 connection = None
             
@@ -719,14 +1399,14 @@ class EduDbObject:
 
         except Exception as e:
             # In case of error, roll back and report the failure
-            if connection.__class__ is psycopg2.extras.DictConnection:
+            if connection is not None:
                 connection.rollback()
 
-            if cursor.__class__ is psycopg2.extras.DictCursor:
+            if cursor is not None:
                 cursor.close()
                 cursor = None
 
-            if connection.__class__ is psycopg2.extras.DictConnection:
+            if connection is not None:
                 connection.close()
                 connection = None
             
@@ -742,6 +1422,76 @@ class EduDbObject:
             return [] # empty list
 
 
+    @staticmethod
+    def fetch_prepared_row( query: PreparedQuery, parameters ) -> dict:
+        """Like fetch_row(), for a query compiled at import (see PreparedQuery)
+
+        Args:
+            query (PreparedQuery): e.g. Asset.DB_query
+            parameters:            its %s values, in order
+
+        Returns:
+            dict: the SQL results, in dictionary form (or 'None' if no data)
+        """
+
+        # initialize these, to make PyLance happy(-ier)
+        connection = None
+        cursor     = None
+
+        try:
+            connection = connect_to_database( )
+            cursor     = connection.cursor( cursor_factory=psycopg2.extras.DictCursor )
+
+            query.execute( connection, cursor, parameters )
+
+            data = cursor.fetchone()
+            # Being careful with the database cursor / connection
+            cursor.close()
+            cursor = None
+            connection.close()
+            connection = None
+
+            # return results as a dictionary
+            if data is not None:
+                return { key: data[key]  for  key in data.keys() }
+            else:
+                display_verbose_error(
+                        f"Warning: Data fetch from database failed (this might be OK):" +
+                        f"\n\tIf The Asset system crashes, restart it." +
+                        f"\nSAVE THIS INFORMATION: Database query follows:" +
+                        f"\n\tquery      ='{query.sql}'" +
+                        f"\n\tparameters ='{parameters}' ):" +
+                        f"\n\tNo data matches the given query and parameter(s)."
+                )
+                return None # no data
+
+        except Exception as e:
+            # In case of error, roll back and report the failure (the
+            # connection goes back to the pool even if the rollback fails)
+            try:
+                if connection is not None:
+                    connection.rollback()
+            except psycopg2.Error:
+                pass # release() hangs up on a broken connection
+            finally:
+                if cursor is not None and not cursor.closed:
+                    cursor.close()
+                cursor = None
+
+                if connection is not None:
+                    connection.close()
+                connection = None
+
+            display_verbose_error(
+                    f"Error: Exception in EduDbObject.fetch_prepared_row(" +
+                    f"\n\tquery      ='{query.name}: {query.sql}'" +
+                    f"\n\tparameters ='{parameters}' ):"
+                    , e
+            )
+
+            return None # no data
+
+
 class Entity( EduDbObject ):
 
     DB_columns = """
@@ -799,21 +1549,30 @@ class Entity( EduDbObject ):
         Returns:
             Entity: an Entity (sub-) class object
         """
-        data = EduDbObject.fetch_row(
-                cls.DB_all_columns, # SELECT
-                cls.DB_tables,      # FROM
-                cls.DB_criteria,    # WHERE
+        entity = SESSION_CACHE.get( 'entity', ( cls.__name__, entity_id ) )
+        if entity is not None:
+            return entity
+
+        data = EduDbObject.fetch_prepared_row(
+                cls.DB_query,       # SELECT DB_all_columns FROM DB_tables WHERE DB_criteria
                 ( entity_id, )      # entity_id = %s
                 )
         
         if data:
-            return cls( **data ) # type:ignore -- this always returns an Entity
+            entity = cls( **data ) # type:ignore -- this always returns an Entity
+            SESSION_CACHE.put( 'entity', ( cls.__name__, entity_id ), entity )
+            return entity
         else:
             display_verbose_error(
                     f"Error: {cls.__name__}.from_id( {entity_id} ): Unable " +
                     f"to find {cls.__name__} with entity ID '{entity_id}'." )
             return None
 
+    @classmethod
+    async def from_id_async( cls, entity_id: int ) -> Union[Entity, None]:
+        """Coroutine version of from_id() (see run_in_database_thread)"""
+        return await run_in_database_thread( cls.from_id, entity_id )
+
     # You can use this form: for asset in incarcerated.assets()
     # or this ........ form: issued_assets = list( incarcerated.assets() )
     def assets( self ) -> Iterator[ Union[Asset, Accessory, None ] ]:
@@ -825,87 +1584,131 @@ class Entity( EduDbObject ):
                 Asset (subclass) iterator of entity's ISSUED assets
             Note: 'Accessory' is a subclass of 'Asset'
         """
-        issued_assets_ids      = []
-        issued_accessories_ids = []
+        issued_assets = SESSION_CACHE.get( 'entity_assets', self.entity_id )
 
-        # initialize these, to make PyLance happy(-ier)
-        connection = None
-        cursor     = None
-
-        try:
-            connection = connect_to_database()
-            cursor  = connection.cursor( cursor_factory=psycopg2.extras.DictCursor )
+        if issued_assets is None:
+            issued_assets = Entity.assets_for_entities( [ self ] ).get( self.entity_id, [] )
+            SESSION_CACHE.put( 'entity_assets', self.entity_id, issued_assets )
 
-            # Check for issued assets (TODO: We can't use EduDbObject.fetch_row()
-            # for asset / accessory lists, because it returns just one row)
-            cursor.execute(
-                """
-                SELECT
-                    issued_assets.asset_id
-                FROM
-                    issued_assets,
-                    transactions
-                WHERE
-                    transactions.entity_id = %s
-                    AND transactions.transaction_id = issued_assets.transaction_id
-                """,
-                ( self.entity_id, )
-            )
+        for asset in issued_assets:
+            yield asset
 
-            issued_assets_ids = cursor.fetchall()
+    async def assets_async( self ) -> List[ Union[Asset, Accessory, None ] ]:
+        """Coroutine version of list( assets() ) (see run_in_database_thread)"""
+        return await run_in_database_thread( lambda: list( self.assets() ) )
 
-            # Check for issued accessories 
-            cursor.execute(
-                """
-                SELECT
-                    issued_accessories.entity_id,
-                    issued_accessories.asset_id
-                FROM
-                    issued_accessories
-                WHERE
-                    issued_accessories.entity_id = %s
-                """,
-                ( self.entity_id, )
-            )
+    @staticmethod
+    def assets_for_entities( entities: List[Entity] ) -> dict[ int, List[ Union[Asset, Accessory, None] ] ]:
+        """
+        Loads the ISSUED assets and accessories for one or more entities, using
+        a fixed number of queries (no matter how many assets they have)
+            Args:
+                entities (List[Entity]): entities to query
+            Returns:
+                dict: entity_id -> list of fully built Asset (subclass) objects,
+                      issued assets first, then issued accessories
+        """
+        entity_ids = [ entity.entity_id for entity in entities ]
+        issued     = { entity_id: [] for entity_id in entity_ids }
+
+        if not entity_ids:
+            return issued
+
+        # 1) Issued assets, with every subtype's columns (see Asset.from_row)
+        asset_rows = EduDbObject.fetch_rows(
+                f"""transactions.entity_id AS issued_entity_id,
+                    {Asset.DB_polymorphic_columns}""",                          # SELECT
+                f"""{Asset.DB_polymorphic_tables}
+                    JOIN issued_assets ON assets.asset_id = issued_assets.asset_id
+                    JOIN transactions  ON issued_assets.transaction_id = transactions.transaction_id""", # FROM
+                """transactions.entity_id = ANY( %s )
+                   ORDER BY transactions.transaction_id""",                     # WHERE
+                ( entity_ids, )
+        )
 
-            issued_accessories_ids = cursor.fetchall()
+        for row in asset_rows:
+            issued[ row["issued_entity_id"] ].append( Asset.from_row( row ) )
+
+        # 2) Issued accessories (chargers and headphones)
+        accessory_rows = EduDbObject.fetch_rows(
+                Accessory.DB_all_columns,                                       # SELECT
+                Accessory.DB_tables,                                            # FROM
+                """issued_accessories.entity_id = ANY( %s )
+                   AND issued_accessories.asset_id = assets.asset_id
+                   AND assets.asset_type = asset_types.asset_type
+                   ORDER BY issued_accessories.transaction_id""",               # WHERE
+                ( entity_ids, )
+        )
 
-            # close DB connection, before we switch to iteration
-            # (which can take a while ...)
-            cursor.close()
-            connection.close()
+        if not accessory_rows:
+            return issued
+
+        # 3) The accessories' ISSUED transactions, with each transaction's asset
+        transaction_ids = list( { row["transaction_id"] for row in accessory_rows } )
+        transaction_rows = EduDbObject.fetch_rows(
+                f"""transactions.transaction_id,
+                    transactions.transaction_type,
+                    transactions.transaction_timestamp,
+                    transactions.transaction_user,
+                    transactions.transaction_notes,
+                    transactions.entity_id AS transaction_entity_id,
+                    {Asset.DB_polymorphic_columns}""",                          # SELECT
+                f"""{Asset.DB_polymorphic_tables}
+                    JOIN transactions ON assets.asset_id = transactions.asset_id""", # FROM
+                "transactions.transaction_id = ANY( %s )",                      # WHERE
+                ( transaction_ids, )
+        )
 
-        except Exception as e:
-            display_verbose_error(
-                    f"Exception during {self.__class__.__name__}.assets( ):"
-                    , e
+        transactions = {}
+        for row in transaction_rows:
+            transactions[ row["transaction_id"] ] = Transaction(
+                    row["transaction_id"],
+                    row["transaction_entity_id"],
+                    Asset.from_row( row ),
+                    row["transaction_type"],
+                    row["transaction_timestamp"],
+                    row["transaction_user"],
+                    row["transaction_notes"],
             )
 
-            # In case of error, roll back and report the failure
-            if connection.__class__ is psycopg2.extras.DictConnection:
-                connection.rollback()
-
-            if cursor.__class__ is psycopg2.extras.DictCursor:
-                cursor.close()
-                cursor = None
-
-            if connection.__class__ is psycopg2.extras.DictConnection:
-                connection.close()
-                connection = None
+        # 4) Accessories are issued to Incarcerated individuals; reuse the
+        #    callers' objects and only query for the ones we don't have
+        holders = { entity.entity_id: entity  for  entity in entities  if isinstance( entity, Incarcerated ) }
+        missing_ids = list( { row["entity_id"] for row in accessory_rows } - holders.keys() )
+        if missing_ids:
+            for row in EduDbObject.fetch_rows(
+                    Incarcerated.DB_all_columns,                                # SELECT
+                    Incarcerated.DB_tables,                                     # FROM
+                    """incarcerated.entity_id = ANY( %s )
+                       AND incarcerated.entity_id = users.entity_id
+                       AND users.entity_id = entities.entity_id""",             # WHERE
+                    ( missing_ids, ) ):
+                holders[ row["entity_id"] ] = Incarcerated( **row )
+
+        accessory_classes = { 'CHARGER': Charger, 'HEADPHONES': Headphones }
+
+        for row in accessory_rows:
+            accessory_class = accessory_classes.get( row["asset_type"] )
+            if accessory_class is None:
+                display_verbose_error(
+                        f"Error: Entity.assets_for_entities(): " +
+                        f"asset:  '{ row['asset_id'] }', entity: '{ row['entity_id'] }' ): " +
+                        f"Don't know how to build a '{ row['asset_type'] }' class."
+                )
+                issued[ row["entity_id"] ].append( None )
+                continue
 
-        finally:
-            if not issued_assets_ids and not issued_accessories_ids:
-                return None
-            
-            for asset_id_data in issued_assets_ids:
-                yield Asset.from_id(
-                        asset_id_data[0] )
+            accessory = accessory_class(
+                    row["asset_id"], row["asset_type"], row["charge_limit"],
+                    row["asset_cost"], row["asset_status"],
+                    entity         = holders.get( row["entity_id"] ),
+                    entity_id      = row["entity_id"],
+                    transaction    = transactions.get( row["transaction_id"] ),
+                    transaction_id = row["transaction_id"],
+            )
+            issued[ row["entity_id"] ].append( accessory )
 
-            for accessory_id_data in issued_accessories_ids:
-                # Accessories are assets, too, with a different primary key
-                yield Accessory.from_ids(
-                        entity_id=accessory_id_data[0],
-                        asset_id =accessory_id_data[1]  ) # type:ignore - Accessory is a subclass of Asset!
+        return issued
 
 
 class User( Entity ):
@@ -1046,21 +1849,31 @@ class Incarcerated( User ):
         Returns:
             Incarcerated: an Incarcerated (sub-) class object
         """
-        data = EduDbObject.fetch_row(
-                cls.DB_all_columns,  # SELECT
-                cls.DB_tables,       # FROM
-                cls.DB_doc_criteria, # WHERE
-                ( doc_number, )           # doc_number = %s
+        entity = SESSION_CACHE.get( 'doc_number', ( cls.__name__, str( doc_number ) ) )
+        if entity is not None:
+            return entity
+
+        data = EduDbObject.fetch_prepared_row(
+                cls.DB_doc_query,    # SELECT DB_all_columns FROM DB_tables WHERE DB_doc_criteria
+                ( doc_number, )      # doc_number = %s
                 )
         
         if data:
-            return cls( **data )
+            entity = cls( **data )
+            SESSION_CACHE.put( 'doc_number', ( cls.__name__, str( doc_number ) ), entity )
+            SESSION_CACHE.put( 'entity',     ( cls.__name__, entity.entity_id ), entity )
+            return entity
         else:
             display_error(
                     f"Error: {cls.__name__}.from_doc( {doc_number} ): Unable " +
                     f"to find {cls.__name__} with DOC number '{doc_number}'." )
             return None # type:ignore -- there is no alternative
-            
+
+    @classmethod
+    async def from_doc_async( cls, doc_number: int ) -> Entity:
+        """Coroutine version of from_doc() (see run_in_database_thread)"""
+        return await run_in_database_thread( cls.from_doc, doc_number )
+
     def to_dataframe( self ) -> pd.DataFrame:
         """
         converts an Incarcerated to a pandas dataframe
@@ -1216,18 +2029,58 @@ class Asset( EduDbObject ):
         if asset_class:
             cls = asset_class
 
-        data = EduDbObject.fetch_row(
-                cls.DB_all_columns, # SELECT
-                cls.DB_tables,      # FROM
-                cls.DB_criteria,    # WHERE
-                ( asset_id, )       # entity_id = %s
+        asset = SESSION_CACHE.get( 'asset', ( cls.__name__, asset_id ) )
+        if asset is not None:
+            return asset
+
+        asset = cls._fetch_by_id( asset_id )
+        SESSION_CACHE.put( 'asset', ( cls.__name__, asset_id ), asset )
+        return asset
+
+    @classmethod
+    async def from_id_async( cls, asset_id: str, asset_class = None ) -> Union[ Asset, None ]:
+        """Coroutine version of from_id() (see run_in_database_thread)"""
+        return await run_in_database_thread( cls.from_id, asset_id, asset_class )
+
+    @classmethod
+    def _fetch_by_id( cls, asset_id: str ) -> Union[ Asset, None ]:
+        # A generic Asset lookup fetches the base row and every subtype's
+        # columns in one round trip (see Asset.DB_polymorphic_columns)
+        if cls.__name__ == "Asset":
+            data = EduDbObject.fetch_prepared_row(
+                    Asset.DB_polymorphic_query,    # SELECT / FROM / WHERE DB_polymorphic_*
+                    ( asset_id, )                  # asset_id = %s
+                    )
+
+            if not data:
+                display_verbose_error( f"Error: Unable to find a database record for Asset ID '{asset_id}'" )
+                return None
+
+            return Asset.from_row( data )
+
+        data = EduDbObject.fetch_prepared_row(
+                cls.DB_query,       # SELECT DB_all_columns FROM DB_tables WHERE DB_criteria
+                ( asset_id, )       # asset_id = %s
                 )
         
         # If there is no data, don't try to create an object
         if not data:
             display_verbose_error( f"Error: Unable to find a database record for {cls.__name__} ID '{asset_id}'" )
             return None
-        
+
+        return cls( **data ) # type:ignore instantiate the object
+
+    @staticmethod
+    def from_row( data: dict ) -> Union[ Asset, None ]:
+        """Instantiates the matching Asset subclass from a database row that
+        holds Asset.DB_polymorphic_columns (no further queries are run)
+
+        Args:
+            data (dict): one row, keyed by column names
+
+        Returns:
+            Asset: an Asset (sub-) class object (or 'None' for a broken asset)
+        """
         class_map = {
         'LAPTOP'       : Laptop,
         'BOOK'         : Book,
@@ -1236,23 +2089,38 @@ class Asset( EduDbObject ):
         'HEADPHONES'   : Headphones,
         }
 
-        if cls.__name__ == "Asset":
-            asset_type = data["asset_type"]
-            if asset_type not in class_map:
-                display_verbose_error(
-                        f"Error: Asset.from_id( {asset_id} ): " +
-                        f"Don't know how to build a " +
-                        f"'{ data['asset_type'] }' class."
-                )
-                # returning a generic asset is better than returning "None"
-                return Asset( **data ) # type:ignore - why is "Asset" not compatible with "Asset | None"
-            
-            # Use the asset_type class map to create a spcialized asset object
-            asset_class = class_map[asset_type]
-            asset = asset_class.from_id( asset_id ) # request class from ID            
-            return asset
+        # Each subtype table contributes a column that is only non-NULL when
+        # the asset has a row there (the old per-class queries joined them)
+        subtype_markers = {
+        'LAPTOP'       : 'laptop_asset_id',
+        'BOOK'         : 'book_isbn', # books.book_isbn, via book_assets
+        'CALCULATOR'   : 'calculator_asset_id',
+        }
 
-        return cls( **data ) # type:ignore instantiate the object
+        asset_id   = data["asset_id"]
+        asset_type = data["asset_type"]
+
+        if asset_type not in class_map:
+            display_verbose_error(
+                    f"Error: Asset.from_id( {asset_id} ): " +
+                    f"Don't know how to build a " +
+                    f"'{ data['asset_type'] }' class."
+            )
+            # returning a generic asset is better than returning "None"
+            return Asset( **data ) # type:ignore - why is "Asset" not compatible with "Asset | None"
+
+        asset_class = class_map[asset_type]
+
+        marker = subtype_markers.get( asset_type )
+        if marker and data.get( marker ) is None:
+            display_verbose_error( f"Error: Unable to find a database record for {asset_class.__name__} ID '{asset_id}'" )
+            return None
+
+        # Accessories built from just an asset ID are partial (not yet issued)
+        if issubclass( asset_class, Accessory ):
+            return asset_class( not_issued=True, **data )
+
+        return asset_class( **data )
 
     def to_dataframe( self ) -> pd.DataFrame:
         """
@@ -1294,6 +2162,14 @@ class Asset( EduDbObject ):
         [cf. Asset.issued_transaction(), which only returns currently ISSUED]
         """
         return asset_latest_transaction( self )
+
+    async def issued_transaction_async( self ) -> Transaction:
+        """Coroutine version of issued_transaction() (see run_in_database_thread)"""
+        return await run_in_database_thread( asset_issued_transaction, self )
+
+    async def last_transaction_async( self ) -> Transaction:
+        """Coroutine version of last_transaction() (see run_in_database_thread)"""
+        return await run_in_database_thread( asset_latest_transaction, self )
     
     def __str__( self ) -> str:
         """
@@ -1397,10 +2273,8 @@ class Accessory( Asset ):
         """
 
         # Query the related Asset fields for this mock-up object
-        data = EduDbObject.fetch_row(
-                Asset.DB_all_columns, # SELECT
-                Asset.DB_tables,      # FROM
-                Asset.DB_criteria,    # WHERE
+        data = EduDbObject.fetch_prepared_row(
+                Asset.DB_query,       # SELECT / FROM / WHERE Asset.DB_*
                 ( asset_id, )         # asset_id = %s
                 )
         
@@ -1427,10 +2301,8 @@ class Accessory( Asset ):
         Returns:
             Asset: an Asset (sub-) class object
         """
-        data = EduDbObject.fetch_row(
-                cls.DB_all_columns,      # SELECT
-                cls.DB_tables,           # FROM
-                cls.DB_criteria,         # WHERE
+        data = EduDbObject.fetch_prepared_row(
+                cls.DB_query,            # SELECT DB_all_columns FROM DB_tables WHERE DB_criteria
                 ( asset_id, entity_id, ) # asset_id = %s AND entity_id = %s
                 )
         
@@ -1783,6 +2655,33 @@ class Calculator( Asset ):
         return pd.DataFrame( asset_data )
 
 
+# Asset.from_id() builds any Asset subclass from a single query, by LEFT
+# JOIN-ing every subtype table onto the 'assets' row (only one of them matches).
+# These are assigned here, because they reuse each subclass' DB_columns.
+Asset.DB_polymorphic_columns = f"""
+        {Asset.DB_all_columns},
+        {Laptop.DB_columns},
+        {Book.DB_columns},
+        {Calculator.DB_columns},
+        laptops.asset_id     AS laptop_asset_id,
+        calculators.asset_id AS calculator_asset_id
+        """
+Asset.DB_polymorphic_tables = """
+        assets
+        JOIN      asset_types ON assets.asset_type     = asset_types.asset_type
+        LEFT JOIN laptops     ON assets.asset_id       = laptops.asset_id
+        LEFT JOIN book_assets ON assets.asset_id       = book_assets.asset_id
+        LEFT JOIN books       ON book_assets.book_isbn = books.book_isbn
+        LEFT JOIN calculators ON assets.asset_id       = calculators.asset_id
+        """
+Asset.DB_polymorphic_criteria = """
+        assets.asset_id = %s
+        """
+Asset.DB_polymorphic_query = PreparedQuery.compile(
+        "asset_polymorphic_by_id",
+        Asset.DB_polymorphic_columns, Asset.DB_polymorphic_tables, Asset.DB_polymorphic_criteria )
+
+
 class Document( EduDbObject ):
     def __init__( self,
                   document_id: int , document_type: str,
@@ -1824,6 +2723,10 @@ class Transaction( EduDbObject ):
                 transaction: the associated Transaction object
         """
 
+        transaction = SESSION_CACHE.get( 'transaction', transaction_id )
+        if transaction is not None:
+            return transaction
+
         conn = connect_to_database()
         cur  = conn.cursor( cursor_factory=psycopg2.extras.DictCursor )
 
@@ -1856,7 +2759,9 @@ class Transaction( EduDbObject ):
 
         kwargs = { key: data[key]  for  key in data.keys() }
         kwargs['asset'] = Asset.from_id( kwargs['asset_id'] )
-        return Transaction( **kwargs ) # pass in a dictionary
+        transaction = Transaction( **kwargs ) # pass in a dictionary
+        SESSION_CACHE.put( 'transaction', transaction_id, transaction )
+        return transaction
 
 
     def __str__( self ) -> str:
@@ -1942,7 +2847,6 @@ class Enrollment( EduDbObject ):
             Returns:
                 Enrollment objects iterator fro entity's current classes
         """
-        print("Getting enrollments for entity ID", entity_id)
         conn = connect_to_database()
         cur  = conn.cursor( cursor_factory=psycopg2.extras.DictCursor )
 
@@ -2165,11 +3069,84 @@ def on_signature_captured(
     signature_capture.signature_captured_event.set()
 
 
-def issue_assets() -> None:
+class IssuePrefetch:
+    """
+    Loads what the Issue Assets screen shows for a student on DATABASE_EXECUTOR
+    threads, starting as soon as their DOC validates: the Incarcerated row,
+    then ( concurrently ) their issued assets, unprinted documents and
+    current enrollments. The screen renders each result as it's needed,
+    so the operator isn't waiting on loads they haven't looked at yet.
+    """
+    def __init__( self, doc_number: str ):
+        self._loads: dict = {} # name -> Future, once the entity is known
+        self._loads_started = threading.Event()
+        self._entity = DATABASE_EXECUTOR.submit( Incarcerated.from_doc, doc_number )
+        self._entity.add_done_callback( self._start_loads )
+
+    # Runs on the worker thread that loaded the entity
+    def _start_loads( self, entity_future: concurrent.futures.Future ) -> None:
+        try:
+            entity = None if entity_future.exception() else entity_future.result()
+            if entity:
+                self._loads = {
+                    "assets":      DATABASE_EXECUTOR.submit( lambda: list( entity.assets() ) ),
+                    "documents":   DATABASE_EXECUTOR.submit( get_unprinted_documents_for_entity, entity.entity_id ),
+                    "enrollments": DATABASE_EXECUTOR.submit( current_enrollments, entity.entity_id ),
+                }
+        finally:
+            self._loads_started.set()
+
+    def entity( self ) -> Union[ Incarcerated, None ]:
+        try:
+            return self._entity.result()
+        except Exception as e:
+            display_verbose_error( "Exception during IssuePrefetch.entity():", e )
+            return None
+
+    def result( self, name: str, default=None, wait: bool = True ):
+        """Returns load 'name' ( waiting for it, unless wait=False ), or 'default'"""
+        self._loads_started.wait()
+        future = self._loads.get( name )
+        if future is None or ( not wait and not future.done() ):
+            return default
+        try:
+            return future.result()
+        except Exception as e:
+            display_verbose_error( f"Exception during IssuePrefetch.result( '{name}' ):", e )
+            return default
+
+
+# Function returns an entity's enrollments in classes that haven't ended yet
+def current_enrollments( entity_id: int ) -> List[ Enrollment ]:
+    today = datetime.date.today()
+    return [ enrollment  for  enrollment in ( Enrollment.from_entity_id( entity_id ) or [] )
+             if enrollment.course_end_date is None or enrollment.course_end_date >= today ]
+
+
+# Function to print an entity's current classes in table format
+def print_current_enrollments_table( enrollments: List[ Enrollment ] ) -> None:
+    enrollments_df = pd.DataFrame(
+        [ ( f"{enrollment.course_prefix} {enrollment.course_code}",
+            enrollment.course_name,
+            enrollment.course_end_date )  for  enrollment in enrollments ],
+        columns=[ "Course", "Name", "Ends" ]
+    )
+
+    print_table(
+        enrollments_df, "Current Classes", Color.BRIGHT_YELLOW, 100
+    )
+
+
+@with_session_cache
+def issue_assets( bulk: bool = False ) -> None:
     """
     Reads a DOC, displays student's existing assets (if any), then reads,
     validates, and (if OK) checks out a new asset(s).  When check-out is
     complete, prompts for a signature and prints a loan agreement.
+        Bulk mode:
+            scans are vetted and collected in a cart ( charge limits are
+            checked against the issued assets plus the cart, in memory ), and
+            the whole cart is issued in one transaction on 'ENTER'
         Catches:
             Any exception thrown during transaction document creation
     """
@@ -2177,7 +3154,7 @@ def issue_assets() -> None:
 
     while True:
         clear_screen_and_print_ams_title()
-        print_title("Issue Assets", Color.BRIGHT_YELLOW, 100)
+        print_title("Bulk Issue Assets" if bulk else "Issue Assets", Color.BRIGHT_YELLOW, 100)
         last_error = display_and_clear_error( last_error )
         issued_assets = [] # clear old list
 
@@ -2187,42 +3164,88 @@ def issue_assets() -> None:
         if not doc_num:
             break # back out to main menu
 
-        selected_entity = Incarcerated.from_doc( doc_num )
+        # Start loading the student's screen in the background
+        prefetch = IssuePrefetch( doc_num )
+
+        selected_entity = prefetch.entity()
 
         if not selected_entity:
             last_error = "Incarcerated Individual not found"
             continue
 
-        issued_assets = list( selected_entity.assets() )
+        issued_assets = prefetch.result( "assets", default=[] ) # needed to vet each scan
+        issued_any    = False
+        cart          = [] # bulk mode: ( asset, accessories ) scanned, but not yet issued
 
         while True:
+            cart_assets = [ item  for  ( asset, accessories ) in cart  for  item in [ asset ] + accessories ]
+
             clear_screen_and_print_ams_title()
             print_selected_incarcerated_in_table( selected_entity )
             print_issued_assets_table( issued_assets )
+            if bulk:
+                print_issued_assets_table( cart_assets, "Cart ( issued on 'ENTER' )" )
+
+            # Only shown once loaded; a later redraw picks it up
+            enrollments = prefetch.result( "enrollments", wait=False )
+            if enrollments:
+                print_current_enrollments_table( enrollments )
+
             print_title("Issue Asset", Color.BRIGHT_YELLOW, 100)
             last_error = display_and_clear_error( last_error )
 
-            new_asset_barcode = input_with_color( "Enter asset ID:" )
+            if bulk:
+                new_asset_barcode = input_with_color( "Enter asset ID ('-' removes the last scan, 'ENTER' issues the cart):" )
+            else:
+                new_asset_barcode = input_with_color( "Enter asset ID:" )
 
             # If there are no more assets to add, move on to signing and printing
             if not new_asset_barcode:
-                sign_and_print_documents( selected_entity, issued_assets )
+                if cart:
+                    if incarcerated_issue_assets_transaction( selected_entity, cart ) is None:
+                        last_error = f"Error: Unable to issue the cart to '{selected_entity}'. Nothing was issued."
+                        continue # keep the cart, so 'ENTER' can try again
+                    issued_assets.extend( cart_assets )
+                    issued_any = True
+
+                # The prefetched documents are current unless an issue created more
+                sign_and_print_documents( selected_entity, issued_assets,
+                                          None if issued_any else prefetch.result( "documents" ) )
                 break  # Break out of the loop if no asset ID was entered
-            
-            ( asset, last_error ) = asset_validate_from_barcode( new_asset_barcode, selected_entity, issued_assets )
+
+            if bulk and new_asset_barcode == "-":
+                if cart:
+                    cart.pop()
+                continue
+
+            # Charge limits count what's already issued, plus the cart
+            ( asset, last_error ) = asset_validate_from_barcode( new_asset_barcode, selected_entity, issued_assets + cart_assets )
 
             if last_error != "":
                 continue # print the error, and try again
+
+            if bulk:
+                if any( item.asset_id == asset.asset_id  for  item in cart_assets ):
+                    last_error = f"Error: Asset '{asset.asset_id}' is already in the cart."
+                    continue
+                cart.append( ( asset, scan_laptop_accessories( asset, issued_assets + cart_assets ) ) )
+                continue # nothing is written until 'ENTER'
             
             ( issued_success, last_error ) = issue_asset_to_entity( asset, selected_entity, issued_assets )
 
             # add the newly vetted asset to issued_assets
             if issued_success:
                 issued_assets.append( asset )
+                issued_any = True
 
 
-def sign_and_print_documents( entity: Incarcerated, issued_assets: List[ Asset ] ) -> None:
-    unprinted_documents = get_unprinted_documents_for_entity( entity.entity_id )
+def sign_and_print_documents(
+        entity: Incarcerated,
+        issued_assets: List[ Asset ],
+        unprinted_documents: Union[ list, None ] = None # already loaded (see IssuePrefetch)
+        ) -> None:
+    if not isinstance( unprinted_documents, list ): # not loaded ( or the load failed )
+        unprinted_documents = get_unprinted_documents_for_entity( entity.entity_id )
 
     # Filter for "AGREEMENT" type documents
     agreement_documents = [doc for doc in unprinted_documents if doc['document_type'] == 'AGREEMENT']
@@ -2245,7 +3268,16 @@ def sign_and_print_documents( entity: Incarcerated, issued_assets: List[ Asset ]
 
 
 def asset_validate_from_barcode( barcode: str, entity: Incarcerated, issued_assets: List[ Asset ] ) -> Tuple [ Union[ Asset, None ], str ]:
-    asset = Asset.from_id( barcode )
+    return run_async( asset_validate_from_barcode_async( barcode, entity, issued_assets ) )
+
+
+# The asset and its ISSUED transaction are looked up concurrently (they only
+# need the barcode), instead of one round trip after the other
+async def asset_validate_from_barcode_async( barcode: str, entity: Incarcerated, issued_assets: List[ Asset ] ) -> Tuple [ Union[ Asset, None ], str ]:
+    ( asset, issued_row ) = await asyncio.gather(
+            Asset.from_id_async( barcode ),
+            run_in_database_thread( asset_issued_transaction_row, barcode ),
+    )
 
     if not asset:
         return( None, f"Asset not found, for barcode '{barcode}'" )
@@ -2253,7 +3285,10 @@ def asset_validate_from_barcode( barcode: str, entity: Incarcerated, issued_asse
     if asset.asset_status != "IN_SERVICE":
         return( None, verbose_asset_status( asset ) )
 
-    transaction = asset.issued_transaction()
+    if isinstance( asset, Accessory ):
+        transaction = asset.issued_transaction() # accessories carry their own transaction
+    else:
+        transaction = transaction_from_issued_row( issued_row, asset )
 
     if transaction and transaction.entity_id != entity.entity_id:
         return( None, f"Error: Asset is currently issued to entity ID {transaction.entity_id}." )
@@ -2273,27 +3308,14 @@ def asset_validate_from_barcode( barcode: str, entity: Incarcerated, issued_asse
 
 def issue_asset_to_entity( asset: Asset, entity: Incarcerated, issued_assets: List[ Asset ] ) -> Tuple[ bool, str]:
     try:
-        transaction_id = incarcerated_create_asset_issue_transaction( asset, entity )
-        agreement_document_id = incarcerated_transaction_agreement_document( entity, transaction_id )
-
-        if asset.asset_type == 'LAPTOP':
-            create_laptop_labels( transaction_id )
-
-            for asset in issued_assets:
-                if isinstance( asset, Charger ):
-                    break
-            else: # charger not in issued_assets ==> add one
-                charger = issue_charger( transaction_id, entity )
-                if charger is not None:
-                    issued_assets.append( charger )
-
-            for asset in issued_assets:
-                if isinstance( asset, Headphones ):
-                    break
-            else: # headphones not in issued_assets ==> add one
-                headphones = issue_headphones( transaction_id, entity )
-                if headphones is not None:
-                    issued_assets.append( headphones )
+        accessories = scan_laptop_accessories( asset, issued_assets )
+
+        transaction = incarcerated_issue_asset_transaction( asset, entity, accessories )
+
+        if transaction is None:
+            return( False, f"Error: Unable to issue '{asset}' to '{entity}'. Nothing was issued." )
+
+        issued_assets.extend( accessories )
 
         return( True, Color.BRIGHT_GREEN.value + "Asset issued successfully!" + Color.DEFAULT.value )
 
@@ -2303,6 +3325,30 @@ def issue_asset_to_entity( asset: Asset, entity: Incarcerated, issued_assets: Li
                        f"\nException text: {e}" )
 
 
+# Function prompts for the charger (and headphones) a laptop goes out with,
+# unless the entity already has them. Nothing is written to the database here,
+# so the accessories can share the laptop's transaction.
+def scan_laptop_accessories( asset: Asset, issued_assets: List[ Asset ] ) -> List[ Accessory ]:
+    accessories = []
+
+    if asset.asset_type == 'LAPTOP':
+        for issued_asset in issued_assets:
+            if isinstance( issued_asset, Charger ):
+                break
+        else: # charger not in issued_assets ==> add one
+            accessories.append( scan_charger() )
+
+        for issued_asset in issued_assets:
+            if isinstance( issued_asset, Headphones ):
+                break
+        else: # headphones not in issued_assets ==> add one
+            headphones = scan_headphones()
+            if headphones is not None:
+                accessories.append( headphones )
+
+    return accessories
+
+
 def print_selected_incarcerated_in_table( selected_entity: Incarcerated ) -> None:
     """
     Convert student information into a table without column headers.
@@ -2323,12 +3369,13 @@ def print_selected_incarcerated_in_table( selected_entity: Incarcerated ) -> Non
 # Function to print all issued Assets in table format
 # Does not set 'last_error' or (directly) throw an exception
 # P.S. issued_assets = list(get_issued_assets_by_entity_id(selected_entity.entity_id))
-def print_issued_assets_table( issued_assets: List[ Asset ] ) -> None:
+def print_issued_assets_table( issued_assets: List[ Asset ], title: str = "Currently Issued Assets" ) -> None:
     """
     print issued assets list in table format
 
     Args:
         issued_assets (List[ Asset ]): a list of asset objects
+        title (str): the table's title
     """
     issued_assets_data = []
     for asset in issued_assets:
@@ -2342,7 +3389,7 @@ def print_issued_assets_table( issued_assets: List[ Asset ] ) -> None:
 
     # Use print_table to display the data
     print_table(
-        issued_assets_df, "Currently Issued Assets", Color.BRIGHT_YELLOW, 100
+        issued_assets_df, title, Color.BRIGHT_YELLOW, 100
     )
 
 
@@ -2353,6 +3400,13 @@ def print_issued_assets_table( issued_assets: List[ Asset ] ) -> None:
 def input_and_validate_doc() -> Tuple[ str, str ]:
 
     doc_num = input_with_color( "Enter DOC number:" )
+    return validate_doc( doc_num )
+
+
+# Function to validate a DOC typed or scanned elsewhere
+# Returns: Tuple( str doc_number, str error_message ), like input_and_validate_doc()
+def validate_doc( doc_num: str ) -> Tuple[ str, str ]:
+
     if not doc_num:
         return( "", "" ) # no doc, no error
 
@@ -2630,195 +3684,176 @@ def asset_validate( asset: Asset, issued_assets: List[ Asset ] ) -> Tuple[ bool,
     return ( False, "" ) # No problem, no error
 
 
-# Function creates new 'transactions' and 'issued_assets' rows in the DB
-# for issuing the given asset to the given entity
-#
-# TODO: Might be smart to safeguard against various bad things
-# TODO:   a) checking out an asset multiple times (to the same or different people)
-# TODO:   b) verifying accessories are checked out in their separate table
-# TODO:   c) other nefarious things I am overlooking at the moment...
-# TODO: Also, proper OOP would return a Transaction, not just its ID
-def incarcerated_create_asset_issue_transaction( asset: Asset, entity: Entity ) -> int:
+# Function issues an asset (plus any laptop accessories) to an entity, in one
+# database round trip (see incarcerated_issue_assets_transaction)
+def incarcerated_issue_asset_transaction(
+        asset: Asset,
+        entity: Entity,
+        accessories: List[ Accessory ] = []
+        ) -> Union[ Transaction, None ]:
     """
     Creates an 'ISSUED' transaction and inserts an asset or accessory into
-    its appropriate checked-out table. This function assumes the asset has 
-    already been vetted for checkout.
+    its appropriate checked-out table, along with its documents. This function
+    assumes the asset (and accessories) have already been vetted for checkout.
 
     Args:
         asset  (Asset) : the Asset to issue
         entity (Entity): the entity checking out the asset
-    """
-    try:
-        connection = connect_to_database()
-        cursor = connection.cursor( cursor_factory=psycopg2.extras.DictCursor )
-
-        cursor.execute(
-            """
-            INSERT INTO transactions ( entity_id, asset_id, transaction_type, transaction_notes ) 
-            VALUES ( %s, %s, %s, %s )
-            RETURNING transaction_id;
-            """,
-            ( entity.entity_id, asset.asset_id, 'ISSUED', f"Issued by '{os.getlogin()}'." ),
-        )
-    
-        transaction_id = cursor.fetchone()[0]
-
-        connection.commit() # Save the INSERT
-        
-        # Insert a record into issued_assets or issued_accessories
-        if isinstance( asset, Accessory ):
-            # Insert a record into issued_accessories and add entity / transaction to asset
-            cursor.execute(
-                """
-                INSERT INTO issued_accessories (asset_id, entity_id, transaction_id) 
-                VALUES (%s, %s, %s);
-                """,
-                ( asset.asset_id, entity.entity_id, transaction_id, ),
-            )
-            asset.issued_to   = entity
-            asset.transaction = Transaction.from_id( transaction_id )
-        else:
-            # Insert a record into issued_assets
-            cursor.execute(
-                """
-                INSERT INTO issued_assets (asset_id, transaction_id) 
-                VALUES (%s, %s);
-                """,
-                ( asset.asset_id, transaction_id, ),
-            )
-        
-        connection.commit() # Save the INSERT
-        cursor.close()
-        connection.close()
-        
-        return transaction_id
-    
-    except Exception as e:
-        # In case of error, roll back and report the failure
-        if connection is not None:
-            connection.rollback()
-        if cursor is not None:
-            cursor.close()
-        if connection is not None:
-            connection.close()
-        
-        # TODO: Make this look better (quote args & strip whitespace?)
-        display_verbose_error(
-                f"Exception in incarcerated_create_asset_issue_transaction(" + 
-                f"\n\t'{asset}',\n\t'{entity}' ):"
-                , e
-        )
-
-        return 0 # transaction ID == 0 flags an error
-    
-    return -1 # "You can't return from here"
-
-
-# TODO: Same issues as create_transaction_from_issuing...
-def incarcerated_transaction_agreement_document( entity: Incarcerated, transaction_id: int ) -> int:
-    try:
-        connection = connect_to_database()
-        cursor = connection.cursor( cursor_factory=psycopg2.extras.DictCursor )
-
-        cursor.execute(
-            """
-            SELECT d.document_id
-            FROM documents d
-            JOIN transaction_documents td ON d.document_id = td.document_id
-            JOIN transactions t ON td.transaction_id = t.transaction_id
-            WHERE
-                t.entity_id = %s
-                AND d.document_type = 'AGREEMENT'
-                AND d.document_printed_timestamp IS NULL
-            LIMIT 1;
-            """,
-            ( entity.entity_id, ),
-        )
+        accessories (List[Accessory]): chargers / headphones issued with it
 
-        existing_document = cursor.fetchone()
+    Returns:
+        Transaction: the new ISSUED transaction (or 'None', if nothing was issued)
+    """
+    transactions = incarcerated_issue_assets_transaction( entity, [ ( asset, accessories ) ] )
+    return transactions[0] if transactions else None
 
-        if existing_document:
-            agreement_document_id = existing_document[0]
-        else:
-            # Insert a new agreement document if there isn't an unprinted one
-            cursor.execute(
-                """
-                INSERT INTO documents (document_type)
-                VALUES ('AGREEMENT')
-                RETURNING document_id;
-                """,
-            )
-            agreement_document_id = cursor.fetchone()[0]
-            connection.commit() # Save the INSERT
 
-        # Link the document with the transaction
-        cursor.execute(
-            """
-            INSERT INTO transaction_documents (transaction_id, document_id)
-            VALUES (%s, %s);
-            """,
-            ( transaction_id, agreement_document_id, ),
-        )
+# Function issues a cart of assets (each with any laptop accessories) to an
+# entity, in one database round trip: a single statement with data-modifying
+# CTEs and multi-row INSERT ... SELECT FROM UNNEST( ... ) creates every
+# 'ISSUED' transaction, the issued_assets / issued_accessories rows, links
+# (or creates) the entity's unprinted AGREEMENT document to all of them, and
+# creates a LABELS document per laptop. It all commits together, or not at all.
+#
+# TODO: Might be smart to safeguard against various bad things
+# TODO:   a) checking out an asset multiple times (to the same or different people)
+# TODO:   b) other nefarious things I am overlooking at the moment...
+def incarcerated_issue_assets_transaction(
+        entity: Entity,
+        cart: List[ Tuple[ Asset, List[ Accessory ] ] ]
+        ) -> Union[ List[ Transaction ], None ]:
+    """
+    Creates an 'ISSUED' transaction per asset in the cart, and inserts each
+    asset or accessory into its appropriate checked-out table, along with
+    their documents. This function assumes everything in the cart has already
+    been vetted for checkout (and that no asset is in it twice).
 
-        connection.commit() # Save the INSERT
-        cursor.close()
-        connection.close()
+    Args:
+        entity (Entity): the entity checking out the assets
+        cart (List[Tuple[Asset, List[Accessory]]]): each asset to issue, with
+            the chargers / headphones issued alongside it
 
-        return agreement_document_id
-    
-    except Exception as e:
-        # In case of error, roll back and report the failure
-        if connection is not None:
-            connection.rollback()
-        if cursor is not None:
-            cursor.close()
-        if connection is not None:
-            connection.close()
-        
-        # TODO: Make this look better (quote args & strip whitespace?)
-        display_verbose_error(
-                f"Exception in incarcerated_transaction_agreement_document(" + 
-                f"\n\t'{entity}',\n\t'{transaction_id}' ):"
-                , e
-        )
+    Returns:
+        List[Transaction]: the new ISSUED transactions, in cart order (or
+            'None', if nothing was issued)
+    """
+    if not cart:
+        return []
 
-        return 0 # agreement document ID == 0 flags an error
+    # Accessories (including an accessory scanned by itself) share one table;
+    # each is tied to the transaction of the cart item it was issued with
+    accessory_ids        = []
+    accessory_parent_ids = []
+    for ( asset, accessories ) in cart:
+        for accessory in ( [ asset ] if isinstance( asset, Accessory ) else [] ) + accessories:
+            accessory_ids.append( accessory.asset_id )
+            accessory_parent_ids.append( asset.asset_id )
 
+    connection = None
+    cursor     = None
 
-# Function creates a laptop labels document in the database and
-# links it with the related transaction_id
-def create_laptop_labels( transaction_id: int ) -> None:
     try:
         connection = connect_to_database()
         cursor = connection.cursor( cursor_factory=psycopg2.extras.DictCursor )
 
         cursor.execute(
             """
-            INSERT INTO documents (document_type)
-            VALUES ('LABELS')
-            RETURNING document_id;
+            WITH cart AS (
+                SELECT *
+                FROM UNNEST( %(asset_ids)s::varchar[], %(is_accessory)s::boolean[], %(needs_labels)s::boolean[] )
+                     WITH ORDINALITY AS cart( asset_id, is_accessory, needs_labels, position )
+            ),
+            new_transactions AS (
+                INSERT INTO transactions ( entity_id, asset_id, transaction_type, transaction_notes )
+                SELECT %(entity_id)s, cart.asset_id, 'ISSUED', %(transaction_notes)s
+                FROM   cart
+                ORDER BY cart.position
+                RETURNING
+                    transaction_id, entity_id, asset_id, transaction_type,
+                    transaction_timestamp, transaction_user, transaction_notes
+            ),
+            new_issued_assets AS (
+                INSERT INTO issued_assets ( asset_id, transaction_id )
+                SELECT new_transactions.asset_id, new_transactions.transaction_id
+                FROM   new_transactions
+                JOIN   cart ON cart.asset_id = new_transactions.asset_id
+                WHERE  NOT cart.is_accessory
+            ),
+            new_issued_accessories AS (
+                INSERT INTO issued_accessories ( asset_id, entity_id, transaction_id )
+                SELECT accessory.accessory_id, new_transactions.entity_id, new_transactions.transaction_id
+                FROM   UNNEST( %(accessory_ids)s::varchar[], %(accessory_parent_ids)s::varchar[] )
+                           AS accessory( accessory_id, parent_id )
+                JOIN   new_transactions ON new_transactions.asset_id = accessory.parent_id
+            ),
+            unprinted_agreement AS (
+                SELECT d.document_id
+                FROM documents d
+                JOIN transaction_documents td ON d.document_id = td.document_id
+                JOIN transactions t ON td.transaction_id = t.transaction_id
+                WHERE
+                    t.entity_id = %(entity_id)s
+                    AND d.document_type = 'AGREEMENT'
+                    AND d.document_printed_timestamp IS NULL
+                LIMIT 1
+            ),
+            new_agreement AS (
+                INSERT INTO documents ( document_type )
+                SELECT 'AGREEMENT'::document_type
+                WHERE  NOT EXISTS ( SELECT 1 FROM unprinted_agreement )
+                RETURNING document_id
+            ),
+            agreement AS (
+                SELECT document_id FROM unprinted_agreement
+                UNION ALL
+                SELECT document_id FROM new_agreement
+            ),
+            cart_labels AS (
+                -- IDs are drawn up front, so each LABELS document can be tied to its laptop
+                SELECT cart.asset_id, nextval( pg_get_serial_sequence( 'documents', 'document_id' ) ) AS document_id
+                FROM   cart
+                WHERE  cart.needs_labels
+            ),
+            new_labels AS (
+                INSERT INTO documents ( document_id, document_type )
+                SELECT document_id, 'LABELS'::document_type
+                FROM   cart_labels
+            ),
+            new_transaction_documents AS (
+                INSERT INTO transaction_documents ( transaction_id, document_id )
+                SELECT new_transactions.transaction_id, agreement.document_id
+                FROM   new_transactions, agreement
+                UNION ALL
+                SELECT new_transactions.transaction_id, cart_labels.document_id
+                FROM   new_transactions
+                JOIN   cart_labels ON cart_labels.asset_id = new_transactions.asset_id
+            )
+            SELECT
+                new_transactions.*,
+                ( SELECT document_id FROM agreement ) AS agreement_document_id,
+                cart_labels.document_id               AS labels_document_id
+            FROM new_transactions
+            JOIN cart ON cart.asset_id = new_transactions.asset_id
+            LEFT JOIN cart_labels ON cart_labels.asset_id = new_transactions.asset_id
+            ORDER BY cart.position;
             """,
+            {
+                'entity_id':            entity.entity_id,
+                'transaction_notes':    f"Issued by '{os.getlogin()}'.",
+                'asset_ids':            [ asset.asset_id                   for ( asset, _ ) in cart ],
+                'is_accessory':         [ isinstance( asset, Accessory )   for ( asset, _ ) in cart ],
+                'needs_labels':         [ asset.asset_type == 'LAPTOP'     for ( asset, _ ) in cart ],
+                'accessory_ids':        accessory_ids,
+                'accessory_parent_ids': accessory_parent_ids,
+            },
         )
 
-        labels_document_id = cursor.fetchone()[0]
-
-        connection.commit() # Save the INSERT
-
-        # Link labels document with the transaction
-        cursor.execute(
-            """
-            INSERT INTO transaction_documents (transaction_id, document_id)
-            VALUES (%s, %s);
-            """,
-            ( transaction_id, labels_document_id, ),
-        )
+        rows = cursor.fetchall()
 
-        connection.commit() # Save the INSERT
+        connection.commit() # Save every INSERT, together
         cursor.close()
         connection.close()
 
-        return
-    
     except Exception as e:
         # In case of error, roll back and report the failure
         if connection is not None:
@@ -2827,129 +3862,75 @@ def create_laptop_labels( transaction_id: int ) -> None:
             cursor.close()
         if connection is not None:
             connection.close()
-        
+
         # TODO: Make this look better (quote args & strip whitespace?)
         display_verbose_error(
-                f"Exception in create_laptop_labels( '{transaction_id}' ):"
+                f"Exception in incarcerated_issue_assets_transaction(" +
+                f"\n\t'{entity}',\n\t'{[ str( asset ) for ( asset, _ ) in cart ]}',\n\t'{accessory_ids}' ):"
                 , e
         )
 
-        return
-
-
-def issue_charger( transaction_id: int, entity: Entity ) -> Charger:
-    """
-    Issues an entity a charger, using the transaction_id (presumably
-    from the associated laptop check-out).  This function assumes the entity
-    has been vetted and does not already have a charger. If they already have
-    a charger, this function will print an error message.
-    """
-    try:
-        while True:
-            charger_barcode = input_with_color( "Please, scan the charger barcode for this laptop: " )
-
-            if charger_barcode == "":
-                continue # re-run the barcode prompt
-
-            charger_asset = Asset.from_id( charger_barcode )
-            if isinstance( charger_asset, Charger ):
-                break # move on to issuing the charger
-
-        connection = connect_to_database()
-        cursor = connection.cursor( cursor_factory=psycopg2.extras.DictCursor )
+        return None
 
-        cursor.execute(
-                """
-                INSERT INTO issued_accessories (asset_id, entity_id, transaction_id) 
-                VALUES (%s, %s, %s);
-                """,
-                ( charger_asset.asset_id, entity.entity_id, transaction_id, ),
+    transactions = []
+    for ( ( asset, accessories ), data ) in zip( cart, rows ):
+        SESSION_CACHE.invalidate_for_write( entity.entity_id, asset.asset_id )
+        for accessory in accessories:
+            SESSION_CACHE.invalidate_for_write( entity.entity_id, accessory.asset_id )
+
+        transaction = Transaction(
+                data["transaction_id"],
+                data["entity_id"],
+                asset,
+                data["transaction_type"],
+                data["transaction_timestamp"],
+                data["transaction_user"],
+                data["transaction_notes"],
         )
-        # Add the entity and transaction to this Accessory object
-        charger_asset.issued_to = entity
-        charger_asset.transaction = Transaction.from_id( transaction_id )
-
-        connection.commit() # Save the INSERT
-        cursor.close()
-        connection.close()
 
-        return charger_asset
+        # Add the entity and transaction to each issued Accessory object
+        for accessory in accessories + ( [ asset ] if isinstance( asset, Accessory ) else [] ):
+            accessory.issued_to   = entity
+            accessory.transaction = transaction
 
-    except Exception as e:
-        # In case of error, roll back and report the failure
-        if connection is not None:
-            connection.rollback()
-        if cursor is not None:
-            cursor.close()
-        if connection is not None:
-            connection.close()
-        
-        display_verbose_error(
-                f"Exception in issue_charger(" +
-                f" '{transaction_id}', '{entity}' )." +
-                f"\nError: This person can not be issued (another?) charger."
-                , e
-        )
+        transactions.append( transaction )
 
-        return None
+    return transactions
 
 
-def issue_headphones( transaction_id: int, entity: Entity ) -> Headphones:
+def scan_charger() -> Charger:
     """
-    Issues an entity a set of headphones, using the transaction_id (presumably
-    from the associated laptop check-out).  This function assumes the entity
-    has been vetted and does not already have headphones. If they already have
-    headphones, this function will print an error message.
+    Prompts for the charger that goes with a laptop check-out, until a
+    charger barcode is scanned. Nothing is written to the database here (see
+    incarcerated_issue_asset_transaction).
     """
-    try:
-        while True:
-            headphones_barcode = input_with_color( "Please, scan the HEADPHONES barcode for this laptop ('ENTER' for none): " )
-
-            if headphones_barcode == "":
-                return None # we don't have headphones or the student doesn't want them
-
-            headphones_asset = Asset.from_id( headphones_barcode )
+    while True:
+        charger_barcode = input_with_color( "Please, scan the charger barcode for this laptop: " )
 
-            if isinstance( headphones_asset, Headphones ):
-                break # move on to issuing the headphones
+        if charger_barcode == "":
+            continue # re-run the barcode prompt
 
-        connection = connect_to_database()
-        cursor = connection.cursor( cursor_factory=psycopg2.extras.DictCursor )
+        charger_asset = Asset.from_id( charger_barcode )
+        if isinstance( charger_asset, Charger ):
+            return charger_asset
 
-        cursor.execute(
-                """
-                INSERT INTO issued_accessories (asset_id, entity_id, transaction_id) 
-                VALUES (%s, %s, %s);
-                """,
-                ( headphones_asset.asset_id, entity.entity_id, transaction_id, ),
-        )
-        # Add the entity and transaction to this Accessory object
-        headphones_asset.issued_to = entity
-        headphones_asset.transaction = Transaction.from_id( transaction_id )
 
-        connection.commit() # Save the INSERT
-        cursor.close()
-        connection.close()
+def scan_headphones() -> Union[ Headphones, None ]:
+    """
+    Prompts for the headphones that go with a laptop check-out. Returns
+    'None' when the operator presses ENTER (no headphones wanted / available).
+    Nothing is written to the database here.
+    """
+    while True:
+        headphones_barcode = input_with_color( "Please, scan the HEADPHONES barcode for this laptop ('ENTER' for none): " )
 
-        return headphones_asset
+        if headphones_barcode == "":
+            return None # we don't have headphones or the student doesn't want them
 
-    except Exception as e:
-        # In case of error, roll back and report the failure
-        if connection is not None:
-            connection.rollback()
-        if cursor is not None:
-            cursor.close()
-        if connection is not None:
-            connection.close()
-        
-        display_verbose_error(
-                f"Exception in issue_headphones(" + 
-                f" '{transaction_id}', '{entity}' ):" +
-                f"\nError: This person can not be issued (another?) headphones."
-                , e
-        )
+        headphones_asset = Asset.from_id( headphones_barcode )
 
-        return None
+        if isinstance( headphones_asset, Headphones ):
+            return headphones_asset
 
 
 # Function prompts for a charger to be returned with its laptop
@@ -3011,6 +3992,8 @@ def return_charger( transaction: Transaction ) -> bool:
             conn.close()
             conn = None
 
+            SESSION_CACHE.invalidate_for_write( this_entity_id, this_asset_id )
+
             print(Color.BRIGHT_GREEN.value + "Thank you!" + Color.DEFAULT.value) # green for success
 
         except Exception as e:
@@ -3104,6 +4087,12 @@ def asset_issued_transaction( asset: Asset ) -> Transaction:
         transaction.asset = asset # graft in accessory as our asset
         return transaction
 
+    return transaction_from_issued_row( asset_issued_transaction_row( asset.asset_id ), asset )
+
+
+# Function queries the ISSUED transaction row for an asset ID (or 'None'), so
+# callers can look it up before ( or while ) the Asset itself is fetched
+def asset_issued_transaction_row( asset_id: str ) -> Union[ psycopg2.extras.DictRow, None ]:
     conn = connect_to_database()
     cur  = conn.cursor( cursor_factory=psycopg2.extras.DictCursor )
 
@@ -3131,7 +4120,7 @@ def asset_issued_transaction( asset: Asset ) -> Transaction:
             transactions.transaction_id
         LIMIT 1;
         """,
-        ( asset.asset_id, ),
+        ( asset_id, ),
     )
 
     data = cur.fetchone()
@@ -3139,6 +4128,11 @@ def asset_issued_transaction( asset: Asset ) -> Transaction:
     cur.close()
     conn.close()
 
+    return data
+
+
+# Function builds the Transaction for asset_issued_transaction_row()'s result
+def transaction_from_issued_row( data, asset: Asset ) -> Union[ Transaction, None ]:
     if not data:
         return None
 
@@ -3167,28 +4161,21 @@ def asset_latest_transaction( asset: Asset ) -> Transaction:
     conn = connect_to_database()
     cur  = conn.cursor( cursor_factory=psycopg2.extras.DictCursor )
 
-    # Check for existing asset
-# TODO: Streamline this query -- like the last one --
-#       (SELECT transaction_id) and use
-#       " return Transaction.from_id( transaction_id ) "
-#       to be more error-hardened and change-malleable.
+    # asset_current_state holds each asset's latest transaction, kept up to
+    # date by triggers (see migrations/002_asset_current_state.sql)
     cur.execute(
         """
-        SELECT 
-            transactions.transaction_id,
-            transactions.entity_id,
-            transactions.transaction_type,
-            transactions.transaction_timestamp,
-            transactions.transaction_user,
-            transactions.transaction_notes
-        FROM 
-            transactions
+        SELECT
+            asset_current_state.transaction_id,
+            asset_current_state.entity_id,
+            asset_current_state.transaction_type,
+            asset_current_state.transaction_timestamp,
+            asset_current_state.transaction_user,
+            asset_current_state.transaction_notes
+        FROM
+            asset_current_state
         WHERE
-            transactions.asset_id = %s
-        ORDER BY
-            transactions.transaction_timestamp DESC,
-            transactions.transaction_id
-        LIMIT 1;
+            asset_current_state.asset_id = %s;
         """,
         ( asset.asset_id, ) )
 
@@ -3216,6 +4203,7 @@ def asset_latest_transaction( asset: Asset ) -> Transaction:
 #       ==> unknown asset type
 # Catches:
 #       Exception
+@with_session_cache
 def return_assets() -> None:
     last_error = "" # Store the last error message
     transaction = None
@@ -3310,8 +4298,41 @@ def return_assets() -> None:
 
     return
 
-def get_transaction_history( object ) -> pd.DataFrame:
-    base_query = """
+def get_transaction_history(
+        object,
+        after_id: Union[ int, None ] = None,
+        before_id: Union[ int, None ] = None,
+        limit: int = 0,
+        start_date: Union[ datetime.date, None ] = None,
+        end_date: Union[ datetime.date, None ] = None,
+        ) -> Union[ pd.DataFrame, None ]:
+    """
+    Reads an asset's or entity's transactions, in transaction_id order.
+    Pages use keyset pagination, so any page costs the same as the first:
+
+        after_id  ==> the 'limit' transactions after  this transaction_id
+        before_id ==> the 'limit' transactions before this transaction_id
+
+    Args:
+        object (Asset | Incarcerated): whose history to read
+        limit   (int): most transactions to read ('0' reads them all)
+        start_date / end_date (date): optional, inclusive date range
+
+    Returns:
+        pd.DataFrame: the transactions (or 'None' on error)
+    """
+    ( where_clause, parameters ) = transaction_history_criteria( object, start_date, end_date )
+
+    order = "ASC"
+    if after_id is not None:
+        where_clause += " AND t.transaction_id > %s"
+        parameters   += ( after_id, )
+    elif before_id is not None:
+        where_clause += " AND t.transaction_id < %s"
+        parameters   += ( before_id, )
+        order = "DESC" # read backwards from 'before_id', then flip the page
+
+    query = f"""
         SELECT
             t.transaction_timestamp,
             t.transaction_id,
@@ -3326,23 +4347,17 @@ def get_transaction_history( object ) -> pd.DataFrame:
         LEFT JOIN assets a ON t.asset_id = a.asset_id
         LEFT JOIN incarcerated i ON t.entity_id = i.entity_id
         LEFT JOIN users u ON t.entity_id = u.entity_id
-        WHERE {0}
-        ORDER BY t.transaction_id ASC
+        WHERE {where_clause}
+        ORDER BY t.transaction_id {order}
         """
-    
-    if isinstance( object, Asset ):
-        where_clause =  "t.asset_id = %s"
-        parameters = (object.asset_id, )
-    elif isinstance( object, Incarcerated ):
-        where_clause =  "t.entity_id = %s"
-        parameters = (object.entity_id, )
-    else:
-        raise ValueError("Unknown object type")
-    
-    # Combine the base query with the WHERE clause using string formatting
-    query = base_query.format(where_clause)
+
+    if limit > 0:
+        query      += " LIMIT %s"
+        parameters += ( limit, )
 
     # Create a connection to the database
+    conn = None
+    cur  = None
     try:
         conn = connect_to_database()
         cur  = conn.cursor( cursor_factory=psycopg2.extras.DictCursor )
@@ -3358,20 +4373,171 @@ def get_transaction_history( object ) -> pd.DataFrame:
 
         # Convert the results to a pandas DataFrame
         df = pd.DataFrame(results, columns=column_names)
+        if order == "DESC":
+            df = df.iloc[::-1].reset_index( drop=True )
 
         # Close the cursor  and connection
         cur.close()
         conn.close()
-        
+
     except Exception as e:
+        if cur is not None:
+            cur.close()
+        if conn is not None:
+            conn.close()
+
         display_verbose_error(
                 f"Exception during get_transaction_history( '{object}' ):"
                 , e
         )
+        return None
 
     return df
 
 
+def count_transaction_history(
+        object,
+        start_date: Union[ datetime.date, None ] = None,
+        end_date: Union[ datetime.date, None ] = None,
+        ) -> int:
+    """
+    Counts an asset's or entity's transactions (within an optional date range).
+    """
+    ( where_clause, parameters ) = transaction_history_criteria( object, start_date, end_date )
+
+    row = EduDbObject.fetch_row(
+            "COUNT(*) AS transaction_count", # SELECT
+            "transactions t",                # FROM
+            where_clause,                    # WHERE
+            parameters
+    )
+
+    return row["transaction_count"] if row else 0
+
+
+# Helper function, shared by get_transaction_history() and count_transaction_history()
+def transaction_history_criteria(
+        object,
+        start_date: Union[ datetime.date, None ],
+        end_date: Union[ datetime.date, None ],
+        ) -> Tuple[ str, tuple ]:
+
+    if isinstance( object, Asset ):
+        where_clause =  "t.asset_id = %s"
+        parameters = (object.asset_id, )
+    elif isinstance( object, Incarcerated ):
+        where_clause =  "t.entity_id = %s"
+        parameters = (object.entity_id, )
+    else:
+        raise ValueError("Unknown object type")
+
+    if start_date is not None:
+        where_clause += " AND t.transaction_timestamp >= %s"
+        parameters   += ( start_date, )
+    if end_date is not None: # inclusive: up to midnight after 'end_date'
+        where_clause += " AND t.transaction_timestamp < %s"
+        parameters   += ( end_date + datetime.timedelta( days=1 ), )
+
+    return ( where_clause, parameters )
+
+
+class TransactionHistory:
+    """
+    One page at a time of an asset's or entity's transaction history, for the
+    view_transaction_history_by_* screens. Pages are HISTORY_PAGE_SIZE rows.
+    """
+
+    def __init__( self, object ):
+        self.object       = object
+        self.page_size    = getattr( config, "HISTORY_PAGE_SIZE", 20 )
+        self.start_date   = None
+        self.end_date     = None
+        self.transactions = None # the current page
+        self.offset       = 0    # rows before the current page
+        self.total        = 0
+
+    def first_page( self ) -> bool:
+        """Reads the total and the first page. Returns 'False' on error."""
+        transactions = get_transaction_history(
+                self.object, limit=self.page_size,
+                start_date=self.start_date, end_date=self.end_date )
+        if transactions is None:
+            return False
+
+        self.transactions = transactions
+        self.offset       = 0
+        self.total        = count_transaction_history( self.object, self.start_date, self.end_date )
+        return True
+
+    def next_page( self ) -> str:
+        """Moves to the next page. Returns an error message, or ''."""
+        if self.transactions is None or self.offset + len( self.transactions ) >= self.total:
+            return "This is the last page of transactions."
+
+        transactions = get_transaction_history(
+                self.object, after_id=int( self.transactions["transaction_id"].iloc[-1] ),
+                limit=self.page_size, start_date=self.start_date, end_date=self.end_date )
+        if transactions is None or transactions.empty:
+            return "This is the last page of transactions."
+
+        self.offset      += len( self.transactions )
+        self.transactions = transactions
+        return ""
+
+    def previous_page( self ) -> str:
+        """Moves to the previous page. Returns an error message, or ''."""
+        if self.transactions is None or self.offset == 0:
+            return "This is the first page of transactions."
+
+        transactions = get_transaction_history(
+                self.object, before_id=int( self.transactions["transaction_id"].iloc[0] ),
+                limit=self.page_size, start_date=self.start_date, end_date=self.end_date )
+        if transactions is None or transactions.empty:
+            return "This is the first page of transactions."
+
+        self.offset       = max( 0, self.offset - len( transactions ) )
+        self.transactions = transactions
+        return ""
+
+    def input_date_range( self ) -> str:
+        """Prompts for a (blank for none) date range, then re-reads the first
+        page. Returns an error message, or ''."""
+        try:
+            start_date = input_with_color( "Start date (YYYY-MM-DD, 'ENTER' for none):" )
+            end_date   = input_with_color( "End date   (YYYY-MM-DD, 'ENTER' for none):" )
+            self.start_date = datetime.date.fromisoformat( start_date ) if start_date else None
+            self.end_date   = datetime.date.fromisoformat( end_date   ) if end_date   else None
+        except ValueError:
+            return "Invalid date: please use YYYY-MM-DD."
+
+        if not self.first_page():
+            return "Lookup failed: unable to read transaction history."
+        return ""
+
+    def handle_command( self, command: str ) -> Tuple[ bool, str ]:
+        """Handles 'n' / 'p' / 'd' paging commands typed at a screen's prompt.
+        Returns ( True, error_message ) if 'command' was a paging command."""
+        if command.lower() == 'n':
+            return ( True, self.next_page() )
+        if command.lower() == 'p':
+            return ( True, self.previous_page() )
+        if command.lower() == 'd':
+            return ( True, self.input_date_range() )
+        return ( False, "" )
+
+    def print( self, max_width: int ) -> None:
+        print_table(
+            self.transactions, "", Color.BRIGHT_YELLOW, max_width,
+        )
+
+        date_range = ""
+        if self.start_date or self.end_date:
+            date_range = f" from {self.start_date or 'the beginning'} to {self.end_date or 'today'}"
+        print( f"  Transactions {self.offset + 1 if self.total else 0}-" +
+               f"{self.offset + len( self.transactions )} of {self.total}{date_range}." +
+               "  ('n' next page, 'p' previous page, 'd' date range)" )
+
+
 def transact_asset_return( transaction: Transaction ) -> str:
     if isinstance( transaction.asset, Accessory ):
         return transact_accessory_return(  transaction )
@@ -3411,6 +4577,8 @@ def transact_true_asset_return( transaction: Transaction ) -> str:
         cur.close()
         conn.close()
 
+        SESSION_CACHE.invalidate_for_write( transaction.entity_id, transaction.asset.asset_id )
+
         last_error = Color.BRIGHT_GREEN.value + "Asset(s) returned successfully!" + Color.DEFAULT.value # Green for success
 
         if transaction.asset.asset_type == "LAPTOP":
@@ -3464,6 +4632,8 @@ def transact_accessory_return( transaction: Transaction ) -> str:
                       # Even a one dollar donation can help save a query... :)
         cur.close()
         conn.close()
+
+        SESSION_CACHE.invalidate_for_write( transaction.entity_id, transaction.asset.asset_id )
         
         last_error = Color.BRIGHT_GREEN.value + "Asset(s) returned successfully!" + Color.DEFAULT.value # Green for success
 
@@ -3480,6 +4650,160 @@ def transact_accessory_return( transaction: Transaction ) -> str:
     return last_error
 
 
+# Function resolves a batch of returned barcodes with one query: each asset
+# that's found, with its open ISSUED transaction and borrower (if issued).
+# Chargers are issued through issued_accessories, so their borrower is there
+# Returns: { asset_id: row }, without the barcodes that aren't assets
+def resolve_returned_assets( asset_ids: List[ str ] ) -> dict:
+    rows = EduDbObject.fetch_rows(
+            """assets.asset_id, assets.asset_type,
+               transactions.transaction_id,
+               issued_accessories.transaction_id AS accessory_transaction_id,
+               COALESCE( transactions.entity_id, issued_accessories.entity_id ) AS entity_id,
+               incarcerated.doc_number, users.last_name, users.first_name""",      # SELECT
+            """assets
+               LEFT JOIN issued_assets ON assets.asset_id = issued_assets.asset_id
+               LEFT JOIN transactions  ON issued_assets.transaction_id = transactions.transaction_id
+               LEFT JOIN issued_accessories ON assets.asset_type = 'CHARGER' AND
+                                               assets.asset_id = issued_accessories.asset_id
+               LEFT JOIN users         ON COALESCE( transactions.entity_id, issued_accessories.entity_id ) = users.entity_id
+               LEFT JOIN incarcerated  ON COALESCE( transactions.entity_id, issued_accessories.entity_id ) = incarcerated.entity_id""", # FROM
+            "assets.asset_id = ANY( %s )",                                       # WHERE
+            ( asset_ids, )
+    )
+    return { row["asset_id"]: row  for  row in rows }
+
+
+# Function returns every asset in 'asset_ids' that is still issued, in one
+# transaction: a single DELETE FROM issued_assets (and one FROM
+# issued_accessories, for chargers) feeds the multi-row INSERT of their
+# RETURNED transactions. Headphones aren't taken back (see transact_accessory_return)
+# Returns: { asset_id: RETURNED transaction_id } (or 'None', if nothing was returned)
+def transact_bulk_asset_return( asset_ids: List[ str ] ) -> Union[ dict, None ]:
+    conn = None
+    cur  = None
+
+    try:
+        conn = connect_to_database()
+        cur  = conn.cursor( cursor_factory=psycopg2.extras.DictCursor )
+
+        cur.execute(
+            """
+            WITH returned AS (
+                DELETE FROM issued_assets
+                WHERE asset_id = ANY( %(asset_ids)s )
+                RETURNING asset_id, transaction_id
+            ),
+            returned_chargers AS (
+                DELETE FROM issued_accessories
+                WHERE asset_id = ANY( %(asset_ids)s )
+                  AND asset_id IN ( SELECT asset_id FROM assets WHERE asset_type = 'CHARGER' )
+                RETURNING asset_id, entity_id
+            )
+            INSERT INTO transactions ( entity_id, asset_id, transaction_type, transaction_notes )
+            SELECT issued.entity_id, returned.asset_id, 'RETURNED'::transaction_type, %(transaction_notes)s
+            FROM   returned
+            JOIN   transactions issued ON returned.transaction_id = issued.transaction_id
+            UNION ALL
+            SELECT DISTINCT entity_id, asset_id, 'RETURNED'::transaction_type, %(transaction_notes)s
+            FROM   returned_chargers
+            RETURNING asset_id, entity_id, transaction_id;
+            """,
+            { 'asset_ids': asset_ids, 'transaction_notes': f"Returned by '{os.getlogin()}' (drop box)." },
+        )
+
+        rows = cur.fetchall()
+
+        conn.commit() # Save every DELETE and INSERT, together
+        cur.close()
+        conn.close()
+
+    except Exception as e:
+        if conn is not None:
+            conn.rollback()
+        if cur is not None:
+            cur.close()
+        if conn is not None:
+            conn.close()
+        display_verbose_error( f"Exception during transact_bulk_asset_return( {asset_ids} ):", e )
+        return None
+
+    for row in rows:
+        SESSION_CACHE.invalidate_for_write( row["entity_id"], row["asset_id"] )
+
+    return { row["asset_id"]: row["transaction_id"]  for  row in rows }
+
+
+# "Drop box" returns: reads a stream of barcodes (e.g. a bin of laptops,
+# chargers and books), resolves them in one query, and returns them all in
+# one transaction. Headphones aren't taken back.
+@with_session_cache
+def bulk_return_assets() -> None:
+    clear_screen_and_print_ams_title()
+    print_title( "Bulk Return Assets (Drop Box)", Color.BRIGHT_YELLOW, 100 )
+
+    asset_ids = []
+    while True:
+        barcode = input_with_color( f"Scan barcode #{len( asset_ids ) + 1} ('ENTER' when done):" ).strip()
+        if not barcode:
+            break
+        if barcode not in asset_ids: # a double scan is harmless
+            asset_ids.append( barcode )
+
+    if not asset_ids:
+        return
+
+    resolved = resolve_returned_assets( asset_ids )
+    issued_ids = [ asset_id  for  asset_id in asset_ids
+                   if asset_id in resolved and
+                      ( resolved[asset_id]["transaction_id"] is not None or
+                        resolved[asset_id]["accessory_transaction_id"] is not None ) ]
+
+    returned = {}
+    if issued_ids:
+        if input_yes_no_only( f"Return {len( issued_ids )} of {len( asset_ids )} scanned asset(s)? (Y/N)" ) != "Y":
+            return
+        returned = transact_bulk_asset_return( issued_ids )
+        if returned is None:
+            display_error( "Error: Bulk return failed. Nothing was returned." )
+            returned = {}
+
+    # Borrowers whose charger came back in this bin
+    charger_returned = { resolved[asset_id]["entity_id"]  for  asset_id in returned
+                         if resolved[asset_id]["asset_type"] == "CHARGER" }
+
+    summary = []
+    for asset_id in asset_ids:
+        row = resolved.get( asset_id )
+        if row is None:
+            result = "Not found"
+        elif asset_id in returned:
+            result = "Returned"
+            if row["asset_type"] == "LAPTOP" and row["entity_id"] not in charger_returned:
+                result += " (charger is still issued)"
+        elif row["asset_type"] == "HEADPHONES":
+            result = "Headphones aren't taken back"
+        elif row["transaction_id"] is None and row["accessory_transaction_id"] is None:
+            result = "Not issued"
+        else:
+            result = "Not returned" # cancelled, failed, or returned elsewhere meanwhile
+        summary.append( (
+                asset_id,
+                row["asset_type"] if row else "",
+                row["doc_number"] if row and row["doc_number"] else "",
+                f"{row['last_name']}, {row['first_name']}" if row and row["last_name"] else "",
+                result,
+        ) )
+
+    print_table(
+        pd.DataFrame( summary, columns=[ "Asset ID", "Type", "DOC", "Name", "Result" ] ),
+        f"Bulk Return: {len( returned )} of {len( asset_ids )} returned",
+        Color.BRIGHT_GREEN if len( returned ) == len( asset_ids ) else Color.BRIGHT_YELLOW,
+        100
+    )
+    input_with_color() # Press Enter to continue...
+
+
 # May throw a 'NotImplementedError' exception
 #       ==> unimplemented menu options
 # May throw a 'ValueError' exception
@@ -3659,20 +4983,18 @@ def render_list_as_menu( raw_list: list[str] ) -> None:
             if menu_list: menu_list += f"\n" # insert newline
             menu_list += f"{idx}. {menu_item}"
             
-    menu_df = pd.DataFrame(
-        {   
-            "Column1": [
-                menu_list,
+    menu_sections = {
+        "Column1": [
+            menu_list,
 
-                "Press Enter to exit the reports menu."
-            ],
-        }
-    )
+            "Press Enter to exit the reports menu."
+        ],
+    }
 
     if show_title:
         print_title( raw_list[0], width=100 )
 
-    print_menu_sections(menu_df, min_width=100,)
+    print_menu_sections(menu_sections, min_width=100,)
     
     return
 
@@ -3690,13 +5012,8 @@ def print_reports_menu() -> List[ str ]:
 def collect_report_names() -> List[str]:
     reports_directory = f"{ SCRIPT_DIRECTORY }\\reports"
     
-    report_files = [ reports_directory ] # element #0 is the directory
-
-    for filename in os.listdir( reports_directory ):
-        if filename.endswith( ".sql" ):
-            report_files.append( filename )
-
-    return report_files
+    # element #0 is the directory (the listing is cached until the directory changes)
+    return [ reports_directory ] + REPORT_CATALOG.report_names( reports_directory )
 
 
 def reports_menu() -> None:
@@ -3737,14 +5054,10 @@ def process_report( selected, report_names: List[str] ) -> str:
         return f"Error: process_report( '{selected}', '{report_names}' )" + \
                f"\n\tInvalid selection, or report list is missing or empty."
 
-    SQL_file    = report_names[selected] # name only
-    SQLfilepath = os.path.join( report_names[0], SQL_file ) # relative path
-    SQL_query   = "" # Build up SQL query string here
-    kwargs      = {} # Build parameters dictionary here
+    SQL_file = report_names[selected] # name only
+    report   = REPORT_CATALOG.report( report_names[0], SQL_file ) # parsed once, until the file changes
 
-    SQLinput = open( SQLfilepath, 'r' )
-    for line in SQLinput:
-        (SQL_query, kwargs) = replace_SQL_variables( line, SQL_query, **kwargs )
+    ( SQL_query, kwargs ) = run_report_steps( report )
 
     return execute_sql_query( SQL_query, report_names[0], SQL_file, **kwargs )
 
@@ -3774,7 +5087,9 @@ def execute_sql_query( SQL_query: str, report_dir: str, SQL_file: str, **kwargs
             file_path = open_input_csv( report_dir, report_csv )
             if file_path is None:
                 return f"Warning: Import for '{report_csv}' was cancelled."
-            process_input_csv( file_path, SQL_query, **kwargs )
+            import_summary = process_input_csv( file_path, SQL_query, **kwargs )
+            if import_summary: # bulk imports summarize their inserted / updated / rejected rows
+                print( import_summary )
             skip_filesave = True # no need to save an import to CSV output (or is there?)
             import_success = True
             dummy = input_with_color() # pause, so user sees "Imported / updated: ... " lines
@@ -3785,6 +5100,30 @@ def execute_sql_query( SQL_query: str, report_dir: str, SQL_file: str, **kwargs
                     f"\nException text: {e}" )
             skip_filesave = True
 
+    elif is_streamable_query( SQL_query, **kwargs ):
+        # A single SELECT streams straight to the CSV file (see export_query_to_csv),
+        # or is copied from its last run if nothing changed since (see export_report_to_csv;
+        # ':defaults => { 'AMS_cache': False }' always runs it)
+        file_path = open_output_csv( report_dir, report_csv )
+        if not file_path:
+            return f"Warning: Report for '{report_csv}' was cancelled."
+
+        try:
+            ( row_count, cached ) = export_report_to_csv( SQL_query, file_path, kwargs.get( 'AMS_parameters' ),
+                                                          use_cache=kwargs.get( 'AMS_cache', True ) )
+        except Exception as e: # intercept and print any Exception
+            display_error( f"Error: execute_sql_query(): SQL query failed with file:" +
+                    f"\n\tSQL script: '{SQL_file}'" +
+                    f"\nException text: {e}" )
+            if os.path.exists( file_path ): # don't leave a partial report behind
+                os.remove( file_path )
+            return f"Warning: Report for '{report_csv}' was cancelled."
+
+        return Color.BRIGHT_GREEN.value + \
+            f"SQL query results ({row_count} rows{', unchanged since the last run' if cached else ''}) " + \
+            f"saved to '{file_path}'." + \
+            Color.DEFAULT.value
+
     else: # CSV file is for output (and) SQL query is fully qualified
         try:
             database = EduDbObject()
@@ -3792,7 +5131,7 @@ def execute_sql_query( SQL_query: str, report_dir: str, SQL_file: str, **kwargs
 
             with warnings.catch_warnings():
                 warnings.simplefilter("ignore") # ignore "pandas only supports SQLAlchemy / sqlite"
-                df = pd.read_sql_query( SQL_query, database.connection )
+                df = pd.read_sql_query( SQL_query, database.connection, params=kwargs.get( 'AMS_parameters' ) )
             database.disconnect() # clean up
         except Exception as e: # intercept and print any Exception
             display_error( f"Error: execute_sql_query(): SQL query failed with file:" +
@@ -3830,6 +5169,232 @@ def execute_sql_query( SQL_query: str, report_dir: str, SQL_file: str, **kwargs
                        Color.DEFAULT.value
 
 
+# Helper function, decides if a report can be streamed to its CSV file
+def is_streamable_query( SQL_query: str, **kwargs ) -> bool:
+    """
+    A report streams through a server-side cursor when it is a single
+    SELECT (or WITH ... SELECT) statement. Multi-statement and data-modifying
+    reports, and any report with this directive, use pandas instead:
+
+        -- :defaults => { 'AMS_pandas': True }
+    """
+    if kwargs.get( 'AMS_pandas', False ):
+        return False
+
+    statement = SQL_query.strip().rstrip( ';' ).strip()
+
+    if ';' in statement: # more than one statement
+        return False
+    if not re.match( r"^(SELECT|WITH)\b", statement, re.IGNORECASE ):
+        return False
+    if re.search( r"\b(INSERT|UPDATE|DELETE)\b", statement, re.IGNORECASE ):
+        return False
+
+    return True
+
+
+def export_query_to_csv( SQL_query: str, file_path: str, parameters: dict = None ) -> int:
+    """
+    Streams a SELECT query's results into a CSV file, with a header row,
+    through a named (server-side) cursor. Only EXPORT_ITERSIZE rows are held
+    in memory at a time, however large the report is.
+
+    Args:
+        SQL_query  (str):  a single SELECT statement
+        file_path  (str):  the CSV file to (over)write
+        parameters (dict): its bound parameters (see build_report_query), or 'None'
+    Returns:
+        int: the number of rows written
+    """
+    itersize  = getattr( config, "EXPORT_ITERSIZE", 2000 )
+    row_count = 0
+
+    connection = None
+    cursor     = None
+
+    try:
+        connection = connect_to_database()
+        cursor = connection.cursor( name="ams_export" ) # named ==> server-side
+        cursor.itersize = itersize
+
+        cursor.execute( SQL_query.strip().rstrip( ';' ), parameters )
+
+        with open( file_path, mode='w', newline='' ) as csvfile:
+            writer = csv.writer( csvfile )
+            header_written = False
+
+            for row in cursor:
+                if not header_written: # a named cursor's description is set by its first fetch
+                    writer.writerow( [ column.name for column in cursor.description ] )
+                    header_written = True
+
+                writer.writerow( row )
+                row_count += 1
+
+                if row_count % itersize == 0:
+                    print( f"\rExported {row_count} rows...", end='', flush=True )
+
+            if not header_written and cursor.description is not None: # no rows
+                writer.writerow( [ column.name for column in cursor.description ] )
+
+        if row_count >= itersize:
+            print( f"\rExported {row_count} rows.   " )
+
+        cursor.close()
+        connection.rollback() # read-only: just end the transaction
+        connection.close()
+
+    except Exception as e:
+        if connection is not None:
+            connection.rollback() # also ends the server-side cursor
+        if cursor is not None and not cursor.closed:
+            cursor.close()
+        if connection is not None:
+            connection.close()
+        raise e # Jump back to execute_sql_query( ... )
+
+    return row_count
+
+
+# Functions whose results change without the data changing: reports that
+# call these are never served from the result cache
+REPORT_VOLATILE_FUNCTIONS = re.compile(
+        r"\b(now|random|clock_timestamp|statement_timestamp|timeofday|current_date|current_time|" +
+        r"current_timestamp|localtime|localtimestamp|current_user|session_user|user)\b",
+        re.IGNORECASE )
+
+
+class ReportResultCache:
+    """
+    Saved results of streamed (single SELECT) reports, as gzip'd CSV files
+    named '<key>.<data version>.<row count>.csv.gz'. The key is a hash of the
+    database, the query text and its bound parameter values; the data
+    version is data_changes_version() (migrations/003_data_changes.sql),
+    which grows with every change to an app table, from any workstation.
+    So a saved result is re-used, instead of re-running its query, only
+    while nothing has changed.
+    """
+
+    def __init__( self, directory: str = None ):
+        self.directory = directory # 'None' turns the cache off
+        self.lock      = threading.Lock()
+
+    def data_state( self ) -> Union[ Tuple[ str, int ], None ]:
+        """Returns ( database, data version ) with one small query, or
+        'None' if the cache is off or the migration isn't applied."""
+        if not self.directory:
+            return None
+
+        connection = None
+        try:
+            connection = connect_to_database()
+            cursor = connection.cursor()
+            cursor.execute( "SELECT current_database(), data_changes_version();" )
+            row = cursor.fetchone()
+            cursor.close()
+            dsn = connection.get_dsn_parameters()
+            connection.rollback() # read-only: just end the transaction
+        except psycopg2.Error:
+            if connection is not None:
+                connection.rollback()
+            return None
+        finally:
+            if connection is not None:
+                connection.close()
+
+        if row is None:
+            return None
+        return ( f"{dsn.get( 'host', '' )}:{dsn.get( 'port', '' )}/{row[0]}", row[1] )
+
+    def key( self, database: str, SQL_query: str, parameters: dict = None ) -> str:
+        text = json.dumps( [ database, SQL_query, parameters ], sort_keys=True, default=str )
+        return hashlib.sha1( text.encode( 'utf-8' ) ).hexdigest()
+
+    def restore( self, key: str, version: int, file_path: str ) -> Union[ int, None ]:
+        """Writes a saved result to 'file_path', returning its row count, or
+        'None' if there is no result saved for this data version."""
+        prefix = f"{key}.{version}."
+        with self.lock:
+            try:
+                cached = [ file_name for file_name in os.listdir( self.directory )
+                           if file_name.startswith( prefix ) and file_name.endswith( ".csv.gz" ) ]
+            except OSError:
+                return None
+            if not cached:
+                return None
+
+            with gzip.open( os.path.join( self.directory, cached[0] ), 'rb' ) as cached_file, \
+                 open( file_path, 'wb' ) as csvfile:
+                shutil.copyfileobj( cached_file, csvfile )
+            return int( cached[0][ len( prefix ) : -len( ".csv.gz" ) ] )
+
+    def store( self, key: str, version: int, file_path: str, row_count: int ) -> None:
+        """Saves a report's CSV file, and removes every result saved for an
+        older data version (they can't be used again). Best-effort: a
+        report that can't be saved is still exported."""
+        with self.lock:
+            try:
+                os.makedirs( self.directory, exist_ok=True )
+                temporary_file = os.path.join( self.directory, f"{key}.{os.getpid()}.tmp" )
+                with open( file_path, 'rb' ) as csvfile, gzip.open( temporary_file, 'wb' ) as cached_file:
+                    shutil.copyfileobj( csvfile, cached_file )
+                saved_file = f"{key}.{version}.{row_count}.csv.gz"
+                os.replace( temporary_file, os.path.join( self.directory, saved_file ) )
+
+                for file_name in os.listdir( self.directory ):
+                    parts = file_name.split( "." ) # [ key, version, row count, 'csv', 'gz' ]
+                    if len( parts ) != 5 or file_name == saved_file or not parts[1].isdigit():
+                        continue
+                    if parts[0] == key or int( parts[1] ) < version:
+                        os.remove( os.path.join( self.directory, file_name ) )
+            except OSError:
+                pass
+
+    def clear( self ) -> None:
+        """Removes every saved result (best-effort, like store())."""
+        with self.lock:
+            try:
+                if self.directory and os.path.isdir( self.directory ):
+                    for file_name in os.listdir( self.directory ):
+                        if file_name.endswith( ".csv.gz" ):
+                            os.remove( os.path.join( self.directory, file_name ) )
+            except OSError:
+                pass
+
+
+REPORT_RESULTS = ReportResultCache(
+        directory=getattr( config, "REPORT_CACHE_DIRECTORY", os.path.join( tempfile.gettempdir(), "ams_report_results" ) ),
+)
+
+
+def export_report_to_csv( SQL_query: str, file_path: str, parameters: dict = None,
+                          use_cache: bool = True ) -> Tuple[ int, bool ]:
+    """
+    Exports a streamable report to a CSV file (see export_query_to_csv),
+    from REPORT_RESULTS when nothing has changed since it was last run.
+    Reports that call now(), random(), etc. are always run.
+
+    Returns:
+        ( the number of rows written, 'True' if they came from the cache )
+    """
+    state = None
+    if use_cache and not REPORT_VOLATILE_FUNCTIONS.search( SQL_query ):
+        state = REPORT_RESULTS.data_state()
+
+    if state is not None:
+        ( database, version ) = state
+        key = REPORT_RESULTS.key( database, SQL_query, parameters )
+        row_count = REPORT_RESULTS.restore( key, version, file_path )
+        if row_count is not None:
+            return ( row_count, True )
+
+    row_count = export_query_to_csv( SQL_query, file_path, parameters )
+
+    if state is not None:
+        REPORT_RESULTS.store( key, version, file_path, row_count )
+    return ( row_count, False )
+
+
 # Helper function, opens an input filename
 def open_input_csv( report_dir, report_csv ) -> str:
     # Use tkinter to prompt the user to choose where to save the file and under what name
@@ -3861,13 +5426,24 @@ def open_output_csv( report_dir, report_csv ) -> str:
     return file_path
 
 
-# TODO: Break this up into " for column_name " chunk and " rest "
-#       (re-evaluate each new subroutine's length)
+# Data types we can check in Python before a row is sent to the database
+AMS_NUMERIC_TYPES = { 'numeric', 'real', 'double precision' }
+AMS_INTEGER_TYPES = { 'integer', 'smallint', 'bigint' }
+
 def process_input_csv( file_path, SQL_query, **kwargs ) -> str:
-    database = EduDbObject()
-    database.connect()
-    DeBuG = False # 'DEBUG' is a built-in, so mix it up ...
-    
+    """Imports a CSV file, one row at a time, with bound parameters: each
+    statement in 'SQL_query' is PREPARE'd once per file with its
+    '%(COLUMN)s' placeholders as '$n' parameters, then EXECUTE'd for every
+    row in pages of IMPORT_PAGE_SIZE rows (psycopg2.extras.execute_batch).
+    Values are converted in Python (see convert_import_value), so nothing
+    is hand-quoted into the SQL text.
+
+    Returns:
+        str: a printable summary of the import
+    """
+    if kwargs.get( 'AMS_bulk', False ): # opt-in, set-based import (see bulk_import_csv)
+        return bulk_import_csv( file_path, SQL_query, **kwargs )
+
     kwargs = get_database_column_properties( **kwargs )
 
     with open( file_path, mode='r', newline='' ) as csvfile:
@@ -3880,61 +5456,470 @@ def process_input_csv( file_path, SQL_query, **kwargs ) -> str:
         ( bom, first_col ) = ( match.group(1), match.group(2) )
         columns[0] = first_col
 
-        AMS_nullable = kwargs.get("AMS_nullable", [])
-        AMS_coltypes = kwargs.get("AMS_coltypes", {})
+        rows = [ ( reader.line_num, row ) for row in reader if len( row ) > 0 ] # skip over blank rows
+
+    # One prepared statement per SQL statement in the import script
+    prepared = [ prepare_import_statement( statement, f"ams_import_{number}" )
+                 for ( number, statement ) in enumerate(
+                        re.split( r";\s*(?:\n|$)", SQL_query ), start=1 )
+                 if statement.strip() != '' ]
+
+    parameter_names = { name  for ( _, _, names ) in prepared  for name in names }
+    missing = [ name for name in sorted( parameter_names ) if name not in columns and name not in kwargs ]
+    if len( missing ) > 0:
+        display_error( f"Error: process_input_csv(): no CSV column or default for these parameters:" +
+                       f"\n\t{missing}" +
+                       f"\nSQL query     : '{SQL_query}'" )
+        raise KeyError( missing[0] ) # Jump back to reports_menu( ... )
+
+    # Each CSV row becomes a dict of typed values, bound by name
+    parameters = []
+    for ( line_number, row ) in rows:
+        row_kwargs = kwargs | dict(  zip( columns, row )  ) # merges defaults with row-specific keys
+        try:
+            parameters.append( { name: convert_import_value( name, row_kwargs[name], **kwargs )
+                                 for name in parameter_names } )
+        except ValueError as e:
+            raise ValueError( f"line {line_number} of '{file_path}': {e}" )
+
+    # "EXECUTE ams_import_1 ( %(a)s, ... ); EXECUTE ams_import_2 ( ... )" runs
+    # every statement for a row, in order, before the next row
+    execute_template = "; ".join(
+            f"EXECUTE {name} ( " + ", ".join( f"%({param})s" for param in names ) + " )"
+            if len( names ) > 0 else f"EXECUTE {name}"
+            for ( name, _, names ) in prepared )
+
+    connection     = None
+    cursor         = None
+    prepared_names = [] # only DEALLOCATE what was PREPARE'd
+
+    try:
+        connection = connect_to_database()
+        cursor = connection.cursor( cursor_factory=psycopg2.extras.DictCursor )
+
+        for ( name, statement, names ) in prepared:
+            cursor.execute( f"PREPARE {name} AS {statement}" )
+            prepared_names.append( name )
+
+        psycopg2.extras.execute_batch(
+                cursor,
+                execute_template,
+                parameters,
+                page_size = getattr( config, "IMPORT_PAGE_SIZE", 500 ),
+        )
+
+        connection.commit() # save the database changes
+
+    except Exception as e:
+        # In case of error, roll back (the caller reports the failure)
+        try:
+            if connection is not None:
+                connection.rollback()
+        except psycopg2.Error:
+            pass # the DEALLOCATE below finds out if the connection is broken
+        raise e # Jump back to execute_sql_query( ... )
+
+    finally:
+        # Prepared statements outlive transactions (and pooled connections).
+        # If they can't be removed, don't hide the import's own error, and
+        # don't hand the connection back to the pool with them still there
+        cleaned_up = True
+        try:
+            if cursor is not None:
+                for name in prepared_names:
+                    cursor.execute( f"DEALLOCATE PREPARE {name}" )
+                connection.commit()
+        except Exception as cleanup_error:
+            cleaned_up = False
+            display_verbose_error( f"Warning: process_input_csv(): couldn't DEALLOCATE {prepared_names}", cleanup_error )
+        finally:
+            if cursor is not None and not cursor.closed:
+                cursor.close()
+            if connection is not None:
+                if cleaned_up:
+                    connection.close()
+                else:
+                    connection.discard()
+
+    return Color.BRIGHT_GREEN.value + \
+           f"Imported / updated {len( parameters )} rows from '{file_path}'." + \
+           Color.DEFAULT.value
+
+
+def prepare_import_statement( statement: str, name: str ) -> Tuple[ str, str, List[str] ]:
+    """Converts an import statement's '%(COLUMN)s' placeholders into
+    positional '$n' parameters for 'PREPARE name AS ...'. A column used more
+    than once keeps the same '$n'.
+
+    Returns a tuple of:
+        name      (str): the prepared statement's name
+        statement (str): the statement text, with '$n' parameters
+        names    (list): the parameter names, in '$n' order
+    """
+    names = []
+
+    def positional( match ) -> str:
+        if match.group(1) not in names:
+            names.append( match.group(1) )
+        return f"${names.index( match.group(1) ) + 1}"
+
+    statement = re.sub( r"%\((\w+)\)s", positional, statement )
+    statement = statement.replace( "%%", "%" ) # no more Python '%' formatting
+
+    return ( name, statement, names )
+
+
+def convert_import_value( column_name: str, value, **kwargs ):
+    """Converts one CSV value to the Python type psycopg2 binds for its
+    column: '' ==> None (NULL) for nullable columns, numeric ==> Decimal,
+    integer ==> int, anything else is left as it is (usually a str).
+
+    Raises:
+        ValueError: if a numeric column's value isn't a number
+    """
+    data_type = kwargs.get( 'AMS_coltypes', {} ).get( column_name, 'NO_DATA_TYPE' )
+
+    if not isinstance( value, str ): # a :defaults value, not from the CSV file
+        return value
+
+    if value == '' and column_name in kwargs.get( 'AMS_nullable', [] ):
+        return None
+
+    try:
+        if data_type in AMS_INTEGER_TYPES:
+            return int( value.strip() )
+        if data_type in AMS_NUMERIC_TYPES:
+            return decimal.Decimal( value.strip() )
+    except ( ValueError, decimal.InvalidOperation ):
+        raise ValueError( f"'{column_name}' should be {data_type}, not '{value}'" )
+
+    return value
+
+
+# Name of the temporary table bulk imports are COPY'd into
+AMS_STAGING_TABLE = "ams_import_staging"
+
+
+def bulk_import_csv( file_path, SQL_query, **kwargs ) -> str:
+    """Imports a CSV file in bulk: validates every row in Python, streams the
+    good rows into a temporary staging table with 'COPY ... FROM STDIN', then
+    runs each of the report's INSERT statements once, set-based, against the
+    staging table. Enabled for an import script with this directive:
+
+        -- :defaults => { 'AMS_import': True, 'AMS_bulk': True }
+
+    The report's SQL is rewritten (see bulk_import_statement) so that:
+        VALUES ( %(COL)s, ... )      ==> SELECT staging."COL", ... FROM staging
+        DO UPDATE SET col = %(COL)s  ==> DO UPDATE SET col = EXCLUDED.col
+
+    All statements run in a single transaction; nothing is saved on error.
+    Rows rejected in Python, and earlier copies of a row whose ON CONFLICT
+    key appears again later in the file, are printed and saved to
+    '<file>_rejects.csv'.
+
+    Returns:
+        str: a printable summary of the import
+    """
+    kwargs = get_database_column_properties( **kwargs )
+
+    ( columns, rows, rejects, superseded ) = read_bulk_import_csv( file_path, SQL_query, **kwargs )
+
+    for ( line_number, row, reason ) in rejects:
+        display_error( f"Rejected line {line_number}: {reason}" )
+
+    for ( line_number, row, reason ) in superseded:
+        print( Color.BRIGHT_YELLOW.value + f"Skipped line {line_number}: {reason}" + Color.DEFAULT.value )
+
+    if len( rejects ) + len( superseded ) > 0:
+        rejects_path = f"{os.path.splitext( file_path )[0]}_rejects.csv"
+        with open( rejects_path, mode='w', newline='' ) as rejects_file:
+            writer = csv.writer( rejects_file )
+            writer.writerow( [ 'line_number', 'reason' ] + columns )
+            for ( line_number, row, reason ) in sorted( rejects + superseded, key=lambda reject: reject[0] ):
+                writer.writerow( [ line_number, reason ] + row )
+        print( f"Rejected and superseded rows saved to '{rejects_path}'." )
+
+    if len( rows ) == 0:
+        raise ValueError( f"No valid rows to import from '{file_path}'." )
+
+    # Staging column types come from the database (or AMS_coltypes_overrides)
+    AMS_coltypes  = kwargs.get( 'AMS_coltypes',  {} )
+    AMS_udt_names = kwargs.get( 'AMS_udt_names', {} )
+    staging_columns = []
+    for column_name in columns:
+        data_type = AMS_coltypes.get( column_name, 'text' )
+        if data_type in ( 'USER-DEFINED', 'ARRAY' ): # enums, etc. use their type name
+            data_type = AMS_udt_names.get( column_name, 'text' )
+        staging_columns.append( f'"{column_name}" {data_type}' )
+
+    # Python-style parameters which aren't CSV columns are bound from kwargs
+    statements = [ bulk_import_statement( statement, columns )
+                   for statement in re.split( r";\s*(?:\n|$)", SQL_query )
+                   if statement.strip() != '' ]
+
+    connection = None
+    cursor     = None
+
+    try:
+        connection = connect_to_database()
+        cursor = connection.cursor( cursor_factory=psycopg2.extras.DictCursor )
+
+        cursor.execute(
+                f"CREATE TEMPORARY TABLE {AMS_STAGING_TABLE} ( " +
+                ", ".join( staging_columns ) +
+                " ) ON COMMIT DROP;"
+        )
+
+        # CSV 'COPY' treats unquoted empty fields as NULL, quoted ones as ''
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write( ",".join(
+                    '' if value is None else '"' + value.replace( '"', '""' ) + '"'
+                    for value in row ) + "\n" )
+        buffer.seek( 0 )
+
+        quoted_columns = ", ".join( f'"{column_name}"' for column_name in columns )
+        cursor.copy_expert(
+                f"COPY {AMS_STAGING_TABLE} ( {quoted_columns} ) FROM STDIN WITH ( FORMAT csv )",
+                buffer
+        )
+        print( f"Staged {len( rows )} rows from '{file_path}'." )
+
+        for ( number, statement ) in enumerate( statements, start=1 ):
+            cursor.execute( statement, kwargs )
+            target = re.search( r"INSERT\s+INTO\s+([\w.]+)", statement, re.IGNORECASE )
+            target = target.group( 1 ) if target else f"statement {number}"
+
+            if cursor.description is not None: # RETURNING ..., ams_inserted
+                results  = cursor.fetchall()
+                inserted = sum( 1 for result in results if result['ams_inserted'] )
+                updated  = len( results ) - inserted
+            else:
+                inserted = max( cursor.rowcount, 0 )
+                updated  = 0
+
+            skipped = len( rows ) - inserted - updated
+            print( f"Imported into '{target}': {inserted} inserted, " +
+                   f"{updated} updated, {skipped} unchanged / skipped." )
+
+        connection.commit() # save every statement, together
+        cursor.close()
+        connection.close()
+
+    except Exception as e:
+        # In case of error, roll back and report the failure
+        if connection is not None:
+            connection.rollback()
+        if cursor is not None:
+            cursor.close()
+        if connection is not None:
+            connection.close()
+        raise e # Jump back to execute_sql_query( ... )
+
+    return Color.BRIGHT_GREEN.value + \
+           f"Bulk import of {len( rows )} rows finished " + \
+           f"({len( rejects )} rejected, {len( superseded )} superseded by a later row)." + \
+           Color.DEFAULT.value
+
+
+def read_bulk_import_csv( file_path, SQL_query: str, **kwargs ) -> Tuple[ List[str], List[list], List[tuple], List[tuple] ]:
+    """Reads and validates an import CSV file for bulk_import_csv().
+
+    A row is rejected when it has the wrong number of columns, or a numeric
+    column which isn't a number. Empty strings in nullable columns become
+    'None' (NULL). A set-based 'ON CONFLICT DO UPDATE' can't touch a row
+    twice, so when rows share any statement's conflict key (see
+    bulk_import_conflict_key) only the last one is kept, as a row-at-a-time
+    import would have left it; the earlier ones are superseded.
+
+    Returns a tuple of:
+        columns    (list): the CSV header, without its byte-order mark
+        rows       (list): the accepted rows, as lists of str / None
+        rejects    (list): ( line_number, row, reason ) tuples
+        superseded (list): ( line_number, row, reason ) tuples
+    """
+    AMS_nullable = kwargs.get( 'AMS_nullable', [] )
+    AMS_coltypes = kwargs.get( 'AMS_coltypes', {} )
+
+    accepted = [] # ( line_number, row, values )
+    rejects  = []
+
+    with open( file_path, mode='r', newline='' ) as csvfile:
+        reader = csv.reader( csvfile )
+
+        # read columns, then remove the byte-order mark from column 0
+        columns = reader.__next__()
+        match = re.match( r"^(.*?)([a-zA-Z0-9_]*)$", columns[0] )
+        columns[0] = match.group(2)
 
         for row in reader:
             if len( row ) == 0: # skip over blank rows
                 continue
 
-            row_dict = dict(  zip( columns, row )  ) # column->key, datum->value
-            row_kwargs = kwargs | row_dict # merges defaults with row-specific keys
+            line_number = reader.line_num
 
-            # apply AMS_nullable, where needed
-            for column_name in AMS_coltypes:
-                data_type    = row_kwargs['AMS_coltypes'].get( column_name, 'NO_DATA_TYPE' )
-                column_value = row_kwargs.get( column_name, 'NO_VALUE' )
-                if column_name in AMS_nullable:
-                    is_nullable   = True
-                else:
-                    is_nullable   = False
-
-                if DeBuG: print( f"Debug: Examining '{column_name}'\t\tValue?: '{column_value}'\t\tNullable?: '{is_nullable}'\t\tData type: '{data_type}'." )
-                if column_value == '' and is_nullable:
-                    if DeBuG: print( f"Debug: Detected '{column_name}' (== '{column_value}') is empty and nullable." )
-                    row_kwargs[column_name] = "NULL"
-                elif data_type == 'numeric' or data_type == 'integer':
-                    if DeBuG: print( f"Debug: Detected '{column_name}' (== '{column_value}' / '{data_type}') is numeric. (not quoted)" )
-                    pass
-                elif column_value != 'NO_VALUE': # quote this parameter
-                        if DeBuG: print( f"Debug: Detected '{column_name}' (== '{column_value}') is defined and/or non-nullable." )
-                        # column_value =~ s/'/''/ BOOGA BLEGGA
-                        column_value = re.sub(r"'", r"''", column_value )
-                        row_kwargs[column_name] = f"'{column_value}'"
+            if len( row ) != len( columns ):
+                rejects.append( ( line_number, row,
+                        f"expected {len( columns )} columns, found {len( row )}" ) )
+                continue
 
-            try:
-                # See replace_python_parameters() for the other use of '%'
-                SQL_import_row = SQL_query % row_kwargs
-            except KeyError as e:
-                display_error( f"Error: execute_sql_query(): Python 'string % dict' failed for the following query:" +
-                            f"\nException text: {e}" +
-                            f"\nSQL query     : '{SQL_query}'" )
-                raise e # Jump back to reports_menu( ... )
-            
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore") # ignore "pandas only supports SQLAlchemy / sqlite"
-                df = pd.read_sql_query( SQL_import_row, database.connection )
-                # dataframe, indexed by first column's name, first item in list
-                # If the SQL query has " RETURNING not_column_0 " then 'AMS_returning'
-                # needs to be defined in the SQL query's :defaults => { 'AMS_returning':
-                # 'book_title' }. The usual assumption is RETURNING sends back column 0.
-                update_column = row_kwargs.get( 'AMS_returning', columns[0] )
-                row_identifier = df[ update_column ][0]
-                print( f"Imported / updated: '{row_identifier}'" )
+            values = []
+            reason = None
+            for ( column_name, value ) in zip( columns, row ):
+                data_type = AMS_coltypes.get( column_name, 'NO_DATA_TYPE' )
+
+                if value == '' and column_name in AMS_nullable:
+                    value = None
+                elif data_type in AMS_NUMERIC_TYPES or data_type in AMS_INTEGER_TYPES:
+                    try:
+                        number = decimal.Decimal( value.strip() )
+                        if not number.is_finite() or \
+                                ( data_type in AMS_INTEGER_TYPES and number != number.to_integral_value() ):
+                            raise decimal.InvalidOperation
+                        value = value.strip()
+                    except decimal.InvalidOperation:
+                        reason = f"'{column_name}' should be {data_type}, not '{value}'"
+                        break
+
+                values.append( value )
+
+            if reason is not None:
+                rejects.append( ( line_number, row, reason ) )
+            else:
+                accepted.append( ( line_number, row, values ) )
+
+    # Each statement's conflict key, as CSV column positions
+    key_columns = []
+    for statement in re.split( r";\s*(?:\n|$)", SQL_query ):
+        key = bulk_import_conflict_key( statement, columns )
+        if len( key ) > 0 and key not in key_columns:
+            key_columns.append( key )
+
+    # The last line with each key value (NULLs never conflict)
+    last_lines = [ {} for _ in key_columns ]
+    for ( line_number, row, values ) in accepted:
+        for ( key, last_line ) in zip( key_columns, last_lines ):
+            key_value = tuple( values[ columns.index( name ) ] for name in key )
+            if None not in key_value:
+                last_line[key_value] = line_number
+
+    rows       = []
+    superseded = []
+    for ( line_number, row, values ) in accepted:
+        reason = None
+        for ( key, last_line ) in zip( key_columns, last_lines ):
+            key_value = tuple( values[ columns.index( name ) ] for name in key )
+            if last_line.get( key_value, line_number ) != line_number:
+                reason = ( f"superseded by line {last_line[key_value]} " +
+                           f"(same {', '.join( key )} {', '.join( repr( value ) for value in key_value )})" )
+                break
+
+        if reason is not None:
+            superseded.append( ( line_number, row, reason ) )
+        else:
+            rows.append( values )
 
-    database.commit() # save the database changes
+    return ( columns, rows, rejects, superseded )
 
-    return
+
+def bulk_import_conflict_key( statement: str, columns: List[str] ) -> List[str]:
+    """Finds the CSV columns an import statement's 'ON CONFLICT ( ... )'
+    target is made from: each conflict column's VALUES expression, matched
+    by position in the INSERT column list (e.g. 'doc_number' ==>
+    '%(DOC_NUMBER)s' ==> 'DOC_NUMBER'), or else the CSV column of the same
+    name (ignoring case). Conflict columns that don't come from the CSV
+    file (constants, defaults) are left out.
+
+    Returns:
+        list: CSV column names, or [] if there's no ON CONFLICT target
+    """
+    statement = re.sub( r"--[^\n]*", "", statement ) # comments may hold ',' or '(...)'
+
+    conflict = re.search( r"\bON\s+CONFLICT\s*\(([^)]*)\)", statement, re.IGNORECASE )
+    if not conflict:
+        return []
+    conflict_columns = [ name.strip().strip( '"' ).lower() for name in conflict.group( 1 ).split( "," ) ]
+
+    # INSERT INTO table ( col, ... ) VALUES ( expression, ... )
+    insert_columns = []
+    expressions    = []
+    insert = re.search( r"\bINSERT\s+INTO\s+[\w.\"]+\s*\(([^)]*)\)\s*VALUES\s*\(", statement, re.IGNORECASE )
+    if insert:
+        insert_columns = [ name.strip().strip( '"' ).lower() for name in insert.group( 1 ).split( "," ) ]
+        ( depth, start, index ) = ( 1, insert.end(), insert.end() )
+        while depth > 0 and index < len( statement ): # split at top-level ','
+            if   statement[index] == '(':  depth += 1
+            elif statement[index] == ')':  depth -= 1
+            elif statement[index] == "'": # skip over string literals
+                index = statement.index( "'", index + 1 )
+            if ( depth == 1 and statement[index] == ',' ) or depth == 0:
+                expressions.append( statement[ start:index ] )
+                start = index + 1
+            index += 1
+
+    csv_columns = { column_name.lower(): column_name for column_name in columns }
+    key = []
+    for conflict_column in conflict_columns:
+        if conflict_column in insert_columns and len( expressions ) == len( insert_columns ):
+            names = [ name for name in re.findall( r"%\((\w+)\)s",
+                                                   expressions[ insert_columns.index( conflict_column ) ] )
+                      if name in columns ]
+        else:
+            names = [ csv_columns[conflict_column] ] if conflict_column in csv_columns else []
+        key.extend( name for name in names if name not in key )
+
+    return key
+
+
+def bulk_import_statement( statement: str, columns: List[str] ) -> str:
+    """Rewrites one row-at-a-time import statement as a set-based statement
+    which reads from the bulk import staging table (see bulk_import_csv).
+
+    Args:
+        statement   (str): an 'INSERT ... VALUES ( %(COL)s, ... )' statement
+        columns    (list): the CSV columns loaded into the staging table
+    Returns:
+        str: the rewritten statement
+    """
+    # A) ON CONFLICT ... SET col = %(x)s  ==> col = EXCLUDED.col
+    #    (the staging table isn't visible in DO UPDATE, but the row it
+    #    tried to insert is, as EXCLUDED)
+    match = re.search( r"\bDO\s+UPDATE\s+SET\b", statement, re.IGNORECASE )
+    if match:
+        returning = re.search( r"\bRETURNING\b", statement[ match.end(): ], re.IGNORECASE )
+        set_end = match.end() + returning.start() if returning else len( statement )
+        set_clause = re.sub( r"(\w+)(\s*)=(\s*)%\(\w+\)s",
+                             r"\1\2=\3EXCLUDED.\1",
+                             statement[ match.end():set_end ] )
+        statement = statement[ :match.end() ] + set_clause + statement[ set_end: ]
+
+    # B) VALUES ( ... ) ==> SELECT ... FROM staging
+    match = re.search( r"\bVALUES\s*\(", statement, re.IGNORECASE )
+    if match:
+        depth = 1
+        index = match.end()
+        while depth > 0 and index < len( statement ):
+            if   statement[index] == '(':  depth += 1
+            elif statement[index] == ')':  depth -= 1
+            elif statement[index] == "'": # skip over string literals
+                index = statement.index( "'", index + 1 )
+            index += 1
+        statement = statement[ :match.start() ] + \
+                    "SELECT " + statement[ match.end():index - 1 ] + \
+                    f" FROM {AMS_STAGING_TABLE} AS staging " + \
+                    statement[ index: ]
+
+    # C) %(COL)s ==> staging."COL" (other parameters are bound from kwargs)
+    statement = re.sub( r"%\((\w+)\)s",
+                        lambda param: f'staging."{param.group(1)}"'
+                                      if param.group(1) in columns else param.group(0),
+                        statement )
+
+    # D) Report inserted vs. updated rows: 'xmax' is 0 for a freshly inserted row
+    if re.search( r"\bRETURNING\b", statement, re.IGNORECASE ):
+        statement = statement.rstrip() + ", ( xmax = 0 ) AS ams_inserted"
+
+    return statement
 
 
 def get_database_column_properties( **kwargs ) -> dict:
@@ -3954,10 +5939,11 @@ def get_database_column_properties( **kwargs ) -> dict:
     kwargs['AMS_nullable'] = [] # start with an empty list
     kwargs['AMS_notnull' ] = [] # start with an empty list
     kwargs['AMS_coltypes'] = {} # start with an empty dictionary
+    kwargs['AMS_udt_names'] = {} # start with an empty dictionary
 
     for table in kwargs.get( 'AMS_insert_tables' , [] ):
         columns_list_dict = database.fetch_rows(
-                "column_name, is_nullable, data_type", # SELECT
+                "column_name, is_nullable, data_type, udt_name", # SELECT
                 "information_schema.columns",          # FROM
                 "table_name = %s",                     # WHERE
                 (table,)                               # param(s) w/ trailing ','
@@ -3971,6 +5957,7 @@ def get_database_column_properties( **kwargs ) -> dict:
             # Save the current column's data type and nullability
             # (May overwrite the data type or generate conflicting nullability setting)
             kwargs['AMS_coltypes'][column_name] = data_type
+            kwargs['AMS_udt_names'][column_name] = coldict['udt_name'] # enum names, etc.
 
             if      is_nullable == 'YES':
                 kwargs['AMS_nullable'].append( column_name )
@@ -4018,251 +6005,480 @@ def get_database_column_properties( **kwargs ) -> dict:
 # kind, if this is not an import script (in which case, we will
 # get to it later).
 #
-def replace_SQL_variables( line: str, SQL_query: str = '', **kwargs ) -> Tuple[ str, dict ]:
+# Each report file is parsed once (see compile_report) into a list of steps,
+# in file order, which run_report_steps( ... ) walks on every run:
+#     [ 'comment',  text ]              -- '-- ' lines that aren't parameters (printed)
+#     [ 'defaults', { ... } ]           -- '-- :defaults => { ... }'
+#     [ 'list',     key, [ ... ] ]      -- '-- :key => [ 'a', 'b' ]'
+#     [ 'prompt',   key, prompt ]       -- '-- :key => Enter a value'
+#     [ 'sql',      line, segments ]    -- a line of SQL, split into text and parameter slots:
+#           [ 'text', '...' ], [ ':', name, context, starts, ends ], [ '%', name, ... ]
+#
+# Every parameter is then bound by psycopg2 (see build_report_query), rather
+# than written into the SQL text, except in import scripts (and in reports
+# with ':defaults => { 'AMS_bind': False }', e.g. for a parameter that is a
+# table or column name).
+#
+REPORT_DIRECTIVE_PATTERN = re.compile( r"""   # (raw) triple-quoted regular expression
+        ^ -- \s+ :  # Start of line, leading dashes, space(s), colon ':'
+        (.*?) \s+   # group(1) matches variable (not the ':') and space(s)
+        \=\> \s+    # followed by '=>' and more whitespace(s)
+        (.*?)       # group(2) matches a [list], a {dict}, or any kind of prompt text
+        \s* $ """,  # with optional trailing whitespace and end of line
+        re.VERBOSE  # ignore comments/whitespace in the r'' string
+)
+
+# SQLAlchemy requires parameters " :like_this "
+#    (But, we must skip any " :: " we see, so there
+#     is a " (?<!:) " zero-width negative look-behind assertion
+REPORT_COLON_PARAMETER  = re.compile( r"(?<!:)\:([a-zA-Z0-9_]+)" )
+REPORT_PYTHON_PARAMETER = re.compile( r"%\(([a-zA-Z0-9_]+)\)s" )
+REPORT_PYTHON_TOKEN     = re.compile( r"%%|%\(([a-zA-Z0-9_]+)\)s" ) # ... and '%%', a literal '%'
+
+
+class CompiledReport:
+    """A reports/*.sql file, parsed once into the steps above. The file's
+    modification time, size and SHA-1 say whether it is still current."""
+
+    def __init__( self, file_name: str, steps: list, mtime_ns: int = 0, size: int = 0, sha1: str = "" ):
+        self.file_name = file_name
+        self.steps     = steps
+        self.mtime_ns  = mtime_ns
+        self.size      = size
+        self.sha1      = sha1
+
+        # Metadata, for code that doesn't run the report (e.g. the report's
+        # description, and whether it is an import)
+        self.description = "".join( step[1] for step in steps if step[0] == 'comment' )
+        self.defaults    = {}
+        for step in steps:
+            if step[0] == 'defaults':
+                self.defaults = step[1] | self.defaults # earlier defaults win, as in run_report_steps
+        self.parameters = []
+        for step in steps:
+            names = [ step[1] ] if step[0] in ( 'list', 'prompt' ) else \
+                    [ segment[1] for segment in step[2] if segment[0] != 'text' ] if step[0] == 'sql' else []
+            for name in names:
+                if name not in self.parameters:
+                    self.parameters.append( name )
+
+    def to_json( self ) -> dict:
+        return { 'file_name': self.file_name, 'steps': self.steps,
+                 'mtime_ns': self.mtime_ns, 'size': self.size, 'sha1': self.sha1 }
+
+    @classmethod
+    def from_json( cls, data: dict ) -> 'CompiledReport':
+        return cls( data['file_name'], data['steps'], data['mtime_ns'], data['size'], data['sha1'] )
+
+    def is_json_safe( self ) -> bool:
+        """'False' if a :defaults or list value wouldn't survive the catalog
+        file unchanged (e.g. a tuple, or a dict with number keys)."""
+        try:
+            return json.loads( json.dumps( self.steps ) ) == self.steps
+        except ( TypeError, ValueError ):
+            return False
+
+
+def compile_report( file_name: str, text: str ) -> CompiledReport:
+    """Parses a report's text into a CompiledReport (see the steps above).
+    Raises ValueError if a list or dict parameter can't be read."""
+    steps      = []
+    AMS_import = False  # 'True' once a ':defaults' dict sets it
+    state      = 'code' # where the SQL text is, at the end of each line (see compile_report_line)
+
+    for ( line_number, line ) in enumerate( io.StringIO( text ), start=1 ):
+        if line.startswith("---") or line.startswith("\n"):
+            continue # no directive or SQL text? Skip it!
+
+        elif line.startswith("-- "):
+            directive = REPORT_DIRECTIVE_PATTERN.match( line )
+            if not directive:
+                steps.append( [ 'comment', line ] )
+                continue
+
+            key   = directive.group(1)
+            value = directive.group(2)
+            try:
+                if value.startswith( "[" ) and value.endswith( "]" ):   # A) List ---- :param    => ['a', 'b']
+                    steps.append( [ 'list', key, list( ast.literal_eval( value ) ) ] )
+                elif value.startswith( "{" ) and value.endswith( "}" ): # B) Dict ---- :defaults => {'a': 1}
+                    defaults = ast.literal_eval( value )
+                    if not isinstance( defaults, dict ):
+                        raise ValueError( "not a dict" )
+                    AMS_import = AMS_import or bool( defaults.get( 'AMS_import', False ) )
+                    steps.append( [ 'defaults', defaults ] )
+                else:                                                   # C) Prompt -- :year     => Enter a year
+                    steps.append( [ 'prompt', key, value ] )
+            except ( ValueError, SyntaxError ) as e:
+                raise ValueError( f"'{file_name}', line {line_number}: can't read ':{key}' ({e})" )
+
+        else:
+            ( segments, state ) = compile_report_line( line, AMS_import, state )
+            steps.append( [ 'sql', line, segments ] )
+
+    return CompiledReport( file_name, steps )
+
+
+def compile_report_line( line: str, AMS_import: bool, state: str = 'code' ) -> Tuple[ list, str ]:
     """
-    Replaces ':this_kind' of variables in a SQL query. If the query is not
-    marked as an 'AMS_import' query, '%(these_kind)s' of variables are also
-    replaced. If the SQL query line starts with '-- ' it may be a parameter
-    definition as a list, dictionary, or prompt.
+    Splits a line of SQL into text and parameter slots. Each slot notes
+    where it is, so it can be bound (see build_report_query):
+        'value'   -- in the SQL itself:     WHERE year = :year
+        'literal' -- in a '...' string:     WHERE quarter LIKE '%:quarter%'
+        'text'    -- in a comment or a "quoted identifier" (can't be bound)
+    and whether it starts / ends its '...' string. '%(these)s' are left
+    as text in import scripts (each CSV row fills them in later).
 
     Args:
-        line (str): Current line of SQL to scan &/or substitute into
-        SQL_query:  The 'SQL_query' lines (so far...)
-        kwargs:     A dictionary of known options
+        line       (str):  a line of SQL
+        AMS_import (bool): 'True' for import scripts
+        state      (str):  'code', 'literal', 'identifier' or 'block_comment',
+                           at the end of the previous line
+    Returns:
+        segments, and the state at the end of this line
+    """
+    tokens = [ ( match.start(), match.end(), ':', match.group(1) )
+               for match in REPORT_COLON_PARAMETER.finditer( line ) ]
+    if not AMS_import and REPORT_PYTHON_PARAMETER.search( line ):
+        # Lines with '%(these)s' were '%'-formatted, so '%%' is a literal '%'
+        tokens += [ ( match.start(), match.end(), '%' if match.group(1) else '%%', match.group(1) )
+                    for match in REPORT_PYTHON_TOKEN.finditer( line ) ]
+    tokens.sort()
+    tokens.append( ( len( line ), len( line ), None, None ) ) # the rest of the line
+
+    segments     = []
+    text         = ""
+    literal_open = None # where this line's current '...' string started
+    closed_at    = None # where the last '...' string ended (a '' is an escaped quote)
+    position     = 0
+
+    for ( start, end, kind, name ) in tokens:
+        if start < position:
+            continue # overlaps the previous token
+
+        # Follow the SQL text up to the token
+        index = position
+        while index < start:
+            char = line[index]
+            if state == 'code':
+                if char == "'":
+                    if closed_at != index - 1:
+                        literal_open = index
+                    state = 'literal'
+                elif char == '"':
+                    state = 'identifier'
+                elif line.startswith( '--', index ):
+                    state = 'line_comment'
+                elif line.startswith( '/*', index ):
+                    state = 'block_comment'
+                    index += 1
+            elif state == 'literal':
+                if char == "'":
+                    state     = 'code'
+                    closed_at = index
+            elif state == 'identifier':
+                if char == '"':
+                    state = 'code'
+            elif state == 'block_comment':
+                if line.startswith( '*/', index ):
+                    state = 'code'
+                    index += 1
+            index += 1
+
+        text += line[ position : start ]
+        if kind == '%%':
+            text += '%'
+        elif kind is not None:
+            if text:
+                segments.append( [ 'text', text ] )
+                text = ""
+            context = { 'code': 'value', 'literal': 'literal' }.get( state, 'text' )
+            starts  = state == 'literal' and literal_open == start - 1
+            ends    = state == 'literal' and line[ end : end + 1 ] == "'" and line[ end + 1 : end + 2 ] != "'"
+            segments.append( [ kind, name, context, starts, ends ] )
+        position = end
+
+    if text:
+        segments.append( [ 'text', text ] )
+    if state == 'line_comment':
+        state = 'code' # '--' comments end with the line
+    return ( segments, state )
+
+
+def run_report_steps( report: CompiledReport, kwargs: dict = None, interactive: bool = True ) -> Tuple[ str, dict ]:
+    """
+    Runs a compiled report's steps, in file order: prints its comments,
+    applies its ':defaults', asks for its list / prompt parameters, and
+    asks for any parameter in its SQL text that is still undefined.
+
+    Args:
+        report      (CompiledReport): from REPORT_CATALOG.report( ... )
+        kwargs      (dict):           known parameters (not modified)
+        interactive (bool):           'False' prints nothing and asks for
+                                      nothing: every parameter must be in
+                                      kwargs (or the ':defaults'), or this
+                                      raises a ValueError
 
     Returns:
-        SQL_query: The input 'SQL_query' with 'line' suffixed with
-        SQLAlchemy (and printf-style?) parameters replaced.
-        kwargs:    Updated dictionary of SQL parameters
+        SQL_query: the report's SQL text (see build_report_query)
+        kwargs:    the report's parameters and 'AMS_*' options, with
+                   'AMS_parameters' set to the query's bound parameters
+                   (or 'None' if its parameters were replaced as text)
     """
-    AMS_import = kwargs.get( 'AMS_import', False ) # 'False' if undefined
+    kwargs    = dict( kwargs or {} )
+    SQL_lines = [] # the 'sql' steps, built into a query once every parameter is known
+
+    for step in report.steps:
+        kind = step[0]
+
+        if not interactive:
+            if kind in ( 'list', 'prompt' ) and kwargs.get( step[1], None ) is None:
+                raise ValueError( f"'{report.file_name}' needs a value for ':{step[1]}'" )
+            elif kind == 'sql':
+                for segment in step[2]:
+                    if segment[0] != 'text' and kwargs.get( segment[1], None ) is None:
+                        raise ValueError( f"'{report.file_name}' needs a value for ':{segment[1]}'" )
+            if kind != 'defaults':
+                if kind == 'sql':
+                    SQL_lines.append( step )
+                continue # (the 'defaults' are applied below)
+
+        if kind == 'comment': # If we didn't parse a parameter, print this comment
+            print(
+                    Color.BRIGHT_GREEN.value +  step[1]  + Color.DEFAULT.value,
+                    end='' # the comment already has a '\n'
+            )
 
-    if line.startswith("---") or line.startswith("\n"):
-        return ( SQL_query, kwargs ) # no directive or SQL text? Skip it!
-    
-    elif line.startswith("-- "):
-        ( SQL_query, kwargs ) = read_SQL_report_parameter( line, SQL_query, **kwargs )
-        return ( SQL_query, kwargs )
-    
-    else:
-        # process a SQL query fragment:
-        # A) Replace parameters " :like_this "
-        ( SQL_line, kwargs ) = replace_SQLAlchemy_parameters( line, SQL_query, **kwargs )
-        # B) Replace parameters " %(like_this)s "
-        #    (these replacements are deferred for import scripts)
-        if not AMS_import:
-            ( SQL_line, kwargs ) = replace_Python_parameters( SQL_line, SQL_query, **kwargs )
-        # C) add the fragment to the built-up SQL query string
-        SQL_query += SQL_line
-        return ( SQL_query, kwargs )
+        elif kind == 'defaults':
+            # copy the defaults (imports add to their lists), then override with kwargs
+            kwargs = copy.deepcopy( step[1] ) | kwargs
+
+        elif kind == 'list':
+            ( key, options ) = ( step[1], step[2] )
+            value = report_parameter_from_list(
+                    [ f":{key} - choose one of the below options, " +
+                      f"or enter a parameter value" ] + options
+            )
+            if value == '':
+                raise Exception( "Exited the reports menu.")
+            kwargs[key] = value # save the chosen value for later use
+
+        elif kind == 'prompt':
+            ask_report_parameter( step[1], step[2], kwargs )
+
+        elif kind == 'sql':
+            ask_missing_report_parameters( step[1], step[2], SQL_lines, kwargs )
+            SQL_lines.append( step )
+
+    # Import scripts (and reports with 'AMS_bind': False) get their values as text
+    bind = not kwargs.get( 'AMS_import', False ) and kwargs.get( 'AMS_bind', True )
+
+    ( SQL_query, kwargs['AMS_parameters'] ) = build_report_query( SQL_lines, kwargs, bind )
+
+    return ( SQL_query, kwargs )
+
+
+def ask_report_parameter( key: str, prompt: str, kwargs: dict ) -> None:
+    """Prompts for a parameter's value, into kwargs[key]. A blank value
+    exits the report, unless the key is in the 'AMS_blank' list."""
+    value = report_parameter_from_list( [ f":{key} - enter a parameter value", prompt ] )
 
-    return( SQL_query, kwargs ) # If the code changes, this may be returned...
+    if value == '' and key not in kwargs.get( 'AMS_blank', [] ):
+        raise Exception( "Exited the reports menu.")
 
+    kwargs[key] = value # save the chosen value for later use
 
-def replace_SQLAlchemy_parameters( line: str, SQL_query: str, **kwargs ) -> Tuple[ str, dict ]:
+
+def report_segments_text( segments: list ) -> str:
+    """A compiled line's text, with its parameters as they were written."""
+    return "".join( segment[1] if segment[0] == 'text' else
+                    f":{segment[1]}" if segment[0] == ':' else f"%({segment[1]})s"
+                    for segment in segments )
+
+
+def ask_missing_report_parameters( line: str, segments: list, SQL_lines: list, kwargs: dict ) -> None:
+    """Asks for each undefined parameter in a compiled line of SQL (the
+    lines before it are only shown in the warning)."""
+    for ( index, segment ) in enumerate( segments ):
+        ( kind, parameter ) = segment[:2]
+        if kind == 'text' or kwargs.get( parameter, None ) is not None:
+            continue
+
+        if kind == ':':
+            # Print a descriptive warning message
+            display_error( Color.BRIGHT_YELLOW.value + f"Warning: Parameter, " +
+                    f"'{parameter}' undefined in current SQL fragment:" +
+                    f"\n\n{''.join( SQL_line[1] for SQL_line in SQL_lines )}\n{line}\n\t" +
+                    f"{report_segments_text( segments[ : index ] )}  " +
+                    Color.BRIGHT_RED.value +
+                    f"MISSING PARAMETER --> :{parameter} <-- MISSING PARAMETER" +
+                    Color.BRIGHT_YELLOW.value +
+                    f"  {report_segments_text( segments[ index + 1 : ] )}" +
+                    Color.DEFAULT.value
+            )
+            try:
+                ask_report_parameter( parameter, "Enter a value for this parameter (<ENTER> will leave it blank)", kwargs )
+            except Exception as e: # intercept and print any Exception
+                display_error( f"Error: ask_missing_report_parameters(): Can't handle '{line}'" +
+                       f"\nException text: {e}" )
+
+        else: # '%' -- Unknown key? Add it to the dictionary
+            ask_report_parameter( parameter, "Enter a value for this parameter (<ENTER> will leave it blank)", kwargs )
+
+
+def build_report_query( SQL_lines: list, kwargs: dict, bind: bool = True ) -> Tuple[ str, Union[ dict, None ] ]:
     """
-    Make these parameter substitutions, returning modified line:
-       SELECT asset_id FROM assets WHERE asset_id = ':asset_id'
-    Arguments:
-        line      (str): line in which to look for parameters
-        SQL_query (str): Pre-screened SQL query text (read-only)
-        kwargs   (dict): known parameters dictionary (modifed)
-    Returns a tuple of:
-        SQL_line (str): modified 'line'
-        kwargs  (dict): updated parameters dictionary
+    Builds a report's query from its compiled 'sql' steps. With 'bind',
+    each parameter becomes a '%(name)s' placeholder that psycopg2 fills in
+    (quoted for its type), so the query text is the same on every run:
+
+        WHERE year = :year                ==>  WHERE year = %(year)s
+        WHERE quarter LIKE '%:quarter%'   ==>  WHERE quarter LIKE '%%' || %(quarter)s || '%%'
+        WHERE asset_id = ':asset_id'      ==>  WHERE asset_id = %(asset_id)s
+
+    (and every other '%' is doubled). Without 'bind', or without any
+    parameters, the values are written into the text, as they always were.
+
+    Returns:
+        the query, and its parameters (or 'None' if it has no placeholders)
     """
-    SQL_line = line # assume no changes
-
-    # SQLAlchemy requires parameters " :like_this "
-    #    (But, we must skip any " :: " we see, so there
-    #     is a " (?<!:) " zero-width negative look-behind assertion
-    while re.search( r"(?<!:)\:[a-zA-Z0-9_]",  SQL_line ):
-        parameter_isolation = re.match(
-                r"""            # (raw) triple-quoted regular expression
-                ^ (.*?)         # group(1) matches everything before the first ':'
-                (?<!:)          # zero-width negative look-behind assertion
-                                # (this skips past any doubled ':' characters)
-                \:              # " :parameter " starts with " : "
-                ([a-zA-Z0-9_]+) # group(2) matches the parameter name (alphanumeric + '_')
-                (.*?) $ """,    # group(3) matches everything after :{parameter}
-                SQL_line,       # <-- MATCH IN THIS STRING
-                re.VERBOSE      # ignore comments/whitespace in the r'' string
-        )
+    slots = [ segment for SQL_line in SQL_lines for segment in SQL_line[2]
+              if segment[0] != 'text' and ( bind and segment[2] != 'text' ) ]
+
+    if not slots:
+        return ( "".join( segment[1] if segment[0] == 'text' else f"{ kwargs.get( segment[1], '' ) }"
+                          for SQL_line in SQL_lines for segment in SQL_line[2] ), None )
+
+    SQL_query  = ""
+    parameters = {}
+    skip_quote = False # the last parameter ended its '...' string
+
+    for SQL_line in SQL_lines:
+        for segment in SQL_line[2]:
+            if segment[0] == 'text':
+                text       = segment[1][1:] if skip_quote else segment[1]
+                skip_quote = False
+                SQL_query += text.replace( '%', '%%' )
+                continue
 
-        if parameter_isolation:
-            pre_match  = parameter_isolation.group(1)
-            parameter  = parameter_isolation.group(2)
-            post_match = parameter_isolation.group(3)
-
-            if kwargs.get( parameter, None ) is None:
-                # Print a descriptive warning message
-                display_error( Color.BRIGHT_YELLOW.value + f"Warning: Parameter, " +
-                        f"'{parameter}' undefined in current SQL fragment:" +
-                        f"\n\n{SQL_query}\n{SQL_line}\n\t{pre_match}  " +
-                        Color.BRIGHT_RED.value +
-                        f"MISSING PARAMETER --> :{parameter} <-- MISSING PARAMETER" + 
-                        Color.BRIGHT_YELLOW.value +
-                        f"  {post_match}" +
-                        Color.DEFAULT.value
-                )
-                # Use replace_SQL_variables( ... ) to prompt for a value
-                try:
-                    (SQL_line, kwargs) = replace_SQL_variables(
-                            f"-- :{parameter} => Enter a value for this parameter (<ENTER> will leave it blank)",
-                            SQL_line,
-                            **kwargs
-                    )
-                except Exception as e: # intercept and print any Exception
-                    display_error( f"Error: replace_SQLAlchemy_parameters(): Can't handle '{SQL_line}'" +
-                           f"\nException text: {e}" )
+            ( _, parameter, context, starts, ends ) = segment
+            value = kwargs.get( parameter, '' )
 
-            SQL_line = f"{ pre_match }" + \
-                       f"{ kwargs.get( parameter, '' ) }" + \
-                       f"{ post_match }"
+            if context == 'text': # in a comment or an identifier
+                SQL_query += f"{ value }".replace( '%', '%%' ).replace( '\n', ' ' )
+                continue
 
-    # end ~ while search for ':this' in SQL_line ...
+            parameters[parameter] = value
+            placeholder = f"%({parameter})s"
+            if context == 'literal': # '...:parameter...' ==> '...' || %(parameter)s || '...'
+                if starts:
+                    SQL_query = SQL_query[:-1] # drop the string's opening quote
+                placeholder = ( "" if starts else "' || " ) + placeholder + ( "" if ends else " || '" )
+                skip_quote  = ends             # drop the string's closing quote
+            SQL_query += placeholder
 
-    return( SQL_line, kwargs )
+    return ( SQL_query, parameters )
 
 
-def replace_Python_parameters( line: str, SQL_query: str, **kwargs ) -> Tuple[ str, dict ]:
+class ReportCatalog:
     """
-    Make these parameter substitutions, returning modified line:
-       SELECT asset_id FROM assets WHERE asset_id = %(asset_id)s
-    Arguments:
-        line      (str): line in which to look for parameters
-        SQL_query (str): Pre-screened SQL query text (read-only)
-        kwargs   (dict): known parameters dictionary (modifed)
-    Returns a tuple of:
-        SQL_line (str): modified 'line'
-        kwargs  (dict): updated parameters dictionary
+    The compiled reports in each reports directory. A directory is only
+    re-listed when its modification time changes, and a report is only
+    re-parsed when its text changes (its modification time and size are
+    checked on every use, then its SHA-1 if they differ). Compiled reports
+    are also saved to a JSON file, so a new session doesn't re-parse them.
     """
-    SQL_line = line # assume no changes
-
-    parameters = re.findall( r'%\(([a-zA-Z0-9_]+)\)', SQL_line )
-    made_a_replacement = False # prevent over-eager use of string '%'
-
-    for param in parameters:
-        print(f"replace_Python_parameters: Examining '{param}'.")
-        made_a_replacement = True
-        if kwargs.get( param, None) == None:
-            # Unknown key? Add it to the dictionary
-            (SQL_query, kwargs) = replace_SQL_variables(
-                    f"-- :{param} => Enter a value for this parameter (<ENTER> will leave it blank)",
-                    SQL_query,
-                    **kwargs
-            )
 
-    try:
-        # Avoid processing SQL wildcards like this:
-        # >>>  WHERE scheduled_quarter LIKE '%Summer%'
-        # If the text needs both %(this)s and SQL '%' wildcards,
-        # in the same line, double up the SQL wildcard, as '%%'.
-        if made_a_replacement:
-            # See also execute_sql_query() for the other use of '%'
-            SQL_line = line % kwargs # substitute, using dictionary keys/values
-
-    except KeyError as e:
-        display_error( f"Error: replace_Python_parameters(): Python 'string % dict' failed for '{SQL_line}'" +
-                       f"\nException text: {e}" )
-        raise e # Jump back to reports_menu( ... )
-
-    return( SQL_line, kwargs )
-
-
-def read_SQL_report_parameter( line: str, SQL_query: str, **kwargs ) -> Tuple[ str, dict ]:
-    """There are three kinds of parameters to read:
-    A  )  List ---- :param    => ['option a', 'option b', 'option c']
-     B )  Dict ---- :defaults => {'source': 'BOOK', 'Columbus': 1492}
-    C  )  Prompt -- :year     => Enter a four-digit year
-    This function reads the parameter from the file and (unless it's a dict)
-    presents it to the user for a decision. Dicts set parameter defaults."""
-
-    # A) Parse a list -- :param => ['a', 'b', 'c']
-    key_list = re.match( r"""   # (raw) triple-quoted regular expression
-            ^ -- \s+ :  # Start of line, leading dashes, space(s), colon ':'
-            (.*?) \s+   # group(1) matches variable (not the ':') and space(s)
-            \=\> \s+    # followed by '=>' and more whitespace(s)
-            (\[.*\])    # group(2) matches '[' then list item(s) then ']'
-            \s* $ """,  # with optional trailing whitespace and end of line
-            line,       # <-- MATCH IN THIS STRING
-            re.VERBOSE  # ignore comments/whitespace in the r'' string
-    )
-    
-    if key_list:
-        key      = key_list.group(1)
-        raw_list = key_list.group(2)
-        real_list: List[str] = ast.literal_eval( raw_list )
-        real_list.insert(
-                0, # inserts this header before all the options
-                f":{key} - choose one of the below options, " +
-                f"or enter a parameter value"
-        )
-        value = report_parameter_from_list( real_list )
-        if value == '':
-            raise Exception( "Exited the reports menu.")
-        kwargs[key] = value # save the chosen value for later use
-        # return 'SQL_query' unchanged and 'kwargs' with an added entry
-        return ( SQL_query, kwargs )
-
-    # Parse a dict -- :defaults => {'source': 'BOOK', 'Columbus': 1492}
-    key_dict = re.match( r"""   # (raw) triple-quoted regular expression
-            ^ -- \s+ :  # Start of line, leading dashes, space(s), colon ':'
-            (.*?) \s+   # group(1) matches variable (not the ':') and space(s)
-            \=\> \s+    # followed by '=>' and more whitespace(s)
-            (\{.*\})    # group(2) matches '{' then dict item(s) then '}'
-            \s* $ """,  # with optional trailing whitespace and end of line
-            line,       # <-- MATCH IN THIS STRING
-            re.VERBOSE  # ignore comments/whitespace in the r'' string
-    )
+    FORMAT = 2 # bump this when CompiledReport's steps change
+
+    def __init__( self, cache_file: str = None ):
+        self.cache_file = cache_file # 'None' keeps the catalog in memory only
+        self.lock       = threading.Lock()
+        self.listings   = {}   # directory: ( directory mtime_ns, [ .sql file names ] )
+        self.reports    = {}   # file path: CompiledReport
+        self.loaded     = False
+
+    def report_names( self, directory: str ) -> List[str]:
+        """The '.sql' file names in a directory, in os.listdir( ... ) order."""
+        mtime_ns = os.stat( directory ).st_mtime_ns
+        with self.lock:
+            listing = self.listings.get( directory )
+            if listing is None or listing[0] != mtime_ns:
+                listing = ( mtime_ns, [ filename for filename in os.listdir( directory )
+                                        if filename.endswith( ".sql" ) ] )
+                self.listings[directory] = listing
+            return list( listing[1] )
+
+    def report( self, directory: str, file_name: str ) -> CompiledReport:
+        """Returns a report's CompiledReport, parsing it only if it changed.
+        Raises OSError if it can't be read, or ValueError if it can't be parsed."""
+        file_path = os.path.join( directory, file_name )
+        stat      = os.stat( file_path )
+
+        with self.lock:
+            self.load()
+            report = self.reports.get( file_path )
+            if report is not None and report.mtime_ns == stat.st_mtime_ns and report.size == stat.st_size:
+                return report
+
+        with open( file_path, 'r' ) as SQLinput:
+            text = SQLinput.read()
+        sha1 = hashlib.sha1( text.encode( 'utf-8', 'surrogateescape' ) ).hexdigest()
+
+        if report is None or report.sha1 != sha1:
+            report = compile_report( file_name, text )
+            report.sha1 = sha1
+        ( report.mtime_ns, report.size ) = ( stat.st_mtime_ns, stat.st_size ) # (or it was only touched)
+
+        with self.lock:
+            self.reports[file_path] = report
+            self.save()
+        return report
+
+    def clear( self ) -> None:
+        with self.lock:
+            self.listings.clear()
+            self.reports.clear()
+            self.save()
+
+    def load( self ) -> None:
+        """Reads the catalog file, once (call with the lock held)."""
+        if self.loaded:
+            return
+        self.loaded = True
+        if not self.cache_file or not os.path.exists( self.cache_file ):
+            return
+        try:
+            with open( self.cache_file, 'r', encoding='utf-8' ) as catalog_file:
+                data = json.load( catalog_file )
+            if data.get( 'format' ) == self.FORMAT:
+                for ( file_path, report ) in data.get( 'reports', {} ).items():
+                    self.reports[file_path] = CompiledReport.from_json( report )
+        except ( OSError, ValueError, KeyError, AttributeError ):
+            self.reports.clear() # unreadable or from an older version: re-parse as needed
+
+    def save( self ) -> None:
+        """Rewrites the catalog file (call with the lock held). Saving is
+        best-effort: the catalog still works in memory without it."""
+        if not self.cache_file:
+            return
+        data = { 'format': self.FORMAT,
+                 'reports': { file_path: report.to_json() for ( file_path, report ) in self.reports.items()
+                              if report.is_json_safe() } }
+        temporary_file = f"{self.cache_file}.{os.getpid()}.tmp"
+        try:
+            with open( temporary_file, 'w', encoding='utf-8' ) as catalog_file:
+                json.dump( data, catalog_file )
+            os.replace( temporary_file, self.cache_file ) # other sessions never see half a file
+        except OSError:
+            if os.path.exists( temporary_file ):
+                os.remove( temporary_file )
 
-    if key_dict:
-        key      = key_dict.group(1)
-        raw_dict = key_dict.group(2)
-        real_dict: dict[str,str] = ast.literal_eval( raw_dict )
-        kwargs = real_dict | kwargs # copy real_dict, then override with kwargs
-        # return 'SQL_query' unchanged and 'kwargs' with an added entry(-ies)
-        return ( SQL_query, kwargs )
-
-    # Parse a prompt -- :param Enter a year, or something clever
-    key_prompt = re.match( r"""   # (raw) triple-quoted regular expression
-            ^ -- \s+ :  # Start of line, leading dashes, space(s), colon ':'
-            (.*?) \s+   # group(1) matches variable (not the ':') and space(s)
-            \=\> \s+    # followed by '=>' and more whitespace(s)
-            (.*?)       # group(2) matches any kind of text
-            \s* $ """,  # with optional trailing whitespace and end of line
-            line,       # <-- MATCH IN THIS STRING
-            re.VERBOSE  # ignore comments/whitespace in the r'' string
-    )
 
-    if key_prompt:
-        key    = key_prompt.group(1)
-        prompt = key_prompt.group(2)
-        real_list = [
-            f":{key} - enter a parameter value",
-            prompt,
-        ]
-        value = report_parameter_from_list( real_list )
-
-        blank_keys = kwargs.get( 'AMS_blank', [] ) # check if key may be omitted
-        for blank_key in blank_keys:
-            if key == blank_key:
-                break
-        else: # prompted value is not in (optional) 'AMS_blank' list
-            if value == '':
-                raise Exception( "Exited the reports menu.")
-            
-        kwargs[key] = value # save the chosen value for later use
-        # return 'SQL_query' unchanged and 'kwargs' with an added entry
-        return ( SQL_query, kwargs )
-    
-    # If we didn't parse a parameter, print this comment
-    print(
-            Color.BRIGHT_GREEN.value +  line  + Color.DEFAULT.value,
-            end='' # the variable {line} already has a '\n'
-    )
-    return ( SQL_query, kwargs )
-    
+REPORT_CATALOG = ReportCatalog(
+        cache_file=getattr( config, "REPORT_CATALOG_FILE", os.path.join( SCRIPT_DIRECTORY, "reports", ".report_catalog.json" ) ),
+)
+
 
 def report_parameter_from_list( options_list: List[str] ):
 
@@ -4327,30 +6543,34 @@ def transaction_history_menu() -> None:
             error_message = f"Error: transaction_history_menu:" + \
                            f"\nException text: {e}"
 
-def print_menu_sections(df: pd.DataFrame, min_width: int = 80) -> None:
+def print_menu_sections(sections: dict, min_width: int = 80) -> None:
+    """Prints { column name: [ section text, ... ] } as rows of boxes, one
+    section per box (plain Python, so the menus don't wait for pandas)."""
+    columns = list(sections.values())
+
     # Calculate the required width for each column based on content
-    content_widths = df.apply(lambda col: col.apply(lambda x: max(len(line) for line in x.split('\n')) + 4)).max()
+    content_widths = [max(max(len(line) for line in cell.split('\n')) + 4 for cell in column) for column in columns]
 
     # Calculate total content width without spaces between boxes
-    total_content_width = content_widths.sum()
+    total_content_width = sum(content_widths)
 
     # Adjust column widths if total is less than min_width
     if total_content_width < min_width:
         extra_width = min_width - total_content_width
-        extra_per_column = extra_width // len(df.columns)
-        content_widths = content_widths + extra_per_column
+        extra_per_column = extra_width // len(columns)
+        content_widths = [width + extra_per_column for width in content_widths]
 
         # Distribute any remaining width to the last column (if not evenly divisible)
-        remaining_width = extra_width % len(df.columns)
-        content_widths.iloc[-1] += remaining_width
+        remaining_width = extra_width % len(columns)
+        content_widths[-1] += remaining_width
 
-    for _, row in df.iterrows():
+    for row in zip(*columns):
         # Calculate the maximum number of lines in the current row
         max_lines = max(len(str(cell).split('\n')) for cell in row)
 
         # Prepare the top and bottom borders for each box in the row
-        top_borders = ['┌' + '─' * (content_widths.iloc[i] - 2) + '┐' for i in range(len(content_widths))]
-        bottom_borders = ['└' + '─' * (content_widths.iloc[i] - 2) + '┘' for i in range(len(content_widths))]
+        top_borders = ['┌' + '─' * (width - 2) + '┐' for width in content_widths]
+        bottom_borders = ['└' + '─' * (width - 2) + '┘' for width in content_widths]
 
         # Print the top borders
         print("".join(top_borders))
@@ -4361,7 +6581,7 @@ def print_menu_sections(df: pd.DataFrame, min_width: int = 80) -> None:
             for i, section in enumerate(row):
                 lines = section.split('\n')
                 line_content = lines[line_index] if line_index < len(lines) else ""
-                line_str += '│ {:<{}} │'.format(line_content, content_widths.iloc[i] - 4)
+                line_str += '│ {:<{}} │'.format(line_content, content_widths[i] - 4)
             print(line_str)
 
         # Print the bottom borders
@@ -4420,14 +6640,14 @@ def print_schedule() -> None:
 def view_transaction_history_by_asset() -> None:
     last_error = "" # Store the last error message
     asset: Asset = None
-    transactions = None
+    history: TransactionHistory = None
 
     while True:
         clear_screen_and_print_ams_title()
 
         print_title("View Transaction History by Asset", Color.BRIGHT_YELLOW, 100)
 
-        if transactions is not None and asset:
+        if history is not None and asset:
 
             print_table(
                 asset.to_dataframe(),
@@ -4437,9 +6657,7 @@ def view_transaction_history_by_asset() -> None:
                 print_headers=False,
             )
 
-            print_table(
-                transactions, "", Color.BRIGHT_YELLOW, 100,
-            )
+            history.print( 100 )
 
         last_error = display_and_clear_error( last_error )
 
@@ -4448,6 +6666,11 @@ def view_transaction_history_by_asset() -> None:
         if not asset_id:
             break
 
+        if history is not None:
+            ( is_command, last_error ) = history.handle_command( asset_id )
+            if is_command:
+                continue
+
         asset = Asset.from_id( asset_id )
         if not asset:
             last_error = f"Lookup failed: Asset not found, for barcode '{asset_id}'"
@@ -4474,9 +6697,10 @@ def view_transaction_history_by_asset() -> None:
 
 ### ===
 
-        transactions = get_transaction_history( asset )
-        if transactions is None:
+        history = TransactionHistory( asset )
+        if not history.first_page() or history.total == 0:
             last_error =  f"Lookup failed: Asset has no transaction history, for barcode '{asset_id}'"
+            history = None
             continue
 
     # ...  end  of  while  True  loop  ...
@@ -4492,26 +6716,29 @@ def view_transaction_history_by_asset() -> None:
 def view_transaction_history_by_doc() -> None:
     last_error = "" # Store the last error message
     selected_entity = None
-    transactions = None
+    history: TransactionHistory = None
 
     while True:
         clear_screen_and_print_ams_title()
 
         print_title("View Transaction History by Asset", Color.BRIGHT_YELLOW, 100)
 
-        if transactions is not None and selected_entity:
+        if history is not None and selected_entity:
             print_selected_incarcerated_in_table( selected_entity )
-            print_table(
-                transactions, "", Color.BRIGHT_YELLOW, 150,
-            )
-            pass
-            # TODO: Implement displaying df of transaction history logic.
+            history.print( 150 )
 
         # end ~ if transaction and transaction.transaction_id:
 
         last_error = display_and_clear_error( last_error )
 
-        ( doc_num, last_error ) = input_and_validate_doc()
+        doc_num = input_with_color( "Enter DOC number:" )
+
+        if history is not None:
+            ( is_command, last_error ) = history.handle_command( doc_num )
+            if is_command:
+                continue
+
+        ( doc_num, last_error ) = validate_doc( doc_num )
         if last_error:
             continue # repeat loop
         if not doc_num:
@@ -4523,40 +6750,78 @@ def view_transaction_history_by_doc() -> None:
             last_error = f"Incarcerated Individual not found for DOC number: '{doc_num}'"
             continue
 
-        transactions = get_transaction_history( selected_entity )
-        if transactions is None:
+        history = TransactionHistory( selected_entity )
+        if not history.first_page() or history.total == 0:
             last_error =  f"Lookup failed: No transaction history for DOC number: '{doc_num}'"
+            history = None
             continue
 
     # ...  end  of  while  True  loop  ...
 
     return
 
+# Hidden main menu option ('diag' / 'diagnostics'): shows where this session's database time went
+def diagnostics_menu() -> None:
+    while True:
+        clear_screen_and_print_ams_title()
+
+        print_title( "Diagnostics: Top Queries by Total Time", Color.BRIGHT_YELLOW, 150 )
+
+        top_queries = QUERY_LOG.top_queries( 15 )
+        if top_queries:
+            queries_df = pd.DataFrame( top_queries )
+            queries_df["fingerprint"] = queries_df["fingerprint"].str.slice( 0, 60 )
+            queries_df["callers"]     = queries_df["callers"    ].str.slice( 0, 30 )
+            print_table( queries_df[ [ "calls", "total_ms", "mean_ms", "max_ms", "rows", "callers", "fingerprint" ] ],
+                         "", Color.BRIGHT_YELLOW, 150 )
+        else:
+            print( "No queries recorded yet." )
+
+        recent = list( QUERY_LOG.entries )
+        if recent:
+            acquire_ms = [ entry["acquire_ms"] for entry in recent if entry["acquire_ms"] > 0 ]
+            print( f"\nLast {len( recent )} queries: {sum( entry['duration_ms'] for entry in recent ):.1f} ms in the database" +
+                   ( f", {sum( acquire_ms ):.1f} ms waiting for {len( acquire_ms )} connections." if acquire_ms else "." ) )
+
+        print( f"Connection pool: {DATABASE_POOL.statistics()}" )
+        print( f"Session cache:   {SESSION_CACHE.statistics()}" )
+        if QUERY_LOG.jsonl_path:
+            print( f"Query log file:  '{QUERY_LOG.jsonl_path}'" )
+
+        choice = input_with_color( "\n'c' clears the query log, 'ENTER' returns to the main menu:" )
+        if choice.lower() == "c":
+            QUERY_LOG.clear()
+        else:
+            break
+
+    return
+
+
 # Function to print the main menu
 def print_main_menu() -> None:
     clear_screen_and_print_ams_title()
 
-    menu_df = pd.DataFrame(
-        {   
-            "Column1": [
-                "1. Issue asset to incarcerated individual\n" +
-                "2. Issue asset to employee\n" +
-                "3. Issue asset to location",
+    menu_sections = {
+        "Column1": [
+            "1. Issue asset to incarcerated individual\n" +
+            "2. Issue asset to employee\n" +
+            "3. Issue asset to location\n" +
+            "9. Bulk issue to incarcerated individual (scan a cart, issue once)",
 
-                "4. Return asset",
+            "4. Return asset\n" +
+            "10. Bulk return (drop box: scan many, return once)",
 
-                "5. Print schedule\n" +
-                "6. Print laptop labels",
+            "5. Print schedule\n" +
+            "6. Print laptop labels",
 
-                "7. Run a SQL report\n" +
-                "8. View Transaction History",
+            "7. Run a SQL report\n" +
+            "8. View Transaction History",
 
-                "0. Exit application"
-            ],
-        }
-    )
+            "0. Exit application"
+        ],
+    }
 
-    print_menu_sections(menu_df, min_width=100,)
+    print_menu_sections(menu_sections, min_width=100,)
 
 
 def print_student_menu() -> None:
@@ -4618,18 +6883,48 @@ def print_transaction_history_menu() -> None:
     clear_screen_and_print_ams_title()
     print_title("Transaction History", Color.BRIGHT_YELLOW, 100)
 
-    menu_df = pd.DataFrame(
-        {   
-            "Column1": [
-                "1. View Transaction History by Asset\n" +
-                "2. View Transaction History by DOC Number",
+    menu_sections = {
+        "Column1": [
+            "1. View Transaction History by Asset\n" +
+            "2. View Transaction History by DOC Number",
 
-                "Press Enter to return to the main menu."
-            ],
-        }
-    )
+            "Press Enter to return to the main menu."
+        ],
+    }
+
+    print_menu_sections(menu_sections, min_width=100,)
 
-    print_menu_sections(menu_df, min_width=100,)
+
+# With '--profile-startup': prints how long each top-level import took (the
+# modules it pulled in are counted in its time), then stops timing imports
+def print_startup_profile( top: int = 15 ) -> None:
+    global PROFILE_STARTUP
+    if not PROFILE_STARTUP:
+        return
+    PROFILE_STARTUP = False
+    builtins.__import__ = BUILTIN_IMPORT
+
+    menu_seconds = time.perf_counter() - STARTUP_STARTED
+
+    # Nested imports finish (and are recorded) before the import that pulled them in
+    top_level = []
+    nested    = 0
+    for ( depth, name, seconds ) in STARTUP_IMPORTS:
+        if depth == 0:
+            top_level.append( ( name, seconds, nested ) )
+            nested = 0
+        else:
+            nested += 1
+    import_seconds = sum( seconds for ( _, seconds, _ ) in top_level )
+    lazy_modules   = [ value._module_name for value in globals().values() if isinstance( value, LazyModule ) ]
+
+    print_title( "Startup profile", Color.BRIGHT_YELLOW, 100 )
+    print( f"{'Import':<50} {'ms':>10} {'+ modules':>10}" )
+    for ( name, seconds, nested ) in sorted( top_level, key=lambda entry: entry[1], reverse=True )[:top]:
+        print( f"{name:<50} {seconds * 1000.0:>10.1f} {nested:>10}" )
+    print( f"\n{len( STARTUP_IMPORTS )} modules imported in {import_seconds * 1000.0:.1f} ms; " +
+           f"main menu ready {menu_seconds * 1000.0:.1f} ms after main.py started" )
+    print( f"Loaded on first use: {', '.join( lazy_modules )}\n" )
 
 
 # Main function to display a menu of options for the user to choose from
@@ -4647,6 +6942,7 @@ def main() -> None:
     
     while True:
         print_main_menu()
+        print_startup_profile()
 
         error_message = display_and_clear_error( error_message )
 
@@ -4669,6 +6965,12 @@ def main() -> None:
                 reports_menu()
             elif choice == "8":
                 transaction_history_menu()
+            elif choice == "9":
+                issue_assets( bulk=True )
+            elif choice == "10":
+                bulk_return_assets()
+            elif choice in ( "diag", "diagnostics" ):
+                diagnostics_menu() # hidden: not listed in the main menu
             elif choice == "0" or choice == "q":
                 break           # exit the program
             elif choice == "":
@@ -4688,3 +6990,5 @@ if __name__ == "__main__":
     windll.shcore.SetProcessDpiAwareness(1)
     
     main()
+
+    DATABASE_POOL.close_all() # hang up on the server, politely
@@ -0,0 +1,97 @@
+# Applies the versioned SQL files in 'migrations/' to the database in config.py
+#
+#   python migrate.py            ==> apply any migrations not yet applied
+#   python migrate.py --status   ==> list migrations and when they were applied
+#
+# Each file is applied once, in file name order, in its own transaction, and
+# recorded in the 'schema_migrations' table. Name new files 'NNN_summary.sql'.
+
+import os
+import sys
+
+from main import open_database_connection
+
+
+MIGRATIONS_DIRECTORY = os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), "migrations" )
+
+
+def migration_files() -> list:
+    """Returns ( version, file path ) tuples, in the order they're applied."""
+    return [ ( os.path.splitext( file_name )[0], os.path.join( MIGRATIONS_DIRECTORY, file_name ) )
+             for file_name in sorted( os.listdir( MIGRATIONS_DIRECTORY ) )
+             if file_name.endswith( ".sql" ) ]
+
+
+def applied_migrations( cursor ) -> dict:
+    """Returns { version: applied_at } for migrations already applied."""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(255) PRIMARY KEY,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        """
+    )
+    cursor.execute( "SELECT version, applied_at FROM schema_migrations;" )
+    return { row[0]: row[1] for row in cursor.fetchall() }
+
+
+def apply_migrations() -> int:
+    """
+    Applies every migration not yet recorded in 'schema_migrations'.
+
+    Returns:
+        int: the number of migrations applied
+    """
+    connection = open_database_connection()
+    cursor     = connection.cursor()
+    applied    = 0
+
+    try:
+        already_applied = applied_migrations( cursor )
+        connection.commit()
+
+        for ( version, file_path ) in migration_files():
+            if version in already_applied:
+                continue
+
+            print( f"Applying migration '{version}'..." )
+            with open( file_path, 'r' ) as migration:
+                cursor.execute( migration.read() )
+            cursor.execute( "INSERT INTO schema_migrations ( version ) VALUES ( %s );", ( version, ) )
+            connection.commit() # each migration succeeds (or fails) as a whole
+            applied += 1
+
+    except Exception as e:
+        connection.rollback()
+        print( f"Error: migration failed, and was rolled back.\nException text: {e}" )
+        raise
+
+    finally:
+        cursor.close()
+        connection.close()
+
+    print( f"{applied} migration(s) applied." )
+    return applied
+
+
+def print_status() -> None:
+    connection = open_database_connection()
+    cursor     = connection.cursor()
+
+    try:
+        already_applied = applied_migrations( cursor )
+        connection.commit()
+    finally:
+        cursor.close()
+        connection.close()
+
+    for ( version, _ ) in migration_files():
+        print( f"{version:<40} {already_applied.get( version, 'not applied' )}" )
+
+
+if __name__ == "__main__":
+    if "--status" in sys.argv[1:]:
+        print_status()
+    else:
+        apply_migrations()
@@ -0,0 +1,48 @@
+-- Secondary indexes for the hot lookup paths in main.py.
+-- Applied by migrate.py; every statement is safe to re-run.
+
+-- asset_latest_transaction():
+--     WHERE asset_id = ? ORDER BY transaction_timestamp DESC, transaction_id LIMIT 1
+CREATE INDEX IF NOT EXISTS ix_transactions_asset_latest
+    ON transactions ( asset_id, transaction_timestamp DESC, transaction_id );
+
+-- get_transaction_history( asset ) / count_transaction_history( asset ):
+--     WHERE asset_id = ? [ AND transaction_id > ? ] ORDER BY transaction_id LIMIT n
+CREATE INDEX IF NOT EXISTS ix_transactions_asset_history
+    ON transactions ( asset_id, transaction_id );
+
+-- get_transaction_history( entity ), get_unprinted_documents_for_entity(),
+-- and the unprinted AGREEMENT lookup when issuing:
+--     WHERE entity_id = ? ...
+CREATE INDEX IF NOT EXISTS ix_transactions_entity_history
+    ON transactions ( entity_id, transaction_id );
+
+-- transaction_documents' primary key leads with transaction_id, so
+-- joins and lookups from a document need their own index
+CREATE INDEX IF NOT EXISTS ix_transaction_documents_document
+    ON transaction_documents ( document_id );
+
+-- Unprinted documents are the few that matter when issuing and printing;
+-- a partial index stays small however many documents have been printed
+CREATE INDEX IF NOT EXISTS ix_documents_unprinted
+    ON documents ( document_id )
+    WHERE document_printed_timestamp IS NULL;
+
+-- Enrollment.from_schedule_id(): the primary key leads with entity_id
+CREATE INDEX IF NOT EXISTS ix_enrollments_schedule
+    ON enrollments ( schedule_id );
+
+-- issued_assets is joined from its transaction (Entity.assets_for_entities())
+CREATE INDEX IF NOT EXISTS ix_issued_assets_transaction
+    ON issued_assets ( transaction_id );
+
+-- Entity.assets_for_entities(): accessories issued to an entity
+-- (issued_accessories isn't in every older database)
+DO $$
+BEGIN
+    IF to_regclass( 'issued_accessories' ) IS NOT NULL THEN
+        CREATE INDEX IF NOT EXISTS ix_issued_accessories_entity
+            ON issued_accessories ( entity_id );
+    END IF;
+END
+$$;
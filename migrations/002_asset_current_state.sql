@@ -0,0 +1,148 @@
+-- asset_current_state: one row per asset that has any transactions, holding
+-- its latest transaction (the same one asset_latest_transaction() picks:
+-- newest transaction_timestamp, then lowest transaction_id), its current
+-- holder, and whether that transaction's AGREEMENT has been signed.
+--
+-- Triggers on transactions, transaction_documents and documents keep it up
+-- to date, so reports read one row per asset instead of ranking the whole
+-- transactions table. rebuild_asset_current_state() recomputes it from
+-- scratch (e.g. after loading data with triggers disabled).
+-- Applied by migrate.py; every statement is safe to re-run.
+
+CREATE TABLE IF NOT EXISTS asset_current_state (
+    asset_id VARCHAR(255) PRIMARY KEY REFERENCES assets(asset_id),
+    transaction_id INTEGER NOT NULL,
+    transaction_type transaction_type NOT NULL,
+    transaction_timestamp TIMESTAMP NOT NULL,
+    transaction_user VARCHAR(255) NOT NULL,
+    transaction_notes TEXT,
+    entity_id INTEGER NOT NULL,             -- the latest transaction's entity
+    holder_entity_id INTEGER,               -- the same, while it's ISSUED (else NULL)
+    agreement_signed BOOLEAN NOT NULL DEFAULT FALSE
+);
+
+-- Looked up from a transaction (transaction_documents / documents triggers)
+-- and from a holder (who has what)
+CREATE INDEX IF NOT EXISTS ix_asset_current_state_transaction
+    ON asset_current_state ( transaction_id );
+CREATE INDEX IF NOT EXISTS ix_asset_current_state_holder
+    ON asset_current_state ( holder_entity_id )
+    WHERE holder_entity_id IS NOT NULL;
+
+
+-- Recomputes one asset's row. Its SELECT of the latest transaction is what
+-- ix_transactions_asset_latest serves; reading the row back (e.g.
+-- asset_latest_transaction()) is a primary key lookup.
+CREATE OR REPLACE FUNCTION refresh_asset_current_state( p_asset_id VARCHAR ) RETURNS void AS $$
+BEGIN
+    INSERT INTO asset_current_state (
+        asset_id, transaction_id, transaction_type, transaction_timestamp,
+        transaction_user, transaction_notes, entity_id, holder_entity_id, agreement_signed )
+    SELECT
+        t.asset_id, t.transaction_id, t.transaction_type, t.transaction_timestamp,
+        t.transaction_user, t.transaction_notes, t.entity_id,
+        CASE WHEN t.transaction_type = 'ISSUED' THEN t.entity_id END,
+        EXISTS ( SELECT 1
+                 FROM transaction_documents td
+                 JOIN documents d ON td.document_id = d.document_id
+                 WHERE td.transaction_id = t.transaction_id
+                   AND d.document_type = 'AGREEMENT'
+                   AND d.document_signed_timestamp IS NOT NULL )
+    FROM transactions t
+    WHERE t.asset_id = p_asset_id
+    ORDER BY t.transaction_timestamp DESC, t.transaction_id
+    LIMIT 1
+    ON CONFLICT ( asset_id ) DO UPDATE SET
+        transaction_id        = EXCLUDED.transaction_id,
+        transaction_type      = EXCLUDED.transaction_type,
+        transaction_timestamp = EXCLUDED.transaction_timestamp,
+        transaction_user      = EXCLUDED.transaction_user,
+        transaction_notes     = EXCLUDED.transaction_notes,
+        entity_id             = EXCLUDED.entity_id,
+        holder_entity_id      = EXCLUDED.holder_entity_id,
+        agreement_signed      = EXCLUDED.agreement_signed;
+
+    IF NOT FOUND THEN -- its last transaction was deleted
+        DELETE FROM asset_current_state WHERE asset_id = p_asset_id;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Recomputes every row, set-based
+CREATE OR REPLACE FUNCTION rebuild_asset_current_state() RETURNS void AS $$
+BEGIN
+    DELETE FROM asset_current_state;
+
+    INSERT INTO asset_current_state (
+        asset_id, transaction_id, transaction_type, transaction_timestamp,
+        transaction_user, transaction_notes, entity_id, holder_entity_id, agreement_signed )
+    SELECT
+        latest.asset_id, latest.transaction_id, latest.transaction_type, latest.transaction_timestamp,
+        latest.transaction_user, latest.transaction_notes, latest.entity_id,
+        CASE WHEN latest.transaction_type = 'ISSUED' THEN latest.entity_id END,
+        EXISTS ( SELECT 1
+                 FROM transaction_documents td
+                 JOIN documents d ON td.document_id = d.document_id
+                 WHERE td.transaction_id = latest.transaction_id
+                   AND d.document_type = 'AGREEMENT'
+                   AND d.document_signed_timestamp IS NOT NULL )
+    FROM ( SELECT DISTINCT ON ( t.asset_id ) t.*
+           FROM transactions t
+           ORDER BY t.asset_id, t.transaction_timestamp DESC, t.transaction_id ) AS latest;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- A transaction was added, corrected or deleted
+CREATE OR REPLACE FUNCTION asset_current_state_transactions_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ( 'UPDATE', 'DELETE' ) THEN
+        PERFORM refresh_asset_current_state( OLD.asset_id );
+    END IF;
+    IF TG_OP IN ( 'INSERT', 'UPDATE' ) AND ( TG_OP = 'INSERT' OR NEW.asset_id IS DISTINCT FROM OLD.asset_id ) THEN
+        PERFORM refresh_asset_current_state( NEW.asset_id );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- A document was linked to (or unlinked from) a transaction
+CREATE OR REPLACE FUNCTION asset_current_state_transaction_documents_trigger() RETURNS trigger AS $$
+BEGIN
+    PERFORM refresh_asset_current_state( s.asset_id )
+    FROM asset_current_state s
+    WHERE s.transaction_id = CASE WHEN TG_OP = 'DELETE' THEN OLD.transaction_id ELSE NEW.transaction_id END;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- An AGREEMENT was signed (or its type / signature corrected)
+CREATE OR REPLACE FUNCTION asset_current_state_documents_trigger() RETURNS trigger AS $$
+BEGIN
+    PERFORM refresh_asset_current_state( s.asset_id )
+    FROM transaction_documents td
+    JOIN asset_current_state s ON td.transaction_id = s.transaction_id
+    WHERE td.document_id = NEW.document_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+DROP TRIGGER IF EXISTS asset_current_state_transactions ON transactions;
+CREATE TRIGGER asset_current_state_transactions
+    AFTER INSERT OR UPDATE OR DELETE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION asset_current_state_transactions_trigger();
+
+DROP TRIGGER IF EXISTS asset_current_state_transaction_documents ON transaction_documents;
+CREATE TRIGGER asset_current_state_transaction_documents
+    AFTER INSERT OR DELETE ON transaction_documents
+    FOR EACH ROW EXECUTE FUNCTION asset_current_state_transaction_documents_trigger();
+
+DROP TRIGGER IF EXISTS asset_current_state_documents ON documents;
+CREATE TRIGGER asset_current_state_documents
+    AFTER UPDATE OF document_type, document_signed_timestamp ON documents
+    FOR EACH ROW EXECUTE FUNCTION asset_current_state_documents_trigger();
+
+
+SELECT rebuild_asset_current_state();
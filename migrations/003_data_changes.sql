@@ -0,0 +1,84 @@
+-- data_changes: an append-only log with one row per statement that changes
+-- an app table. data_changes_version() counts it, so the app can tell
+-- whether anything a report reads has changed with one small query. Saved
+-- report results (see ReportResultCache in main.py) are re-used only while
+-- it is unchanged.
+--
+-- Writers only INSERT their own rows, so they never wait for (or deadlock
+-- on) each other here. The version is a count, not max(change_id): a change
+-- committed after a newer one still counts. Every 1000th change prunes the
+-- log (prune_data_changes()), so counting it stays cheap.
+-- Applied by migrate.py; every statement is safe to re-run.
+
+CREATE TABLE IF NOT EXISTS data_changes (
+    change_id BIGSERIAL PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- How many rows prune_data_changes() has removed (only it updates this row)
+CREATE TABLE IF NOT EXISTS data_changes_pruned (
+    singleton BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK ( singleton ), -- only one row
+    pruned BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO data_changes_pruned ( singleton ) VALUES ( TRUE ) ON CONFLICT DO NOTHING;
+
+
+-- Grows by one (or more) each time a logged change commits
+CREATE OR REPLACE FUNCTION data_changes_version() RETURNS BIGINT AS $$
+    SELECT ( SELECT pruned FROM data_changes_pruned ) + ( SELECT count(*) FROM data_changes );
+$$ LANGUAGE sql STABLE;
+
+
+-- Removes every row this transaction can see, adding them to
+-- data_changes_pruned in the same transaction, so the version doesn't move.
+-- Rows of changes not yet committed stay until the next prune. Prunes take
+-- the data_changes_pruned row first, so they queue instead of deadlocking.
+-- Returns the number of rows removed.
+CREATE OR REPLACE FUNCTION prune_data_changes() RETURNS BIGINT AS $$
+DECLARE
+    removed BIGINT;
+BEGIN
+    PERFORM pruned FROM data_changes_pruned FOR UPDATE;
+    DELETE FROM data_changes;
+    GET DIAGNOSTICS removed = ROW_COUNT;
+    UPDATE data_changes_pruned SET pruned = pruned + removed;
+    RETURN removed;
+END;
+$$ LANGUAGE plpgsql;
+
+
+CREATE OR REPLACE FUNCTION record_data_change() RETURNS trigger AS $$
+DECLARE
+    new_change_id BIGINT;
+BEGIN
+    INSERT INTO data_changes ( table_name ) VALUES ( TG_TABLE_NAME )
+        RETURNING change_id INTO new_change_id;
+    IF new_change_id % 1000 = 0 THEN -- keeps data_changes_version() cheap
+        PERFORM prune_data_changes();
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Every table in createtables.sql (asset_current_state only changes along
+-- with transactions / documents, so it doesn't need one)
+DO $$
+DECLARE
+    app_table TEXT;
+BEGIN
+    FOREACH app_table IN ARRAY ARRAY[
+            'entities', 'users', 'incarcerated', 'students', 'employees', 'locations',
+            'asset_types', 'assets', 'transactions', 'issued_assets', 'issued_chargers',
+            'issued_accessories', 'documents', 'transaction_documents', 'images', 'software',
+            'images_software', 'laptops', 'books', 'book_assets', 'calculators', 'signatures',
+            'courses', 'prerequisites', 'course_schedules', 'enrollments' ] LOOP
+        EXECUTE format( 'DROP TRIGGER IF EXISTS data_changes ON %I', app_table );
+        EXECUTE format( 'CREATE TRIGGER data_changes ' ||
+                        'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I ' ||
+                        'FOR EACH STATEMENT EXECUTE FUNCTION record_data_change()', app_table );
+    END LOOP;
+END;
+$$;
@@ -1,3 +1,6 @@
+-- Ranks each enrolled student's transactions (not each laptop's): a laptop
+-- stays held back for the student it was last issued to, even after it has
+-- been returned, so asset_current_state can't answer this.
 WITH enrolled_transactions AS (
 	SELECT
 		t.entity_id,
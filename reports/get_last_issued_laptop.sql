@@ -1,6 +1,8 @@
 -- Returns a ranked list of last-issued, servicable, laptops for enrolled students
 
 WITH RankedTransactions AS (
+	-- Each student's most recent laptop transaction, whatever has happened to
+	-- that laptop since (so this ranks transactions, not asset_current_state)
 	SELECT
 		t.entity_id,
 		a.asset_id,
@@ -1,6 +1,6 @@
 -- Imports / updates incarcerated records from an OMNI data set
 
--- :defaults => { 'AMS_import': True, 'AMS_returning': 'entity_id' }
+-- :defaults => { 'AMS_import': True, 'AMS_bulk': True, 'AMS_returning': 'entity_id' }
 -- :defaults => { 'AMS_insert_tables': [ 'entities', 'users', 'incarcerated' ] }
 
 --- These OMNI column names don't exist in the AMS database, so
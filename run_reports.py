@@ -0,0 +1,166 @@
+# Runs a batch of reports without the menu (e.g. the nightly exports), several
+# at a time, each on its own pooled connection, and writes a run manifest
+#
+#   python run_reports.py batches/nightly_exports.json
+#   python run_reports.py batches/nightly_exports.json --output-directory J:\exports --jobs 2
+#
+# A batch file is JSON. Report paths are relative to this directory, outputs
+# to the output directory (default: each report's name, as '.csv'):
+#
+#   {
+#       "output_directory": "exports",
+#       "reports": [
+#           { "report": "data/get_sbctc_laptop_update.sql" },
+#           { "report": "reports/get_quarter_schedule.sql", "output": "spring_schedule.csv",
+#             "parameters": { "scheduled_quarter": "Spring", "scheduled_year": 2025 } }
+#       ]
+#   }
+#
+# Reports are read like the reports menu reads them (their ':defaults' and
+# 'AMS_*' options apply), but nothing is asked for: every list / prompt
+# parameter must be in "parameters". Import scripts can't run in a batch.
+# A single SELECT streams to its file (and may come from the report result
+# cache); anything else runs through pandas and is rolled back afterwards.
+# Each file is written under a temporary name and renamed when complete, so
+# a failed report leaves its last good output in place.
+
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+import time
+import warnings
+
+from main import ( DATABASE_POOL, REPORT_CATALOG, connect_to_database, export_report_to_csv,
+                   is_streamable_query, pd, run_report_steps )
+
+
+PROJECT_DIRECTORY = os.path.dirname( os.path.abspath( __file__ ) )
+
+
+def export_dataframe_to_csv( SQL_query: str, file_path: str, parameters: dict = None ) -> int:
+    """Runs a report through pandas, as the reports menu does for reports
+    that aren't a single SELECT, then rolls back. Returns the row count."""
+    connection = connect_to_database()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter( "ignore" ) # ignore "pandas only supports SQLAlchemy / sqlite"
+            df = pd.read_sql_query( SQL_query, connection, params=parameters )
+    finally:
+        connection.rollback() # a batch only exports
+        connection.close()
+
+    df.to_csv( file_path, index=False )
+    return len( df )
+
+
+def run_batch_report( entry: dict, output_directory: str, use_cache: bool ) -> dict:
+    """Runs one batch entry, returning its manifest entry (it never raises)."""
+    report_path = os.path.join( PROJECT_DIRECTORY, entry['report'] )
+    output      = entry.get( 'output' ) or f"{os.path.splitext( os.path.basename( report_path ) )[0]}.csv"
+    file_path   = os.path.join( output_directory, output )
+    partial     = f"{file_path}.partial"
+
+    result = {
+        'report':     entry['report'],
+        'output':     file_path,
+        'parameters': entry.get( 'parameters', {} ),
+        'status':     "ok",
+        'rows':       None,
+        'cached':     False,
+        'seconds':    None,
+        'error':      None,
+    }
+    started = time.perf_counter()
+
+    try:
+        report = REPORT_CATALOG.report( os.path.dirname( report_path ), os.path.basename( report_path ) )
+        ( SQL_query, kwargs ) = run_report_steps( report, entry.get( 'parameters', {} ), interactive=False )
+
+        if kwargs.get( 'AMS_import', False ):
+            raise ValueError( "import scripts need an input file, so they can't run in a batch" )
+
+        if is_streamable_query( SQL_query, **kwargs ):
+            ( result['rows'], result['cached'] ) = export_report_to_csv(
+                    SQL_query, partial, kwargs['AMS_parameters'],
+                    use_cache=use_cache and kwargs.get( 'AMS_cache', True ) )
+        else:
+            result['rows'] = export_dataframe_to_csv( SQL_query, partial, kwargs['AMS_parameters'] )
+
+        os.replace( partial, file_path )
+
+    except Exception as e: # record it, and carry on with the rest of the batch
+        result['status'] = "error"
+        result['error']  = f"{type( e ).__name__}: {e}"
+        if os.path.exists( partial ):
+            os.remove( partial )
+
+    result['seconds'] = round( time.perf_counter() - started, 3 )
+    return result
+
+
+def run_batch( entries: list, output_directory: str, jobs: int, use_cache: bool ) -> list:
+    """Runs the entries 'jobs' at a time (at most the pool's size), and
+    returns their manifest entries, in batch order."""
+    jobs    = max( 1, min( jobs, DATABASE_POOL.max_size ) ) # more would only wait for a connection
+    results = [ None ] * len( entries )
+
+    with concurrent.futures.ThreadPoolExecutor( max_workers=jobs, thread_name_prefix="ams_batch" ) as executor:
+        futures = { executor.submit( run_batch_report, entry, output_directory, use_cache ): index
+                    for ( index, entry ) in enumerate( entries ) }
+
+        for future in concurrent.futures.as_completed( futures ):
+            result = future.result()
+            results[ futures[future] ] = result
+            if result['status'] == "ok":
+                print( f"{result['report']:<50} {result['rows']:>8} rows {result['seconds']:>8.2f} s" +
+                       ( " (cached)" if result['cached'] else "" ) )
+            else:
+                print( f"{result['report']:<50} failed: {result['error']}" )
+
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser( description="Run a batch of reports to CSV files, without the menu." )
+    parser.add_argument( "batch_file", help="JSON list of reports, parameters and output files" )
+    parser.add_argument( "--output-directory", help="where to write the CSV files (default: the batch file's 'output_directory', or '.')" )
+    parser.add_argument( "--jobs", type=int, default=DATABASE_POOL.max_size,
+                         help=f"reports run at once (default and most: POOL_MAX_SIZE, {DATABASE_POOL.max_size})" )
+    parser.add_argument( "--manifest", help="where to write the run manifest (default: manifest.json in the output directory)" )
+    parser.add_argument( "--no-cache", action="store_true", help="always run the queries (don't use saved report results)" )
+    arguments = parser.parse_args()
+
+    with open( arguments.batch_file, 'r' ) as batch_file:
+        batch = json.load( batch_file )
+
+    output_directory = arguments.output_directory or batch.get( 'output_directory', "." )
+    os.makedirs( output_directory, exist_ok=True )
+
+    started = time.time()
+    results = run_batch( batch['reports'], output_directory, arguments.jobs, not arguments.no_cache )
+    DATABASE_POOL.close_all()
+
+    failed   = sum( 1 for result in results if result['status'] != "ok" )
+    manifest = {
+        'batch_file': arguments.batch_file,
+        'started':    time.strftime( "%Y-%m-%d %H:%M:%S", time.localtime( started ) ),
+        'seconds':    round( time.time() - started, 3 ),
+        'jobs':       max( 1, min( arguments.jobs, DATABASE_POOL.max_size ) ),
+        'succeeded':  len( results ) - failed,
+        'failed':     failed,
+        'reports':    results,
+    }
+
+    manifest_path = arguments.manifest or os.path.join( output_directory, "manifest.json" )
+    with open( manifest_path, 'w' ) as manifest_file:
+        json.dump( manifest, manifest_file, indent=2, default=str )
+
+    print( f"{len( results ) - failed} of {len( results )} report(s) exported in {manifest['seconds']} s; " +
+           f"manifest saved to '{manifest_path}'." )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit( main() )